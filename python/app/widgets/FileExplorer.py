@@ -26,7 +26,9 @@ class MetaItemToViewModel:
             item.setData(s, Qt.ItemDataRole.UserRole)
             modelMap[s] = item
             model.appendRow(item)
-            if s.items: MetaItemToViewModel.toTreeNodes(item, modelMap, s.items)
+            # unloaded nodes get a placeholder row, their items are loaded when expanded
+            if s.loaded: MetaItemToViewModel.toTreeNodes(item, modelMap, s.items)
+            elif s.hasItems: item.appendRow(QStandardItem())
 
 # MetaInfoToViewModel
 class MetaInfoToViewModel:
@@ -75,6 +77,7 @@ class FileExplorer(QWidget):
         nodeView.setUniformRowHeights(True)
         nodeView.setModel(nodeModel)
         nodeView.selectionModel().selectionChanged.connect(self.node_change)
+        nodeView.expanded.connect(self.node_expand)
         
         # infoModel
         infoModel = self.infoModel = QStandardItemModel()
@@ -145,6 +148,13 @@ class FileExplorer(QWidget):
     def filter_change(self, index):
         pass
 
+    def node_expand(self, index):
+        item = self.nodeModel.itemFromIndex(index)
+        s = item.data(Qt.ItemDataRole.UserRole) if item else None
+        if not s or item.rowCount() != 1 or item.child(0).data(Qt.ItemDataRole.UserRole) is not None: return
+        item.removeRow(0)
+        MetaItemToViewModel.toTreeNodes(item, self.nodeModelMap, s.items)
+
     def node_change(self, newSelection, oldSelection):
         index = next(iter(newSelection.indexes()), None)
         self.selectedItem = index.data(Qt.ItemDataRole.UserRole)
@@ -0,0 +1,25 @@
+import os, time
+from gamex import family
+from gamex.compression import codecs
+
+# get family
+family = family.getFamily('Bethesda')
+print(f'studio: {family.studio}')
+
+file = 'game:/Skyrim.esm#SkyrimSE'
+# file = 'game:/Fallout4.esm#Fallout4'
+
+# get pak with game:/uri, read() builds the record index
+pakFile = family.openPakFile(file)
+index = pakFile.index
+print(f'pak: {pakFile}, {index}')
+
+# inflate every compressed record, serial then parallel. this times reading and inflating only, record parsing
+# (getRecords/getViews) is not included, and unlike them inflate() holds every payload at once
+for workers in (1, os.cpu_count() or 4):
+    codecs.reset()
+    start = time.perf_counter()
+    inflated = pakFile.readerT(lambda r: index.inflate(r, workers = workers))
+    elapsed = time.perf_counter() - start
+    size = sum(len(x) for x in inflated.values())
+    print(f'workers: {workers}, records: {len(inflated)}, out: {size / elapsed / 1e6:.1f} MB/s, elapsed: {elapsed:.2f}s, zlib: {codecs.metrics()["zlib"]}')
@@ -12,6 +12,8 @@ class BinaryPakFile: pass
 
 # PakBinary_Danae
 class PakBinary_Danae(PakBinaryT):
+    indexCache = True
+
     # read
     def read(self, source: BinaryPakFile, r: Reader, tag: object = None) -> None:
         source.files = files = []
@@ -1,18 +1,55 @@
-import os
+import os, zlib
 from io import BytesIO
 from enum import Enum
 from gamex import FileSource, FileOption, PakBinaryT
+from gamex.meta import HashIndex
 from gamex.compression import decompressLz4, decompressZlib
-from gamex.Bethesda.formats.records import FormType, Header
+from gamex.Bethesda.formats.records import FormType, RecordIndex
 
 # typedefs
 class Reader: pass
 class BinaryPakFile: pass
 
+#region Hashes
+
+# Oblivion - Skyrim bsa hash: 64 bits over the lowercase backslashed name, the extension of a file is hashed apart
+_bsaExtensions = { '.kf': 0x80, '.nif': 0x8000, '.dds': 0x8080, '.wav': 0x80000000 }
+def bsaHash(name: str, folder: bool = False) -> int:
+    name = name.lower().replace('/', '\\')
+    root, ext = (name, '') if folder else os.path.splitext(name)
+    b = root.encode('latin-1', 'replace'); n = len(b)
+    hash1 = (b[-1] | ((b[-2] if n > 2 else 0) << 8) | (n << 16) | (b[0] << 24) | _bsaExtensions.get(ext, 0)) if n else 0
+    hash2 = 0; hash3 = 0
+    for c in b[1:n - 2]: hash2 = (hash2 * 0x1003F + c) & 0xFFFFFFFF
+    for c in ext.encode('latin-1', 'replace'): hash3 = (hash3 * 0x1003F + c) & 0xFFFFFFFF
+    return (((hash2 + hash3) & 0xFFFFFFFF) << 32) | hash1
+
+# (folder, file) hash of an archive path
+def bsaPathHash(path: str) -> (int, int):
+    folder, _, name = path.replace('\\', '/').rpartition('/')
+    return bsaHash(folder, True), bsaHash(name)
+
+# Fallout 4 - Starfield ba2 hash: crc32 without the initial and final inversion over the lowercase backslashed name
+def ba2Hash(name: str) -> int: return zlib.crc32(name.lower().replace('/', '\\').encode('latin-1', 'replace'), 0xFFFFFFFF) ^ 0xFFFFFFFF
+
+# (dirHash << 32 | nameHash, ext) of an archive path, ext being the first four extension bytes
+def ba2PathHash(path: str) -> (int, int):
+    folder, _, name = path.replace('\\', '/').rpartition('/')
+    stem, ext = os.path.splitext(name)
+    return (ba2Hash(folder) << 32) | ba2Hash(stem), int.from_bytes(ext[1:5].lower().encode('latin-1', 'replace').ljust(4, b'\0'), 'little')
+
+# read() keeps each file's stored (key, sub) hashes as file.hash = key << 64 | sub, so a cached index rebuilds the lookup too
+def hashIndex(files: list[FileSource], hashPath: callable) -> HashIndex:
+    return HashIndex(files, [x.hash >> 64 for x in files], [x.hash & 0xFFFFFFFFFFFFFFFF for x in files], hashPath) \
+        if files and files[0].hash is not None else None
+
+#endregion
+
 #region PakBinary_Ba2
 
 # PakBinary_Ba2
 class PakBinary_Ba2(PakBinaryT):
+    indexCache = True
 
     #region Headers : TES5
 
@@ -117,7 +154,8 @@ class PakBinary_Ba2(PakBinaryT):
                             compressed = 1 if headerFile.packedSize != 0 else 0,
                             packedSize = headerFile.packedSize,
                             fileSize = headerFile.fileSize,
-                            offset = headerFile.offset
+                            offset = headerFile.offset,
+                            hash = (((headerFile.dirHash << 32) | headerFile.nameHash) << 64) | headerFile.ext
                             )
                 # Texture BA2 Format
                 case self.F4_HeaderType.DX10:
@@ -130,6 +168,7 @@ class PakBinary_Ba2(PakBinaryT):
                             packedSize = firstChunk.packedSize,
                             fileSize = firstChunk.fileSize,
                             offset = firstChunk.offset,
+                            hash = (((headerTexture.dirHash << 32) | headerTexture.nameHash) << 64) | headerTexture.ext,
                             tag = headerTextureChunks
                             )
                 # GNMF BA2 Format
@@ -142,15 +181,19 @@ class PakBinary_Ba2(PakBinaryT):
                             packedSize = headerGNMF.packedSize,
                             fileSize = headerGNMF.fileSize,
                             offset = headerGNMF.offset,
+                            hash = (((headerGNMF.dirHash << 32) | headerGNMF.nameHash) << 64) | headerGNMF.ext,
                             tag = headerTextureChunks
                             )
                 case _: raise Exception(f'Unknown: {header.type}')
 
             # assign full names to each file
-            if header.nameTableOffset > 0:
+            if header.nameTableOffset > 0 and source.useNames:
                 r.seek(header.nameTableOffset)
-                path = r.readL16Encoding().replace('\\', '/')
-                for file in files: file.path = path
+                for file in files: file.path = r.readL16Encoding().replace('\\', '/')
+
+    # process
+    def process(self, source: BinaryPakFile) -> None:
+        source.filesByHash = hashIndex(source.files, ba2PathHash)
 
     # readData
     def readData(self, source: BinaryPakFile, r: Reader, file: FileSource, option: FileOption = None) -> BytesIO:
@@ -179,6 +222,7 @@ class PakBinary_Ba2(PakBinaryT):
 
 # PakBinary_Bsa
 class PakBinary_Bsa(PakBinaryT):
+    indexCache = True
 
     #region Headers : TES4
 
@@ -277,16 +321,16 @@ class PakBinary_Bsa(PakBinaryT):
                 source.tag = (header.archiveFlags & self.F3_BSAARCHIVE_PREFIXFULLFILENAMES) > 0
 
             # read-all folders
-            foldersFiles = [x.fileCount for x in r.readSArray(self.OB_FolderSSE, header.folderCount)] if header.version == self.SSE_BSAHEADER_VERSION else \
-                [x.fileCount for x in r.readSArray(self.OB_Folder, header.folderCount)]
+            folders = r.readSArray(self.OB_FolderSSE, header.folderCount) if header.version == self.SSE_BSAHEADER_VERSION else \
+                r.readSArray(self.OB_Folder, header.folderCount)
 
-            # read-all folder files
-            fileX = 0
+            # read-all folder files, keeping the folder and file hashes
+            fileX = 0; useNames = source.useNames
             source.files = files = [None] * header.fileCount
-            for i in range(header.folderCount):
-                folderName = r.readFAString(r.readByte() - 1).replace('\\', '/')
-                r.skip(1)
-                headerFiles = r.readSArray(self.OB_File, foldersFiles[i])
+            for folder in folders:
+                if useNames: folderName = r.readFAString(r.readByte() - 1).replace('\\', '/'); r.skip(1)
+                else: folderName = None; r.skip(r.readByte())
+                headerFiles = r.readSArray(self.OB_File, folder.fileCount)
                 for headerFile in headerFiles:
                     compressed = (headerFile.size & self.OB_BSAFILE_SIZECOMPRESS) != 0
                     packedSize = headerFile.size ^ self.OB_BSAFILE_SIZECOMPRESS if compressed else headerFile.size
@@ -295,11 +339,13 @@ class PakBinary_Bsa(PakBinaryT):
                         offset = headerFile.offset,
                         compressed = 1 if compressed ^ compressedToggle else 0,
                         packedSize = packedSize,
-                        fileSize = packedSize & self.OB_BSAFILE_SIZEMASK if source.version == self.SSE_BSAHEADER_VERSION else packedSize)
+                        fileSize = packedSize & self.OB_BSAFILE_SIZEMASK if source.version == self.SSE_BSAHEADER_VERSION else packedSize,
+                        hash = (folder.hash << 64) | headerFile.hash)
                     fileX += 1
 
             # read-all names
-            for file in files: file.path = f'{file.path}/{r.readVUString()}'
+            if useNames:
+                for file in files: file.path = f'{file.path}/{r.readVUString()}'
 
         # Morrowind
         elif magic == self.MW_BSAHEADER_FILEID:
@@ -327,6 +373,10 @@ class PakBinary_Bsa(PakBinaryT):
                 r.seek(filenamesPosition + filenameOffsets[i])
                 files[i].path = r.readVAString(1000).replace('\\', '/')
         else: raise Exception('BAD MAGIC')
+
+    # process
+    def process(self, source: BinaryPakFile) -> None:
+        source.filesByHash = hashIndex(source.files, bsaPathHash)
     
     # readData
     def readData(self, source: BinaryPakFile, r: Reader, file: FileSource, option: FileOption = None) -> BytesIO:
@@ -340,7 +390,7 @@ class PakBinary_Bsa(PakBinaryT):
 
         # not compressed
         if fileSize <= 0 or file.compressed == 0:
-            return BytesIO(r.readBytes(fileSize))
+            return self.readStream(r, fileSize)
 
         # compressed
         newFileSize = r.readUInt32(); fileSize -= 4
@@ -348,18 +398,18 @@ class PakBinary_Bsa(PakBinaryT):
             decompressLz4(r, fileSize, newFileSize) if source.version == self.SSE_BSAHEADER_VERSION else \
             decompressZlib(r, fileSize, newFileSize))
 
+    # dataExtent
+    def dataExtent(self, source: BinaryPakFile, file: FileSource) -> (str, int, int):
+        # an embedded name prefix is only sized once read, and a size still carrying flag bits is not a real extent
+        return (source.pakPath, file.offset, file.fileSize) if not source.tag and 0 <= file.fileSize <= self.OB_BSAFILE_SIZEMASK else None
+
 #endregion
 
 #region PakBinary_Esm
 
-# typedefs
-class RecordGroup: pass
-
 # PakBinary_Esm
 class PakBinary_Esm(PakBinaryT):
     RecordHeaderSizeInBytes: int = 16
-    format: FormType
-    groups: dict[FormType, RecordGroup]
 
     @staticmethod
     def getFormat(game: str) -> FormType:
@@ -376,36 +426,8 @@ class PakBinary_Esm(PakBinaryT):
 
     # read
     def read(self, source: BinaryPakFile, r: Reader, tag: object = None) -> None:
+        # headers only, records decode on source.index.getRecord(formId) / getRecords(type)
         format = self.getFormat(source.game.id)
-        recordLevel = 1
-        filePath = source.pakPath
-        poolAction = None #(GenericPoolAction<BinaryReader>)source.GetReader().Action; //: Leak
-        rootHeader = Header(r, format, None)
-        rootRecord = rootHeader.createRecord(rootHeader.position, recordLevel)
-        rootRecord.read(r, filePath, format)
-
-        # morrowind hack
-        if format == FormType.TES3:
-            group = RecordGroup(poolAction, filePath, format, recordLevel)
-            group.addHeader(Header(label = 0, dataSize = (r.length - r.tell()), position = r.tell()))
-            group.load()
-            groups = self.groups = {}
-            for k, g in groupby(group.records, lambda x: x.header.type):
-                s = RecordGroup(None, filePath, format, recordLevel)
-                s.records = list(g)
-                s.addHeader(Header(label = x.key), False)
-                groups.add(k, s)
-            return
-        
-        # read groups
-        groups = self.groups = {}
-        endPosition = r.length
-        while r.position < endPosition:
-            header = Header(r, format, None)
-            if header.Type != FormType.GRUP: raise Exception(f'{header.type} not GRUP')
-            nextPosition = r.tell() + header.dataSize
-            if not (group := groups.get(header.label)): group = RecordGroup(poolAction, filePath, format, recordLevel); groups.add(header.label, group)
-            group.addHeader(header)
-            r.seek(nextPosition)
+        source.index = RecordIndex(format, source.pakPath, lambda func: source.readerT(func, pooled = True)).scan(r)
     
 #endregion
\ No newline at end of file
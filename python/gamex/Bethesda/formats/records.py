@@ -1,8 +1,12 @@
-import os
+import os, struct, threading
 from io import BytesIO
-from enum import Enum, IntFlag
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum, IntEnum, IntFlag
 from gamex import FileSource, PakBinaryT
-from gamex.compression import decompressLz4, decompressZlib
+from gamex.compression import codecs, decompressLz4, decompressZlib
 
 # typedefs
 class Reader: pass
@@ -10,6 +14,8 @@ class BinaryPakFile: pass
 class Header: pass
 class Record: pass
 class FormId: pass
+class RecordIndex: pass
+class FormIdIndex: pass
 
 #region Enums
 
@@ -196,7 +202,7 @@ class FormType(IntFlag):
     WOOP = 0x504F4F57,
     ZOOM = 0x4D4F4F5A
 
-class FieldType(Enum):
+class FieldType(IntEnum):
     ANAM = 0x4D414E41,
     AVFX = 0x58465641,
     ASND = 0x444E5341,
@@ -411,6 +417,13 @@ class FieldType(Enum):
 
 #region Base
 
+# warnOnce: unsupported and unported types repeat on every record of that type, so each is reported once per process
+_warned: set[str] = set()
+def warnOnce(message: str) -> None:
+    if message in _warned: return
+    _warned.add(message)
+    print(f'WARN.Esm: {message}')
+
 # IHaveMODL
 class IHaveMODL:
     # MODL: MODLGroup
@@ -418,6 +431,8 @@ class IHaveMODL:
 
 # Header
 class Header:
+    __slots__ = ('parent', 'type', 'dataSize', 'flags', 'formId', 'position', 'label', 'groupType')
+
     # HeaderFlags
     class HeaderFlags(IntFlag):
         EsmFile = 0x00000001,               # ESM file. (TES4.HEDR record only.)
@@ -445,7 +460,7 @@ class Header:
         R11 = 0x80000000                    # (REFR) MultiBound
 
     # HeaderGroupType
-    class HeaderGroupType(Enum):
+    class HeaderGroupType(IntEnum):
         Top = 0,                         # Label: Record type
         WorldChildren = 1,               # Label: Parent (WRLD)
         InteriorCellBlock = 2,           # Label: Block number
@@ -464,7 +479,7 @@ class Header:
     dataSize: int 
     flags: HeaderFlags 
     @property
-    def compressed(self) -> bool: return (self.flags & HeaderFlags.Compressed) != 0
+    def compressed(self) -> bool: return (self.flags & Header.HeaderFlags.Compressed) != 0
     formId: int
     position: int
     # group
@@ -475,20 +490,20 @@ class Header:
     def __init__(self, r: Reader, format: FormType, parent: Header):
         self.parent = parent
         self.type = FormType(r.readUInt32())
-        if type == FormType.GRUP:
+        if self.type == FormType.GRUP:
             self.dataSize = (r.readUInt32() - (20 if format == FormType.TES4 else 24))
             self.label = FormType(r.readUInt32())
-            self.groupType = HeaderGroupType(r.readInt32())
+            self.groupType = Header.HeaderGroupType(r.readInt32())
             r.readUInt32() # stamp | stamp + uknown
-            if format != FormType.TES4: r.ReadUInt32() # version + uknown
-            self.position = r.Tell()
+            if format != FormType.TES4: r.readUInt32() # version + uknown
+            self.position = r.tell()
             return
         self.dataSize = r.readUInt32()
         if format == FormType.TES3: r.readUInt32() # Unknown
         self.flags = Header.HeaderFlags(r.readUInt32())
         if format == FormType.TES3: self.position = r.tell(); return
         # tes4
-        self.formId = r.ReadUInt32()
+        self.formId = r.readUInt32()
         r.readUInt32()
         if format == FormType.TES4: self.position = r.tell(); return
         # tes5
@@ -589,14 +604,16 @@ class Header:
     }
 
     def createRecord(self, position: int, recordLevel: int) -> Record:
-        if not (recordType := self.createMap.get(self.type)): print(f'Unsupported ESM record type: {self.type}'); return None
+        if not (recordType := self.createMap.get(self.type)): warnOnce(f'Unsupported ESM record type: {self.type.name}'); return None
         if not recordType[1](recordLevel): return None
-        record = recordType[0]()
+        try: record = recordType[0]()
+        except NameError: warnOnce(f'Unported ESM record type: {self.type.name}'); return None
         record.header = self
         return record
 
 # FieldHeader
 class FieldHeader:
+    __slots__ = ('type', 'dataSize')
     def __repr__(self) -> str: return f'{self.type}'
     def __init__(self, r: Reader, format: FormType):
         self.type: FieldType = FieldType(r.readUInt32())
@@ -607,57 +624,72 @@ class FieldHeader:
 #region Base : Standard Fields
 
 class ColorRef3:
+    __slots__ = ('red', 'green', 'blue')
     def __repr__(self) -> str: return f'{self.red}:{self.green}:{self.blue}'
     struct = ('<3c', 3)
     def __init__(self, tuple): self.red, self.green, self.blue = tuple
 class ColorRef4:
+    __slots__ = ('red', 'green', 'blue', 'null')
     def __repr__(self) -> str: return f'{self.red}:{self.green}:{self.blue}'
     struct = ('<4c', 4)
     def __init__(self, tuple): self.red, self.green, self.blue, self.null = tuple
     # def asColor32(self) -> GXColor32: return GXColor32(self.red, self.green, self.blue, 255)
 class STRVField:
+    __slots__ = ('value',)
     def __repr__(self) -> str: return f'{self.value}'
     value: str
+    def __init__(self, value: str = None): self.value = value
 class FILEField:
+    __slots__ = ('value',)
     def __repr__(self) -> str: return f'{self.value}'
     value: str
 class DATVField:
+    __slots__ = ('b', 'i', 'f', 's')
     def __repr__(self) -> str: return f'DATV'
     b: bool; i: int; f: float; s: str
 class FLTVField: 
+    __slots__ = ('value',)
     def __repr__(self) -> str: return f'{self.value}'
     struct = ('<f', 4)
     def __init__(self, tuple): self.value = tuple
 class BYTEField: 
+    __slots__ = ('value',)
     def __repr__(self) -> str: return f'{self.value}'
     struct = ('<c', 1)
     def __init__(self, tuple): self.value = tuple
 class IN16Field: 
+    __slots__ = ('value',)
     def __repr__(self) -> str: return f'{self.value}'
     struct = ('<h', 2)
     def __init__(self, tuple): self.value = tuple
 class UI16Field: 
+    __slots__ = ('value',)
     def __repr__(self) -> str: return f'{self.value}'
     struct = ('<H', 2)
     def __init__(self, tuple): self.value = tuple
 class IN32Field: 
+    __slots__ = ('value',)
     def __repr__(self) -> str: return f'{self.value}'
     struct = ('<i', 4)
     def __init__(self, tuple): self.value = tuple
 class UI32Field: 
+    __slots__ = ('value',)
     def __repr__(self) -> str: return f'{self.value}'
     struct = ('<I', 4)
     def __init__(self, tuple): self.value = tuple
 class INTVField:
+    __slots__ = ('value',)
     def __repr__(self) -> str: return f'{self.value}'
     struct = ('<q', 8)
     def __init__(self, tuple): self.value = tuple
     def asUI16Field(self) -> UI16Field: return UI16Field(self.value)
 class CREFField:
+    __slots__ = ('color',)
     def __repr__(self) -> str: return f'{self.color}'
     struct = ('<4c', 4)
     def __init__(self, tuple): self.color = ColorRef4(tuple)
 class CNTOField:
+    __slots__ = ('itemCount', 'item')
     def __repr__(self) -> str: return f'{self.item}'
     itemCount: int # Number of the item
     item: FormId   # The ID of the item
@@ -665,19 +697,71 @@ class CNTOField:
         if format == FormType.TES3: self.itemCount = r.readUInt32(); self.item = FormId(r.readZString(32)); return
         self.item = FormId(r.readUInt32()); self.itemCount = r.readUInt32()
 class BYTVField:
+    __slots__ = ('value',)
     def __repr__(self) -> str: return f'BYTS'
     value: bytes
 class UNKNField: 
+    __slots__ = ('value',)
     def __repr__(self) -> str: return f'UNKN'
     value: bytes
 
 class MODLGroup:
+    __slots__ = ('value', 'bound', 'textures')
     def __repr__(self) -> str: return f'{self.value}'
     def __init__(self, r: Reader, dataSize: int): self.value: str = r.readYEncoding(dataSize)
     bound: float
     textures: bytes # Texture Files Hashes
-    def MODBField(self, r: Reader, dataSize: int) -> object: return setattr(self, bound, r.readSingle())
-    def MODTField(self, r: Reader, dataSize: int) -> object: return setattr(self, textures, r.readBytes(dataSize))
+    def MODBField(self, r: Reader, dataSize: int) -> object: return setattr(self, 'bound', r.readSingle())
+    def MODTField(self, r: Reader, dataSize: int) -> object: return setattr(self, 'textures', r.readBytes(dataSize))
+
+#endregion
+
+#region Base : Field Views
+
+# RecordView
+class RecordView:
+    # a record's fields without per field objects: one memoryview over the record data and a flat array of
+    # (type, offset, size) triples into it. nothing is decoded until a getter or a ViewField asks
+    __slots__ = ('data', 'table')
+    fieldStruct = { FormType.TES3: struct.Struct('<2I'), FormType.TES4: struct.Struct('<IH') }
+    XXXX = FieldType.XXXX.value
+
+    def __init__(self, data: bytes, format: FormType):
+        self.data = data = memoryview(data)
+        self.table = table = array('I')
+        fieldStruct = self.fieldStruct[FormType.TES3 if format == FormType.TES3 else FormType.TES4]; unpack = fieldStruct.unpack_from; fieldSize = fieldStruct.size
+        p = 0; end = len(data); nextSize = None
+        while p + fieldSize <= end:
+            type, size = unpack(data, p); p += fieldSize
+            if nextSize is not None: size = nextSize; nextSize = None
+            if type == self.XXXX: nextSize = int.from_bytes(data[p:p + 4], 'little'); p += size; continue # next field's size
+            table.extend((type, p, size))
+            p += size
+    def __repr__(self) -> str: return f'fields:{len(self)}@{len(self.data)}'
+    def __len__(self) -> int: return len(self.table) // 3
+    def __contains__(self, type: FieldType) -> bool: return type in self.table[::3]
+
+    def field(self, type: FieldType) -> memoryview:
+        table = self.table
+        for i in range(0, len(table), 3):
+            if table[i] == type: p = table[i + 1]; return self.data[p:p + table[i + 2]]
+        return None
+
+    def fields(self, type: FieldType) -> list[memoryview]:
+        data, table = self.data, self.table
+        return [data[table[i + 1]:table[i + 1] + table[i + 2]] for i in range(0, len(table), 3) if table[i] == type]
+
+    def getString(self, type: FieldType) -> str: return None if (b := self.field(type)) is None else bytes(b).rstrip(b'\0').decode('latin-1')
+    def getS(self, type: FieldType, cls: type) -> object: return None if (b := self.field(type)) is None else cls(struct.unpack_from(cls.struct[0], b))
+
+# ViewField
+class ViewField:
+    # record attribute decoded from the record's view on access. a field read by createField is an instance attribute and wins
+    __slots__ = ('type', 'decode')
+    def __init__(self, type: FieldType, decode: callable): self.type = type; self.decode = decode
+    def __get__(self, obj: object, owner: type) -> object:
+        if obj is None: return self
+        return None if (view := obj.view) is None or (b := view.field(self.type)) is None else self.decode(b)
 
 #endregion
 
@@ -687,12 +771,13 @@ class Record:
     def __repr__(self) -> str: return f'{self.__name__}:{self.EDID.value}'
     Empty: Record = Record()
     header: Header
+    view: RecordView = None
     @property
     def id(self) -> int: return self.header.formId
-    EDID: STRVField # Editor ID
+    EDID: STRVField = ViewField(FieldType.EDID, lambda b: STRVField(bytes(b).rstrip(b'\0').decode('latin-1'))) # Editor ID
 
     # Return an uninitialized subrecord to deserialize, or null to skip.
-    def createField(self, r: Reader, format: FormType, type: FieldType, dataSize: int) -> object: return Empty
+    def createField(self, r: Reader, format: FormType, type: FieldType, dataSize: int) -> object: return Record.Empty
 
     def read(self, r: Reader, filePath: str, format: FormType) -> None:
         startTell = r.tell(); endTell = startTell + self.header.dataSize
@@ -702,9 +787,9 @@ class Record:
                 if fieldHeader.dataSize != 4: raise Exception()
                 fieldHeader.dataSize = r.readUInt32()
                 continue
-            elif fieldHeader.type == FieldType.OFST and Header.Type == FormType.WRLD: r.seek(endTell); continue
+            elif fieldHeader.type == FieldType.OFST and self.header.type == FormType.WRLD: r.seek(endTell); continue
             tell = r.tell()
-            if self.createField(r, format, fieldHeader.type, fieldHeader.dataSize) == Empty: print(f'Unsupported ESM record type: {self.header.type}:{fieldHeader.type}'); r.skip(fieldHeader.dataSize); continue
+            if self.createField(r, format, fieldHeader.type, fieldHeader.dataSize) is Record.Empty: warnOnce(f'Unsupported ESM field type: {self.header.type.name}:{fieldHeader.type.name}'); r.skip(fieldHeader.dataSize); continue
             # check full read
             if r.tell() != tell + fieldHeader.dataSize: raise Exception(f'Failed reading {self.header.type}:{fieldHeader.type} field data at offset {tell} in {filePath} of {r.tell() - tell - fieldHeader.dataSize}')
         # check full read
@@ -714,6 +799,244 @@ class Record:
 
 #region Base : RecordGroup
 
+# RecordIndex
+class RecordIndex:
+    # two phase esm loading. scan makes one forward pass over the group and record headers without decoding a field,
+    # records are then decoded on request by formId or type and kept in a bounded lru.
+    # records are parallel arrays of (type, formId, position, dataSize, flags, group), groups are (label, groupType, position, dataSize, parent).
+    # tes3 has no groups or formIds, so its records key by ordinal
+    maxRecords: int = int(os.getenv('GAMEX_ESM_RECORDS') or 4096)
+    workers: int = int(os.getenv('GAMEX_ESM_WORKERS') or 1) # serial unless asked, parallel inflate is unmeasured on real masters
+    batchBytes: int = 1024 * 1024 # compressed bytes per inflate task
+    headerStruct = struct.Struct('<4I')
+    empty = array('I')
+
+    def __init__(self, format: FormType, filePath: str = None, readerT: callable = None, maxRecords: int = None):
+        self.format = format
+        self.filePath = filePath
+        self.readerT = readerT
+        self.headerSize = 16 if format == FormType.TES3 else 20 if format == FormType.TES4 else 24
+        self.types = array('I'); self.formIds = array('I'); self.positions = array('Q'); self.dataSizes = array('I'); self.flags = array('I'); self.parents = array('i')
+        self.groups: list[tuple] = []
+        self.byFormId: dict[int, int] = {}
+        self.byType: dict[int, array] = {}
+        self.masters: list[str] = []
+        # decoded
+        self.maxRecords = maxRecords if maxRecords is not None else RecordIndex.maxRecords
+        self.records: OrderedDict[int, Record] = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    def __repr__(self) -> str: return f'records:{len(self.types)} groups:{len(self.groups)} decoded:{len(self.records)}/{self.maxRecords}'
+    def __len__(self) -> int: return len(self.types)
+
+    def scan(self, r: Reader, position: int = 0, endPosition: int = None) -> RecordIndex:
+        endPosition = r.length if endPosition is None else endPosition
+        tes3 = self.format == FormType.TES3; headerSize = self.headerSize; grup = FormType.GRUP.value; unpack = self.headerStruct.unpack
+        types, formIds, positions, dataSizes, flags, parents, groups, byFormId, byType = \
+            self.types, self.formIds, self.positions, self.dataSizes, self.flags, self.parents, self.groups, self.byFormId, self.byType
+        opened = [] # (group, endPosition) of the groups around position
+        while position + headerSize <= endPosition:
+            while opened and position >= opened[-1][1]: opened.pop()
+            parent = opened[-1][0] if opened else -1
+            r.seek(position)
+            type, size, a, b = unpack(r.readBytes(16))
+            position += headerSize
+            if type == grup and not tes3:
+                groups.append((a, b, position, size - headerSize, parent))
+                opened.append((len(groups) - 1, position - headerSize + size))
+                continue
+            i = len(types)
+            formId, flag = (i, b) if tes3 else (b, a)
+            types.append(type); formIds.append(formId); positions.append(position); dataSizes.append(size); flags.append(flag); parents.append(parent)
+            byFormId[formId] = i
+            if (ofType := byType.get(type)) is None: ofType = byType[type] = array('I')
+            ofType.append(i)
+            position += size
+        if types and types[0] in (FormType.TES3.value, FormType.TES4.value): self.masters = self.readMasters(r)
+        return self
+
+    # MAST fields of the plugin header record, the files a formId's top byte indexes
+    def readMasters(self, r: Reader) -> list[str]:
+        r.seek(self.positions[0]); data = r.readBytes(self.dataSizes[0])
+        sizeFormat, fieldSize = ('<I', 8) if self.format == FormType.TES3 else ('<H', 6)
+        masters = []; p = 0
+        while p + fieldSize <= len(data):
+            type = data[p:p + 4]; size = struct.unpack_from(sizeFormat, data, p + 4)[0]; p += fieldSize
+            if type == b'MAST': masters.append(data[p:p + size].rstrip(b'\0').decode('utf-8', 'replace'))
+            p += size
+        return masters
+
+    def find(self, formId: int) -> int: return self.byFormId.get(formId)
+    def ofType(self, type: FormType) -> array: return self.byType.get(type, self.empty)
+
+    def header(self, i: int) -> Header:
+        header = Header.__new__(Header)
+        header.parent = None
+        header.type = FormType(self.types[i])
+        header.dataSize = self.dataSizes[i]
+        header.flags = Header.HeaderFlags(self.flags[i])
+        header.formId = self.formIds[i]
+        header.position = self.positions[i]
+        return header
+
+    # bulk mode: compressed payloads are read in file order on r, then inflated in batches, on a thread pool when workers > 1.
+    # batches are yielded in file order as [(i, data)] and read only as the pool has room, at most two per worker are in flight,
+    # so a caller that parses each batch before taking the next holds a few batches rather than the whole inflated type
+    def inflateBatches(self, r: Reader, indices: list[int] = None, workers: int = None):
+        compressed = Header.HeaderFlags.Compressed.value; flags, positions, dataSizes = self.flags, self.positions, self.dataSizes
+        indices = sorted((i for i in (range(len(flags)) if indices is None else indices) if flags[i] & compressed), key = positions.__getitem__)
+        def batches():
+            batch = []; size = 0
+            for i in indices:
+                r.seek(positions[i]); newDataSize = r.readUInt32()
+                batch.append((i, r.readBytes(dataSizes[i] - 4), newDataSize)); size += dataSizes[i]
+                if size >= self.batchBytes: yield batch; batch = []; size = 0
+            if batch: yield batch
+        def decode(batch: list[tuple]) -> list[tuple]: return [(i, codecs.decode('zlib', src, newDataSize)) for i, src, newDataSize in batch]
+        workers = min(workers or self.workers, sum(dataSizes[i] for i in indices) // self.batchBytes + 1) # no more than the batches
+        if workers <= 1: yield from map(decode, batches()); return
+        with ThreadPoolExecutor(workers, 'gamex-inflate') as pool:
+            pending = deque()
+            for batch in batches():
+                pending.append(pool.submit(decode, batch))
+                if len(pending) >= 2 * workers: yield pending.popleft().result()
+            while pending: yield pending.popleft().result()
+
+    # every inflated payload at once, peak memory is the inflated size of all of them
+    def inflate(self, r: Reader, indices: list[int] = None, workers: int = None) -> dict[int, bytes]:
+        return {i:data for batch in self.inflateBatches(r, indices, workers) for i, data in batch}
+
+    # decoded records key by i, views by ~i
+    def _cached(self, key: int, make: callable) -> object:
+        with self.lock:
+            if (value := self.records.get(key)) is not None: self.records.move_to_end(key); self.hits += 1; return value
+            self.misses += 1
+        if (value := make()) is None: return None
+        with self.lock:
+            self.records[key] = value
+            while len(self.records) > self.maxRecords: self.records.popitem(last = False)
+        return value
+
+    def load(self, r: Reader, i: int, recordLevel: int = 1, data: bytes = None) -> Record:
+        return self._cached(i, lambda: self._load(r, i, recordLevel, data))
+
+    def _load(self, r: Reader, i: int, recordLevel: int, data: bytes) -> Record:
+        header = self.header(i)
+        if not (record := header.createRecord(header.position, recordLevel)): return None
+        r.seek(header.position)
+        if not header.compressed: record.read(r, self.filePath, self.format)
+        else:
+            from openstk.poly import Reader
+            if data is None: newDataSize = r.readUInt32(); data = decompressZlib(r, header.dataSize - 4, newDataSize)
+            header.position = 0; header.dataSize = len(data)
+            with Reader(BytesIO(data)) as r2: record.read(r2, self.filePath, self.format)
+        return record
+
+    # record with its fields as a RecordView, unported record types come back as a base Record
+    def loadView(self, r: Reader, i: int, data: bytes = None) -> Record:
+        return self._cached(~i, lambda: self._loadView(r, i, data))
+
+    def _loadView(self, r: Reader, i: int, data: bytes) -> Record:
+        header = self.header(i)
+        if data is None:
+            r.seek(header.position)
+            if not header.compressed: data = r.readBytes(header.dataSize)
+            else: newDataSize = r.readUInt32(); data = decompressZlib(r, header.dataSize - 4, newDataSize)
+        try: record = recordType[0]() if (recordType := header.createMap.get(header.type)) else Record()
+        except NameError: record = Record()
+        record.header = header
+        record.view = RecordView(data, self.format)
+        return record
+
+    def getRecord(self, formId: int) -> Record:
+        return None if (i := self.find(formId)) is None else self.readerT(lambda r: self.load(r, i))
+
+    def getRecords(self, type: FormType, workers: int = None) -> list[Record]:
+        # compressed records are parsed batch by batch as they are inflated, the rest in order after
+        def func(r: Reader) -> list[Record]:
+            indices = self.ofType(type); loaded = {}
+            for batch in self.inflateBatches(r, [i for i in indices if i not in self.records], workers):
+                for i, data in batch: loaded[i] = self.load(r, i, data = data)
+            return [x for i in indices if (x := loaded[i] if i in loaded else self.load(r, i))]
+        return self.readerT(func)
+
+    def getView(self, formId: int) -> Record:
+        return None if (i := self.find(formId)) is None else self.readerT(lambda r: self.loadView(r, i))
+
+    def getViews(self, type: FormType, workers: int = None) -> list[Record]:
+        def func(r: Reader) -> list[Record]:
+            indices = self.ofType(type); loaded = {}
+            for batch in self.inflateBatches(r, [i for i in indices if ~i not in self.records], workers):
+                for i, data in batch: loaded[i] = self.loadView(r, i, data)
+            return [loaded[i] if i in loaded else self.loadView(r, i) for i in indices]
+        return self.readerT(func)
+
+# FormIdIndex
+class FormIdIndex:
+    # formIds across a load order. the top byte of a plugin's formId picks its origin, one of the plugin's masters or the plugin
+    # itself past them, so keys are load order formIds (origin load index << 24 | object id). later plugins override earlier ones
+    # and the winners are frozen into sorted parallel arrays (key, plugin, record, position) searched by bisect
+    def __init__(self, plugins: list[str] = None, indexes: list[RecordIndex] = None):
+        self.plugins = plugins or []
+        self.masters = [list(x.masters) for x in indexes] if indexes else [] # per plugin, persisted so resolve works from the cache alone
+        self.indexes = indexes
+        self.keys = array('Q'); self.winners = array('H'); self.records = array('I'); self.positions = array('Q')
+    def __repr__(self) -> str: return f'formIds:{len(self.keys)} plugins:{len(self.plugins)}'
+    def __len__(self) -> int: return len(self.keys)
+    def __contains__(self, formId: int) -> bool: return self.indexOf(formId) >= 0
+
+    @staticmethod
+    def build(indexes: list[RecordIndex], paths: list[str] = None) -> FormIdIndex:
+        from gamex.cache import FormIdCache
+        index = FormIdIndex([os.path.basename(x.filePath or '') for x in indexes], indexes)
+        if paths and FormIdCache.load(paths, index): return index
+        loadIndex = {x.lower(): i for i, x in enumerate(index.plugins)}
+        tes = (FormType.TES3.value, FormType.TES4.value)
+        winners = {}
+        for p, plugin in enumerate(indexes):
+            if plugin.format == FormType.TES3: raise Exception(f'{index.plugins[p]}: TES3 records have no formIds')
+            origins = [loadIndex.get(x.lower(), -1) for x in plugin.masters] + [p]; last = len(origins) - 1
+            for i, (type, formId) in enumerate(zip(plugin.types, plugin.formIds)):
+                if type in tes or (origin := origins[min(formId >> 24, last)]) < 0: continue # header, or a master missing from the load order
+                winners[(origin << 24) | (formId & 0xFFFFFF)] = (p, i)
+        for key in sorted(winners):
+            p, i = winners[key]
+            index.keys.append(key); index.winners.append(p); index.records.append(i); index.positions.append(indexes[p].positions[i])
+        if paths: FormIdCache.save(paths, index)
+        return index
+
+    @staticmethod
+    def load(paths: list[str], indexes: list[RecordIndex] = None) -> FormIdIndex:
+        # the cached arrays alone serve find and resolve, getRecord also needs the plugins' RecordIndexes
+        from gamex.cache import FormIdCache
+        return index if FormIdCache.load(paths, index := FormIdIndex(None, indexes)) else None
+
+    def pluginIndex(self, plugin: str) -> int:
+        plugin = plugin.lower()
+        return next((i for i, x in enumerate(self.plugins) if x.lower() == plugin), -1)
+
+    # plugin local formId to load order formId, -1 when the plugin or its origin is not in the load order
+    def resolve(self, plugin: str, formId: int, masters: list[str] = None) -> int:
+        if masters is None:
+            if (p := self.pluginIndex(plugin)) < 0: return -1
+            masters = self.masters[p]
+        origin = masters[formId >> 24] if (formId >> 24) < len(masters) else plugin
+        return -1 if (p := self.pluginIndex(origin)) < 0 else (p << 24) | (formId & 0xFFFFFF)
+
+    def indexOf(self, formId: int) -> int:
+        keys = self.keys
+        return i if (i := bisect_left(keys, formId)) < len(keys) and keys[i] == formId else -1
+
+    # winning (plugin, position) for a load order formId
+    def find(self, formId: int) -> (str, int):
+        return None if (i := self.indexOf(formId)) < 0 else (self.plugins[self.winners[i]], self.positions[i])
+
+    def getRecord(self, formId: int) -> Record:
+        if (i := self.indexOf(formId)) < 0 or not self.indexes: return None
+        plugin = self.indexes[self.winners[i]]; j = self.records[i]
+        return plugin.readerT(lambda r: plugin.load(r, j))
+
 #endregion
 
 #region Base : Extensions
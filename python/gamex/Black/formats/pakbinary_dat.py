@@ -10,6 +10,7 @@ class BinaryPakFile: pass
 
 # PakBinary_Dat
 class PakBinary_Dat(PakBinaryT):
+    indexCache = True
 
     #region F1/F2
 
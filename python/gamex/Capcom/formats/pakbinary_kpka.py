@@ -12,6 +12,7 @@ class BinaryPakFile: pass
 
 # PakBinary_Kpka
 class PakBinary_Kpka(PakBinaryT):
+    indexCache = True
 
     #region K
 
@@ -42,6 +43,10 @@ class PakBinary_Kpka(PakBinaryT):
 
     #endregion
 
+    # names come from the game's hash list, so a cached index is only good for the list it was read with
+    def indexDependencies(self, source: BinaryPakFile) -> list[object]:
+        return RE.getHashStamp(f'{source.game.resource}.list') if source.game.resource else []
+
     # read
     def read(self, source: BinaryPakFile, r: Reader, tag: object = None) -> None:
         magic = r.readUInt32()
@@ -106,7 +111,7 @@ Exponent = int.from_bytes([
 def _decompress(r: Reader, compressed: int, length: int, newLength: int = 0, full: bool = True) -> bytes:
     return r.readBytes(length) if compressed == 0 else \
         decompressZlib(r, length, newLength, noHeader = True, full = full) if compressed == 'Z' else \
-        decompressZstd(r, length, newLength) if compressed == 'S' else \
+        decompressZstd(r, length, newLength, full = full) if compressed == 'S' else \
         None
 
 @staticmethod
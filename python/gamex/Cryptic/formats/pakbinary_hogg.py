@@ -10,6 +10,7 @@ class BinaryPakFile: pass
 
 # PakBinary_Dat
 class PakBinary_Hogg(PakBinaryT):
+    indexCache = True
 
     #region Headers
 
@@ -117,7 +118,5 @@ class PakBinary_Hogg(PakBinaryT):
     # readData
     def readData(self, source: BinaryPakFile, r: Reader, file: FileSource, option: FileOption = None) -> BytesIO:
         r.seek(file.offset)
-        return BytesIO(
-            decompressZlib(r, file.packedSize, file.fileSize) if file.compressed != 0 else \
-            r.readBytes(file.fileSize)
-            )
+        return BytesIO(decompressZlib(r, file.packedSize, file.fileSize)) if file.compressed != 0 else \
+            self.readStream(r, file.fileSize)
@@ -1,7 +1,6 @@
 from __future__ import annotations
 import os
 from gamex import Family, PakFile, FileSource, MetaManager, MetaInfo, MetaContent, IHaveMetaInfo
-from gamex.Base.formats.binary import Binary_Dds, Binary_Img, Binary_Pcx, Binary_Snd, Binary_Tga, Binary_Txt
 from gamex.util import _pathExtension
 
 # UnknownFamily
@@ -20,6 +19,7 @@ class UnknownPakFile(PakFile):
 
     @staticmethod
     def objectFactory(source: FileSource, game: FamilyGame) -> (FileOption, callable):
+        from gamex.Base.formats.binary import Binary_Dds, Binary_Img, Binary_Pcx, Binary_Snd, Binary_Tga, Binary_Txt
         match _pathExtension(source.path).lower():
             case '.txt' | '.ini' | '.cfg' | '.csv' | '.xml': return (0, Binary_Txt.factory)
             case '.wav': return (0, Binary_Snd.factory)
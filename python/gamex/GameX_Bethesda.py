@@ -1,8 +1,6 @@
 from __future__ import annotations
 import os
 from gamex import Family, FamilyGame, BinaryPakFile
-from gamex.Base.formats.binary import Binary_Dds
-from gamex.Bethesda.formats.pakbinary import PakBinary_Ba2, PakBinary_Bsa, PakBinary_Esm
 from gamex.GameX import UnknownPakFile
 from gamex.util import _pathExtension
 
@@ -35,6 +33,7 @@ class BethesdaPakFile(BinaryPakFile):
     #region Factories
     @staticmethod
     def getPakBinary(game: FamilyGame, extension: str) -> PakBinary:
+        from gamex.Bethesda.formats.pakbinary import PakBinary_Ba2, PakBinary_Bsa, PakBinary_Esm
         match extension:
             case '': return PakBinary_Bsa()
             case '.bsa': return PakBinary_Bsa()
@@ -47,6 +46,7 @@ class BethesdaPakFile(BinaryPakFile):
 
     @staticmethod
     def objectFactory(source: FileSource, game: FamilyGame) -> (FileOption, callable):
+        from gamex.Base.formats.binary import Binary_Dds
         match _pathExtension(source.path).lower():
             case '.dds': return (0, Binary_Dds.factory)
             # case '.nif': return (0, NiFactory)
@@ -1,7 +1,6 @@
 from __future__ import annotations
 import os
 from gamex import Family, FamilyGame, BinaryPakFile
-from gamex.Bullfrog.formats.pakbinary import PakBinary_Bullfrog, PakBinary_Populus, PakBinary_Syndicate
 from gamex.GameX import UnknownPakFile
 from gamex.util import _pathExtension
 
@@ -27,6 +26,7 @@ class BullfrogPakFile(BinaryPakFile):
     #region Factories
     @staticmethod
     def getPakBinary(game: FamilyGame, filePath: str) -> PakBinary:
+        from gamex.Bullfrog.formats.pakbinary import PakBinary_Bullfrog, PakBinary_Populus, PakBinary_Syndicate
         match game.id:
             case 'DK' | 'DK2': return PakBinary_Bullfrog()            # Keeper
             case 'P' | 'P2' | 'P3': return PakBinary_Populus()        # Populs
@@ -37,6 +37,7 @@ class BullfrogPakFile(BinaryPakFile):
 
     @staticmethod
     def objectFactory(source: FileSource, game: FamilyGame) -> (FileOption, callable):
+        from gamex.Bullfrog.formats.pakbinary import PakBinary_Bullfrog, PakBinary_Populus, PakBinary_Syndicate
         match game.id:
             case 'DK' | 'DK2': return PakBinary_Bullfrog.objectFactory(source, game)
             case 'P' | 'P2' | 'P3': return PakBinary_Populus.objectFactory(source, game)
@@ -56,3 +56,7 @@ def getHashLookup(path: str) -> dict[int, str]:
                 print(f'[COLLISION]: {value[hash]} <-> {line}')
             value[hash] = line
     return value
+
+# the list's size and crc in RE.zip, a changed list changes the names getHashLookup resolves
+def getHashStamp(path: str) -> list[object]:
+    return [path, x.file_size, x.CRC] if (x := hashEntries.get(path)) else [path]
@@ -6,7 +6,7 @@ from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives.asymmetric import padding
 from cryptography.hazmat.primitives import serialization
-from gamex import FileSource, FileOption, BinaryPakFile, PakBinaryT
+from gamex import FileSource, FileTable, FileOption, BinaryPakFile, PakBinaryT
 from gamex.compression import decompressBlast
 from gamex.util import _throw, _pathExtension
 from openstk.poly import Reader, unsafe, X_LumpON
@@ -121,6 +121,7 @@ class PakBinary_Bsp30(PakBinaryT):
 
 # PakBinary_Vpk
 class PakBinary_Vpk(PakBinaryT):
+    indexCache = True
 
     #region Headers
 
@@ -199,15 +200,7 @@ class PakBinary_Vpk(PakBinaryT):
 
     # read
     def read(self, source: BinaryPakFile, r: Reader, tag: object = None) -> None:
-        source.files = files = []
-
-        # file mask
-        def fileMask(path: str) -> str:
-            extension = _pathExtension(path)
-            if extension.endswith('_c'): extension = extension[:-2]
-            if extension.startswith('.v'): extension = extension[2:]
-            return f'{os.path.splitext(os.path.basename(path))[0]}{extension}'
-        source.fileMask = fileMask
+        source.files = files = FileTable()
 
         # pakPath
         pakPath = source.pakPath
@@ -235,23 +228,28 @@ class PakBinary_Vpk(PakBinaryT):
                     fileName = r.readVUString(ms=ms)
                     if not fileName: break
                     # get file
-                    file = FileSource(
-                        path = f'{f'{directoryName}/' if directoryName[0] != ' ' else ''}{fileName}.{typeName}',
-                        hash = r.readUInt32(),
-                        data = bytearray(r.readUInt16()),
-                        id = r.readUInt16(),
-                        offset = r.readUInt32(),
-                        fileSize = r.readUInt32()
-                        )
+                    hash = r.readUInt32()
+                    data = bytearray(r.readUInt16())
+                    id = r.readUInt16()
+                    offset = r.readUInt32()
+                    fileSize = r.readUInt32()
                     terminator = r.readUInt16()
                     if terminator != 0xFFFF: raise Exception(f'Invalid terminator, was 0x{terminator:X} but expected 0x{0xFFFF:X}')
-                    if len(file.data) > 0: r.read(file.data, 0, len(file.data))
-                    if file.id != 0x7FFF:
+                    if len(data) > 0: r.read(data, 0, len(data))
+                    if id != 0x7FFF:
                         if not dirVpk: raise Exception('Given VPK is not a _dir, but entry is referencing an external archive.')
-                        file.tag = f'{pakPath}_{file.id:03d}.vpk'
-                    else: file.tag = headerPosition + treeSize
+                        archive = f'{pakPath}_{id:03d}.vpk'
+                    else: archive = headerPosition + treeSize
                     # add file
-                    files.append(file)
+                    files.add(
+                        path = f'{f'{directoryName}/' if directoryName[0] != ' ' else ''}{fileName}.{typeName}',
+                        hash = hash,
+                        data = data or None,
+                        id = id,
+                        offset = offset,
+                        fileSize = fileSize,
+                        tag = archive
+                        )
 
         # verification
         if version == 2:
@@ -261,23 +259,40 @@ class PakBinary_Vpk(PakBinaryT):
             v.verifyHashes(r, treeSize, headerV2, headerPosition)
             v.verifySignature(r)
 
+    # process
+    def process(self, source: BinaryPakFile) -> None:
+        # file mask, set here as read is skipped when the index is cached
+        def fileMask(path: str) -> str:
+            extension = _pathExtension(path)
+            if extension.endswith('_c'): extension = extension[:-2]
+            if extension.startswith('.v'): extension = extension[2:]
+            return f'{os.path.splitext(os.path.basename(path))[0]}{extension}'
+        source.fileMask = fileMask
+
     # readData
     def readData(self, source: BinaryPakFile, r: Reader, file: FileSource, option: FileOption = None) -> BytesIO:
-        fileDataLength = len(file.data)
+        fileDataLength = len(file.data) if file.data else 0
+        if fileDataLength == 0 and isinstance(file.tag, int): r.seek(file.offset + file.tag); return self.readStream(r, file.fileSize)
         data = bytearray(fileDataLength + file.fileSize); mv = memoryview(data)
-        if fileDataLength > 0: data[0:] = file.data
+        if fileDataLength > 0: data[0:fileDataLength] = file.data
         def _str(r2: Reader): r2.seek(file.offset); r2.read(mv, fileDataLength, file.fileSize)
         if file.fileSize == 0: pass
         elif isinstance(file.tag, int): r.seek(file.offset + file.tag); r.read(mv, fileDataLength, file.fileSize)
-        elif isinstance(file.tag, str): source.reader(_str, file.tag)
+        elif isinstance(file.tag, str): _str(r) if getattr(r, 'archive', None) == file.tag else source.reader(_str, file.tag)
         return BytesIO(data)
 
+    # dataExtent
+    def dataExtent(self, source: BinaryPakFile, file: FileSource) -> (str, int, int):
+        return (file.tag, file.offset, file.fileSize) if isinstance(file.tag, str) else \
+            (source.pakPath, file.offset + file.tag, file.fileSize)
+
 #endregion
 
 #region PakBinary_Wad3
 
 # PakBinary_Wad3
 class PakBinary_Wad3(PakBinaryT):
+    indexCache = True
 
     #region Headers
 
@@ -339,9 +354,7 @@ class PakBinary_Wad3(PakBinaryT):
     # readData
     def readData(self, source: BinaryPakFile, r: Reader, file: FileSource, option: FileOption = None) -> BytesIO:
         r.seek(file.offset)
-        return BytesIO(
-            r.readBytes(file.fileSize) if file.compressed == 0 else \
+        return self.readStream(r, file.fileSize) if file.compressed == 0 else \
             _throw('NotSupportedException')
-            )
 
 #endregion
\ No newline at end of file
@@ -1,256 +1,125 @@
-import os
-from io import BytesIO
-
 MAXBITS = 13
 MAXWIN = 4096
 CHUNK = 16384
 
 # Huffman
 class Huffman:
-    def __init__(self, counts: int, symbols: int, rep: bytes):
-        self.count = [0]*counts       # number of symbols of each length
-        self.symbol = [0]*symbols     # canonically ordered symbols
-        n = len(rep)
-
-        repi = 0
-        offs = [0]*(MAXBITS + 1)
-        length = [0]*(256)
-
+    # lookup table over the next `bits` input bits, entries are symbol << 4 | code length, 0 for no code.
+    # codes are canonical and stored bit-inverted, first bit in the low bit of the stream
+    def __init__(self, rep: bytes):
         # convert compact repeat counts into symbol bit length list
-        symbol = 0
-        while True:
-            lenx = rep[repi]; repi += 1
-            left = (lenx >> 4) + 1
-            lenx &= 15
-            while True:
-                length[symbol] = lenx; symbol += 1
-                left -= 1
-                if left == 0: break
-            n -= 1
-            if n == 0: break
-        n = symbol
-
-        # count number of codes of each length
-        for lenx in range(MAXBITS+1): self.count[lenx] = 0
-        for symbol in range(n): self.count[length[symbol]] += 1             # assumes lengths are within bounds
-        if self.count[0] == n: return 0                                     # no codes! complete, but decode() will fail
-
-        # check for an over-subscribed or incomplete set of lengths
-        left = 1                                                            # one possible code of zero length
-        for lenx in range(1, MAXBITS+1):
-            left <<= 1                      # one more bit, double codes left
-            left -= self.count[lenx]         # deduct count from possible codes
-            if left < 0: return left        # over-subscribed--return negative
-                                            # left > 0 means incomplete
-        
-        # generate offsets into symbol table for each length for sorting
-        offs[1] = 0
-        for lenx in range(1, MAXBITS): offs[lenx + 1] = (offs[lenx] + self.count[lenx]) & 0xffff
-
-        # put symbols in table sorted by length, by symbol order within each length
-        for symbol in range(n):
-            if length[symbol] != 0: self.symbol[offs[length[symbol]]] = symbol; offs[length[symbol]] += 1
-
-litcode = Huffman(MAXBITS + 1, 256, bytes([
+        length = []
+        for x in rep: length += [x & 15] * ((x >> 4) + 1)
+        self.length = length
+        self.bits = bits = max(length)
+        self.mask = (1 << bits) - 1
+        self.table = table = [0] * (1 << bits)
+        # assign canonical codes, by length then symbol
+        code = 0; count = [0] * (MAXBITS + 1)
+        for l in length: count[l] += 1
+        first = [0] * (MAXBITS + 2)
+        for l in range(1, MAXBITS + 1): first[l + 1] = code = (code + count[l]) << 1
+        first[1] = 0; next = first[:]
+        self.codes = codes = [None] * len(length)
+        for symbol, l in enumerate(length):
+            if not l: continue
+            code = next[l]; next[l] += 1
+            # stream order is MSB first and inverted
+            v = 0
+            for i in range(l): v |= (((code >> (l - 1 - i)) & 1) ^ 1) << i
+            codes[symbol] = (v, l)
+            entry = (symbol << 4) | l
+            for k in range(0, 1 << bits, 1 << l): table[v | k] = entry
+
+# the three fixed tables, built once
+litcode = Huffman(bytes([
     11, 124, 8, 7, 28, 7, 188, 13, 76, 4, 10, 8, 12, 10, 12, 10, 8, 23, 8,
     9, 7, 6, 7, 8, 7, 6, 55, 8, 23, 24, 12, 11, 7, 9, 11, 12, 6, 7, 22, 5,
     7, 24, 6, 11, 9, 6, 7, 22, 7, 11, 38, 7, 9, 8, 25, 11, 8, 11, 9, 12,
     8, 12, 5, 38, 5, 38, 5, 11, 7, 5, 6, 21, 6, 10, 53, 8, 7, 24, 10, 27,
     44, 253, 253, 253, 252, 252, 252, 13, 12, 45, 12, 45, 12, 61, 12, 45,
-    44, 173])) # bit lengths of literal codes 
-lencode = Huffman(MAXBITS + 1, 16, bytes([2, 35, 36, 53, 38, 23])) # bit lengths of length codes 0..15
-distcode = Huffman(MAXBITS + 1, 64, bytes([2, 20, 53, 230, 247, 151, 248])) # bit lengths of distance codes 0..63
-basex = [3, 2, 4, 5, 6, 7, 8, 9, 10, 12, 16, 24, 40, 72, 136, 264] # base for length codes 
+    44, 173])) # bit lengths of literal codes
+lencode = Huffman(bytes([2, 35, 36, 53, 38, 23])) # bit lengths of length codes 0..15
+distcode = Huffman(bytes([2, 20, 53, 230, 247, 151, 248])) # bit lengths of distance codes 0..63
+basex = [3, 2, 4, 5, 6, 7, 8, 9, 10, 12, 16, 24, 40, 72, 136, 264] # base for length codes
 extra = [0, 0, 0, 0, 0, 0, 0, 0, 1, 2, 3, 4, 5, 6, 7, 8] # extra bits for length codes
 
 # Blast
 class Blast:
-    # input state
-    infun: callable                     # input function provided by user
-    inhow: object                       # opaque information passed to infun()
-    inxs: bytes
-    inx: int                            # next input location
-    left: int                           # available input at in
-    bitbuf: int                         # bit buffer
-    bitcnt: int                         # number of bits in bit buffer
-
-    # output state
-    outfun: callable                    # output function provided by user
-    outhow: object                      # opaque information passed to outfun()
-    nextx: int                          # index of next write location in out[]
-    first: int                          # true to check distances (for first 4K)
-    outx: bytearray = bytearray(MAXWIN) # output buffer and sliding window
-
-    def bits(self, need: int) -> int:
-        val: int # bit accumulator
-
-        # load at least need bits into val
-        val = self.bitbuf
-        while self.bitcnt < need:
-            if self.left == 0:
-                def assign(x): self.inxs = x; self.inx = 0
-                self.left = self.infun(self.inhow, assign)
-                if self.left == 0: raise Exception('EOF') # out of input
-            val |= self.inxs[self.inx] << self.bitcnt; self.inx += 1 # load eight bits
-            self.left -= 1
-            self.bitcnt += 8
-
-        # drop need bits and update buffer, always zero to seven bits left
-        self.bitbuf = val >> need
-        self.bitcnt -= need
-
-        # return need bits, zeroing the bits above that
-        return val & ((1 << need) - 1)
-
-    def decode(self, h: Huffman) -> int:
-        lenx: int           # current number of bits in code
-        code: int           # len bits being decoded
-        first: int          # first code of length len
-        count: int          # number of codes of length len
-        index: int          # index of first code of length len in symbol table
-        bitbuf: int         # bits from stream
-        left: int           # bits left in next or left to process
-        nextx: int          # next number of codes
-
-        bitbuf = self.bitbuf
-        left = self.bitcnt
-        code = first = index = 0
-        lenx = 1
-
-        nexts = h.count; nextx = 1
-        while True:
-            while left != 0:
-                left -= 1
-                code |= (bitbuf & 1) ^ 1 # invert code
-                bitbuf >>= 1
-                count = nexts[nextx]; nextx += 1
-                if code < first + count:
-                    # if length len, return symbol
-                    self.bitbuf = bitbuf
-                    self.bitcnt = (self.bitcnt - lenx) & 7
-                    return h.symbol[index + (code - first)]
-                index += count # else update for next length
-                first += count
-                first <<= 1
-                code <<= 1
-                lenx += 1
-            left = MAXBITS + 1 - lenx
-            if left == 0: break
-            if self.left == 0:
-                self.left = self.infun(self.inhow, self.inx)
-                if self.left == 0: raise Exception('EOF') # out of input
-            bitbuf = self.inxs[self.inx]; self.inx += 1
-            self.left -= 1
-            if left > 8: left = 8
-        return -9 # ran out of codes
-
-    def decomp(self) -> int:
-        lit: int                # true if literals are coded
-        dictx: int              # log2(dictionary size) - 6
-        symbol: int             # decoded symbol, extra bits for distance
-        lenx: int               # length for copy
-        dist: int               # distance for copy
-        copy: int               # copy counter
-        fromx: int; to: int     # copy pointers
-
+    # PKWARE Data Compression Library (implode) decoder.
+    # codes are looked up a whole table width at a time from a buffer refilled to 32 bits once per token,
+    # reading past the input is detected after the fact by the bit count going negative
+    def decompress(self, inputx: bytes, output: bytearray) -> int:
+        # decodes into output, stopping when it is full, returns the bytes written
+        for _ in self._decomp(iter((inputx,)), output, 0, len(output), None): pass
+        return self.written
+
+    def stream(self, chunks: object, size: int = CHUNK):
+        # yields decoded bytes of about size each, reading input from an iterable of chunks
+        buf = bytearray(MAXWIN + size + 519)
+        yield from self._decomp(iter(chunks), buf, MAXWIN, len(buf), MAXWIN + size)
+
+    def _decomp(self, chunks: object, out: bytearray, o: int, size: int, flushAt: int):
+        self.written = 0
+        data = b''; p = n = 0; bitbuf = bitcnt = 0
+        base = o; emitted = 0
+        LIT = litcode.table; LITMASK = litcode.mask
+        LEN = lencode.table; LENMASK = lencode.mask
+        DIST = distcode.table; DISTMASK = distcode.mask
         # read header
-        lit = self.bits(8)
-        if lit > 1: return -1
-        dictx = self.bits(8)
-        if dictx < 4 or dictx > 6: return -2
-
+        while bitcnt < 16:
+            if p < n: bitbuf |= data[p] << bitcnt; p += 1; bitcnt += 8
+            elif (data := next(chunks, None)) is not None: p = 0; n = len(data)
+            else: raise Exception('blast error: 2')
+        lit = bitbuf & 0xFF; dictx = (bitbuf >> 8) & 0xFF; bitbuf >>= 16; bitcnt -= 16
+        if lit > 1: raise Exception('blast error: -1')
+        if dictx < 4 or dictx > 6: raise Exception('blast error: -2')
+        dictmask = (1 << dictx) - 1
         # decode literals and length/distance pairs
-        outx = self.outx; out_ = 0
+        limit = min(size, flushAt or size)
         while True:
-            if self.bits(1) != 0:
+            if o >= limit:
+                if o >= size: break
+                yield bytes(out[base:o])
+                emitted += o - base
+                out[0:MAXWIN] = out[o - MAXWIN:o]; o = base = MAXWIN
+            while bitcnt < 32: # a length and distance token takes up to 30 bits
+                if p < n: bitbuf |= data[p] << bitcnt; p += 1; bitcnt += 8
+                elif (data := next(chunks, None)) is not None: p = 0; n = len(data)
+                else: break
+            if bitbuf & 1:
                 # get length
-                symbol = self.decode(lencode)
-                lenx = basex[symbol] + self.bits(extra[symbol])
-                if lenx == 519: break # end code
-
+                b = bitbuf >> 1
+                if not (e := LEN[b & LENMASK]): raise Exception('blast error: -9')
+                l = e & 15; symbol = e >> 4; b >>= l
+                x = extra[symbol]
+                length = basex[symbol] + (b & ((1 << x) - 1)); b >>= x
+                used = 1 + l + x
+                if length == 519:
+                    if bitcnt < used: raise Exception('blast error: 2')
+                    break # end code
                 # get distance
-                symbol = 2 if lenx == 2 else dictx
-                dist = self.decode(distcode) << symbol
-                dist += self.bits(symbol)
-                dist += 1
-                if self.first != 0 and dist > self.next: return -3 # distance too far back
-
+                if not (e := DIST[b & DISTMASK]): raise Exception('blast error: -9')
+                l = e & 15; b >>= l
+                if length == 2: dist = ((e >> 4) << 2) + (b & 3) + 1; b >>= 2; used += l + 2
+                else: dist = ((e >> 4) << dictx) + (b & dictmask) + 1; b >>= dictx; used += l + dictx
+                if bitcnt < used: raise Exception('blast error: 2')
+                bitbuf = b; bitcnt -= used
+                if dist > o - base + emitted: raise Exception('blast error: -3') # distance too far back
                 # copy length bytes from distance bytes back
-                while True:
-                    to = out_ + self.next
-                    fromx = to - dist
-                    copy = MAXWIN
-                    if self.next < dist:
-                        fromx += copy
-                        copy = dist
-                    copy -= self.next
-                    if copy > lenx: copy = lenx
-                    lenx -= copy
-                    self.next += copy
-                    while True:
-                        outx[to] = outx[fromx]; to += 1; fromx += 1
-                        copy -= 1
-                        if copy == 0: break
-                    if self.next == MAXWIN:
-                        if self.outfun(self.outhow, outx, out_, self.next) != 0: return 1
-                        self.next = 0
-                        self.first = 0
-                    if lenx == 0: break
-
+                if length > size - o: length = size - o
+                start = o - dist
+                out[o:o + length] = out[start:start + length] if dist >= length else \
+                    (out[start:o] * (length // dist + 1))[:length]
+                o += length
             else:
-                 # get literal and write it
-                symbol = self.decode(litcode) if lit != 0 else self.bits(8)
-                outx[out_ + self.next] = symbol & 0xff; self.next += 1
-                if self.next == MAXWIN:
-                    if self.outfun(self.outhow, outx, out_, self.next) != 0: return 1
-                    self.next = 0
-                    self.first = 0
-        return 0
-
-    def blast(self, infun: callable, inhow: object, outfun: callable, outhow: object) -> int:
-        # initialize input state
-        self.infun = infun
-        self.inhow = inhow
-        self.left = 0
-        self.bitbuf = 0
-        self.bitcnt = 0
-
-        # initialize output state
-        self.outfun = outfun
-        self.outhow = outhow
-        self.next = 0
-        self.first = 1
-
-        # return if bits() or decode() tries to read past available input
-        err = 0
-        try:
-            err = self.decomp() # decompress
-        except: err = 2         # if came back here via longjmp(), then skip decomp(), return error
-
-        # write any leftover output and update the error code if needed
-        outx = self.outx; out_ = 0
-        if err != 1 and self.next != 0 and self.outfun(self.outhow, outx, out_, self.next) != 0 and err == 0: err = 1
-        if err != 0: raise Exception(f'blast error: {err}')
-
-    def decompress(self, inputx: bytes, output: bytearray) -> int:
-        hold = bytearray(CHUNK); holdPtr = 0
-        inputLen = len(inputx); inputPtr = 0
-        outputLen = len(output); outputPtr = 0
-        def inf(how: object, buf: callable) -> int:
-            nonlocal inputLen, inputPtr
-            if inputLen <= 0: return 0
-            buf(hold)
-            lenx = min(inputLen, CHUNK)
-            hold[holdPtr:holdPtr+lenx] = inputx[inputPtr:inputPtr+lenx]
-            inputPtr += lenx
-            inputLen -= lenx
-            return lenx
-        def outf(how: object, buf: bytes, bufPtr: int, length: int) -> int:
-            nonlocal outputLen, outputPtr
-            if outputLen <= 0: return 0
-            output[outputPtr:outputPtr+length] = buf[bufPtr:bufPtr+length]
-            outputPtr += length
-            outputLen -= length
-            return 0
-        # decompress
-        self.blast(inf, inputx, outf, output)
\ No newline at end of file
+                # get literal and write it
+                if lit:
+                    if not (e := LIT[(bitbuf >> 1) & LITMASK]): raise Exception('blast error: -9')
+                    used = 1 + (e & 15); symbol = e >> 4
+                else: used = 9; symbol = (bitbuf >> 1) & 0xFF
+                if bitcnt < used: raise Exception('blast error: 2')
+                bitbuf >>= used; bitcnt -= used
+                out[o] = symbol; o += 1
+        self.written = o - base + emitted
+        if flushAt and o > base: yield bytes(out[base:o])
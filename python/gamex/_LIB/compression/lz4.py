@@ -0,0 +1,97 @@
+FRAME_MAGIC = 0x184D2204
+SKIPPABLE_MAGIC = 0x184D2A50
+MIN_MATCH = 4
+MAX_DISTANCE = 65536
+BLOCK_SIZES = { 4: 64 * 1024, 5: 256 * 1024, 6: 1024 * 1024, 7: 4 * 1024 * 1024 }
+
+# Lz4
+class Lz4:
+    # LZ4 block and frame decoder. output goes into a caller allocated bytearray, matches are slice copies
+    # and may reach back into earlier blocks of the same output, as linked frame blocks do
+    @staticmethod
+    def isFrame(data: bytes) -> bool: return len(data) >= 4 and int.from_bytes(data[0:4], 'little') == FRAME_MAGIC
+
+    def decompress(self, data: bytes, output: bytearray) -> int:
+        # frame or raw block, returns the bytes written
+        data = memoryview(data).cast('B')
+        return self.decompressFrame(data, output) if self.isFrame(data) else \
+            self.decompressBlock(data, 0, len(data), output, 0)
+
+    @staticmethod
+    def decompressBlock(src: memoryview, s: int, end: int, out: bytearray, o: int) -> int:
+        size = len(out)
+        while s < end:
+            token = src[s]; s += 1
+            # literals
+            n = token >> 4
+            if n == 15:
+                while True:
+                    b = src[s]; s += 1; n += b
+                    if b != 255: break
+            if n:
+                if s + n > end: raise Exception('lz4: block overflow')
+                if o + n > size: n = size - o; end = s + n # a short output takes the leading bytes and stops
+                out[o:o + n] = src[s:s + n]; s += n; o += n
+            if s >= end: break # the last sequence is literals only
+            # match
+            offset = src[s] | (src[s + 1] << 8); s += 2
+            if offset == 0 or offset > o: raise Exception('lz4: bad offset')
+            n = (token & 15) + MIN_MATCH
+            if n == 19:
+                while True:
+                    b = src[s]; s += 1; n += b
+                    if b != 255: break
+            if o + n > size: n = size - o; end = s
+            start = o - offset
+            out[o:o + n] = out[start:start + n] if offset >= n else \
+                (out[start:o] * (n // offset + 1))[:n]
+            o += n
+        return o
+
+    def _frameHeader(self, src: memoryview, s: int) -> (int, int, bool, bool):
+        flg = src[s]; bd = src[s + 1]; s += 2
+        if (flg >> 6) != 1: raise Exception(f'lz4: unsupported frame version {flg >> 6}')
+        if flg & 0x01: raise Exception('lz4: frame dictionaries are not supported')
+        if flg & 0x08: s += 8 # content size
+        s += 1 # header checksum
+        return s, BLOCK_SIZES.get((bd >> 4) & 7, 4 * 1024 * 1024), (flg & 0x10) != 0, (flg & 0x04) != 0
+
+    def decompressFrame(self, src: memoryview, out: bytearray) -> int:
+        s = 0; o = 0; length = len(src)
+        while s + 4 <= length:
+            magic = int.from_bytes(src[s:s + 4], 'little'); s += 4
+            if (magic & 0xFFFFFFF0) == SKIPPABLE_MAGIC: s += 4 + int.from_bytes(src[s:s + 4], 'little'); continue
+            if magic != FRAME_MAGIC: raise Exception('lz4: bad frame magic')
+            s, _, blockChecksum, contentChecksum = self._frameHeader(src, s)
+            while True:
+                size = int.from_bytes(src[s:s + 4], 'little'); s += 4
+                if size == 0: break
+                if size & 0x80000000:
+                    size &= 0x7FFFFFFF
+                    n = min(size, len(out) - o); out[o:o + n] = src[s:s + n]; o += n
+                else: o = self.decompressBlock(src, s, s + size, out, o)
+                s += size + (4 if blockChecksum else 0)
+                if o == len(out): return o # full, a short output takes the leading bytes
+            if contentChecksum: s += 4
+        return o
+
+    def stream(self, read: callable):
+        # yields one block of output at a time, read(n) supplies input. keeps the last 64KB as history for linked blocks
+        magic = int.from_bytes(read(4), 'little')
+        if magic != FRAME_MAGIC: raise Exception('lz4: streaming needs a frame')
+        head = memoryview(read(3)).cast('B')
+        extra = (8 if head[0] & 0x08 else 0)
+        header = memoryview(bytes(head) + read(extra)).cast('B')
+        _, blockSize, blockChecksum, contentChecksum = self._frameHeader(header, 0)
+        out = bytearray(MAX_DISTANCE + blockSize); history = 0
+        while True:
+            size = int.from_bytes(read(4), 'little')
+            if size == 0: break
+            block = memoryview(read(size & 0x7FFFFFFF)).cast('B')
+            if size & 0x80000000: o = history + len(block); out[history:o] = block
+            else: o = self.decompressBlock(block, 0, len(block), out, history)
+            yield bytes(out[history:o])
+            if blockChecksum: read(4)
+            history = min(o, MAX_DISTANCE)
+            out[0:history] = out[o - history:o]
+        if contentChecksum: read(4)
@@ -4,62 +4,84 @@ from io import BytesIO
 DICT_SIZE = 4096
 MIN_MATCH = 3
 MAX_MATCH = 18
+_SPACES = b' ' * DICT_SIZE
 
 class Lzss:
-    def __init__(self, stream: BytesIO, uncompressedSize: int):
-        self.stream = stream
+    # Fallout 1 / Cryptic LZSS: a stream of blocks, each prefixed by a big-endian int16 N.
+    # N < 0 copies -N raw bytes, N > 0 decodes N compressed bytes against a 4096 byte ring buffer, N == 0 ends.
+    # decoding works on a memoryview of the input with all state in locals, matches that neither wrap
+    # the ring buffer nor overlap themselves are copied as slices
+    def __init__(self, stream: BytesIO | bytes, uncompressedSize: int):
+        if hasattr(stream, 'read'): stream.seek(0, os.SEEK_SET); stream = stream.read()
+        self.data = memoryview(stream).cast('B')
         self.uncompressedSize = uncompressedSize
-        self.streamLength = stream.seek(0, os.SEEK_END)
-        stream.seek(0, os.SEEK_SET)
-        self.out = bytearray()
-        self.dict = bytearray()
-        self.NR = 0
-        self.DO = 0
-        self.DI = 0
-        self.OI = 0
-    
-    def _readByte(self) -> int: self.NR += 1; return int.from_bytes(self.stream.read(1), 'big', signed=False)
-    def _readInt16(self) -> int: return int.from_bytes(self.stream.read(2), 'big', signed=True)
-    def _readDict(self) -> int: ret = self.dict[self.DO % DICT_SIZE]; self.DO+=1; return ret
-    def _lastByte(self) -> bool: return self.stream.tell() == self.streamLength
-    def _readBlock(self, N):
-        s = self.stream
-        self.NR = 0
-        if N < 0: self._writeBytes(s.read(N * -1))
-        else:
-            self._clearDict()
-            while self.NR < N and not self._lastByte():
-                num1 = self._readByte()
-                if self.NR >= N or self._lastByte(): break
-                for index1 in range(8):
-                    if (num1 % 2) == 1:
-                        self._writeByte(self._readByte())
-                        if self.NR >= N: return
+
+    @staticmethod
+    def bound(stream: bytes) -> int:
+        # upper bound of the decoded size from the block headers alone, a 2 byte match yields at most 18 bytes
+        data = memoryview(stream).cast('B'); length = len(data)
+        p = 0; size = 0
+        while p + 2 <= length:
+            N = int.from_bytes(data[p:p + 2], 'big', signed = True); p += 2
+            if N == 0: break
+            size += min(-N, length - p) if N < 0 else N * (MAX_MATCH // 2)
+            p += abs(N)
+        return size
+
+    def decompress(self, output: bytearray = None) -> bytearray:
+        data = self.data; length = len(data); size = self.uncompressedSize
+        out = output if output is not None else bytearray(size); ring = bytearray(DICT_SIZE)
+        p = 0; o = 0
+        while p < length and o < size:
+            # block header, a short read at the end yields the bytes present
+            N = int.from_bytes(data[p:p + 2], 'big', signed = True); p = min(p + 2, length)
+            if N == 0: break
+            # raw block
+            if N < 0:
+                raw = data[p:p - N]; p += len(raw)
+                n = min(len(raw), size - o)
+                if n > 0: out[o:o + n] = raw[:n]; o += n
+                continue
+            # compressed block
+            ring[:] = _SPACES
+            di = DICT_SIZE - MAX_MATCH
+            end = p + N
+            while p < end and p < length:
+                flags = data[p]; p += 1
+                if p >= end or p >= length: break
+                # eight literals
+                if flags == 0xFF and p + 8 < end and p + 8 < length and o + 8 <= size and di + 8 <= DICT_SIZE:
+                    chunk = data[p:p + 8]; p += 8
+                    out[o:o + 8] = chunk; o += 8
+                    ring[di:di + 8] = chunk; di = (di + 8) & 0xFFF
+                    continue
+                for _ in range(8):
+                    if o >= size: break # a short output takes the leading bytes
+                    if flags & 1:
+                        b = data[p]; p += 1
+                        out[o] = b; o += 1
+                        ring[di] = b; di = (di + 1) & 0xFFF
+                        if p >= end: break
                     else:
-                        if self.NR >= N: return
-                        self.DO = self._readByte()
-                        if self.NR >= N: return
-                        num2 = self._readByte()
-                        self.DO |= ((num2 & 240) << 4) & 0xFFFF
-                        num3 = (num2 & 15) + MIN_MATCH
-                        for index2 in range(num3): self._writeByte(self._readDict())
-                    num1 >>= 1
-                    if self._lastByte(): return
-    def _clearDict(self) -> None:
-         for index in range(DICT_SIZE): self.dict[index] = 32
-         self.DI = DICT_SIZE - MAX_MATCH
-    def _writeByte(self, b) -> None: 
-        self.out[self.OI] = b; self.OI += 1
-        self.dict[self.DI % DICT_SIZE] = b; self.DI += 1
-    def _writeBytes(self, b) -> None:
-        for num in b:
-            if self.OI >= self.uncompressedSize: break
-            self.out[self.OI] = num; self.OI += 1
-    def decompress(self) -> bytearray:
-        self.out = bytearray(self.uncompressedSize)
-        self.dict = bytearray(DICT_SIZE)
-        while not self._lastByte():
-            N = self._readInt16()
-            if N != 0: self._readBlock(N)
-            else: break
-        return self.out
\ No newline at end of file
+                        if p >= end: break
+                        lo = data[p]; p += 1
+                        if p >= end: break
+                        hi = data[p] if p < length else 0; p += 1
+                        src = (lo | ((hi & 0xF0) << 4)) & 0xFFF
+                        n = (hi & 0x0F) + MIN_MATCH
+                        if o + n <= size and src + n <= DICT_SIZE and di + n <= DICT_SIZE and (src + n <= di or di + n <= src or src < di):
+                            # a match overlapping its own output repeats the period between src and di
+                            chunk = ring[src:src + n] if src + n <= di or di + n <= src else (ring[src:di] * (n // (di - src) + 1))[:n]
+                            ring[di:di + n] = chunk; out[o:o + n] = chunk
+                            o += n; di = (di + n) & 0xFFF
+                        else:
+                            for _ in range(min(n, size - o)):
+                                b = ring[src]; src = (src + 1) & 0xFFF
+                                out[o] = b; o += 1
+                                ring[di] = b; di = (di + 1) & 0xFFF
+                    flags >>= 1
+                    if p >= length: break
+                else: continue
+                break
+        self.written = o
+        return out
@@ -5,8 +5,13 @@ from .pak import *
 from .platform import Platform
 # from .util import _value
 
-init()
 # print(family.families)
 
-unknown = getFamily('Unknown')
-unknownPakFile = unknown.openPakFile('game:/#APP', throwOnError = False)
+# families load on first use, see Families
+def __getattr__(name: str) -> object:
+    match name:
+        case 'unknown': value = getFamily('Unknown')
+        case 'unknownPakFile': value = __getattr__('unknown').openPakFile('game:/#APP', throwOnError = False)
+        case _: raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    globals()[name] = value
+    return value
@@ -0,0 +1,386 @@
+from __future__ import annotations
+import sys, os, struct, hashlib, threading, pickle
+from array import array
+from collections import OrderedDict
+from gamex.meta import FileSource, FileTable
+
+# typedefs
+class BinaryPakFile: pass
+
+#region IndexCache
+
+# IndexCache
+class IndexCache:
+    # Persists the FileSource table built by PakBinary.read, so a warm open skips header parsing.
+    # An entry is invalidated when:
+    #  - the cache VERSION changes
+    #  - the archive size or mtime changes
+    #  - anything else read() depends on changes (PakBinary.indexDependencies, e.g. an external name list)
+    #  - the game or PakBinary type reading the archive changes
+    #  - the file cannot be decoded
+    MAGIC = b'GXIC'
+    VERSION = 4
+    enabled: bool = not os.getenv('GAMEX_NO_INDEX_CACHE')
+    root: str = os.getenv('GAMEX_INDEX_CACHE') or os.path.join(os.path.expanduser('~'), '.cache', 'gamex', 'index')
+
+    class Uncacheable(Exception): pass
+
+    @staticmethod
+    def physicalPath(source: BinaryPakFile) -> str:
+        from gamex.file import StandardFileSystem
+        fileSystem = source.fileSystem
+        if not source.pakPath or not isinstance(fileSystem, StandardFileSystem): return None
+        return os.path.abspath(os.path.join(fileSystem.root, source.pakPath))
+
+    @staticmethod
+    def keyOf(source: BinaryPakFile, path: str) -> str:
+        return f'{type(source.pakBinary).__qualname__}:{source.game.id}:{path}'
+
+    @staticmethod
+    def cachePath(key: str) -> str:
+        return os.path.join(IndexCache.root, f'{hashlib.sha1(key.encode("utf-8")).hexdigest()}.idx')
+
+    @staticmethod
+    def usable(source: BinaryPakFile) -> bool:
+        return IndexCache.enabled and source.useIndexCache and source.useNames and \
+            source.pakBinary is not None and source.pakBinary.indexCache
+
+    # load
+    @staticmethod
+    def load(source: BinaryPakFile) -> bool:
+        if not IndexCache.usable(source) or not (path := IndexCache.physicalPath(source)): return False
+        key = IndexCache.keyOf(source, path)
+        cachePath = IndexCache.cachePath(key)
+        try:
+            with open(cachePath, 'rb') as f: body = f.read()
+            st = os.stat(path); dependencies = source.pakBinary.indexDependencies(source)
+            r = _Decoder(body)
+            if r.read(4) != IndexCache.MAGIC or r.unpack('<H') != IndexCache.VERSION: raise ValueError('version')
+            if r.value() != key or r.value() != st.st_size or r.value() != st.st_mtime_ns: raise ValueError('stale')
+            if [r.value() for _ in range(r.value())] != dependencies: raise ValueError('stale dependencies')
+            if r.value() != sys.byteorder: raise ValueError('byteorder')
+            magic, version, tag = r.value(), r.value(), r.value()
+            if r.value(): files = IndexCache.loadTable(r)
+            else:
+                files = [None] * r.value()
+                for i in range(len(files)):
+                    files[i] = FileSource(
+                        id = r.value(),
+                        path = r.value(),
+                        offset = r.value(),
+                        fileSize = r.value(),
+                        packedSize = r.value(),
+                        compressed = r.value(),
+                        flags = r.value(),
+                        hash = r.value(),
+                        data = r.value(),
+                        tag = r.value())
+        except FileNotFoundError: return False
+        except Exception as e:
+            print(f'IndexCache: dropping {cachePath}: {e}')
+            IndexCache.remove(cachePath)
+            return False
+        source.magic = magic
+        source.version = version
+        source.tag = tag
+        source.files = files
+        return True
+
+    # save
+    @staticmethod
+    def save(source: BinaryPakFile) -> bool:
+        if not IndexCache.usable(source) or source.files is None or not (path := IndexCache.physicalPath(source)): return False
+        key = IndexCache.keyOf(source, path)
+        cachePath = IndexCache.cachePath(key)
+        try:
+            st = os.stat(path); dependencies = source.pakBinary.indexDependencies(source)
+            w = _Encoder()
+            w.write(IndexCache.MAGIC); w.pack('<H', IndexCache.VERSION)
+            w.value(key); w.value(st.st_size); w.value(st.st_mtime_ns)
+            w.value(len(dependencies))
+            for v in dependencies: w.value(v)
+            w.value(sys.byteorder)
+            w.value(source.magic); w.value(source.version); w.value(source.tag)
+            if isinstance(source.files, FileTable): w.value(True); IndexCache.saveTable(w, source.files)
+            else:
+                w.value(False); w.value(len(source.files))
+                for file in source.files:
+                    if file.pak or file.parts: raise IndexCache.Uncacheable('nested pak')
+                    w.value(file.id); w.value(file.path); w.value(file.offset)
+                    w.value(file.fileSize); w.value(file.packedSize); w.value(file.compressed)
+                    w.value(file.flags); w.value(file.hash); w.value(file.data); w.value(file.tag)
+        except IndexCache.Uncacheable: return False
+        except OSError: return False
+        os.makedirs(IndexCache.root, exist_ok = True)
+        tempPath = f'{cachePath}.{os.getpid()}.tmp'
+        try:
+            with open(tempPath, 'wb') as f: f.write(w.b)
+            os.replace(tempPath, cachePath)
+        except OSError: IndexCache.remove(tempPath); return False
+        return True
+
+    # FileTable columns are written as raw arrays
+    @staticmethod
+    def saveTable(w: _Encoder, files: FileTable) -> None:
+        for name in FileTable.columns + ['hash', 'pathEnd'] + FileTable.interned: w.value(getattr(files, name).tobytes())
+        w.value(bytes(files.blob))
+        for name in FileTable.interned:
+            values = getattr(files, f'{name}Values')
+            w.value(len(values))
+            for v in values: w.value(v)
+        w.value(len(files.extras))
+        for i, extra in files.extras.items():
+            if 'pak' in extra or 'parts' in extra: raise IndexCache.Uncacheable('nested pak')
+            w.value(i); w.value(len(extra))
+            for k, v in extra.items(): w.value(k); w.value(v)
+
+    @staticmethod
+    def loadTable(r: _Decoder) -> FileTable:
+        files = FileTable()
+        for name in FileTable.columns + ['hash', 'pathEnd'] + FileTable.interned: getattr(files, name).frombytes(r.value())
+        files.blob = bytearray(r.value())
+        for name in FileTable.interned:
+            values = [r.value() for _ in range(r.value())]
+            setattr(files, f'{name}Values', values)
+            setattr(files, f'{name}Map', {v:i for i, v in enumerate(values)})
+        for _ in range(r.value()):
+            i = r.value()
+            files.extras[i] = {r.value():r.value() for _ in range(r.value())}
+        return files
+
+    # invalidate
+    @staticmethod
+    def invalidate(source: BinaryPakFile) -> None:
+        if path := IndexCache.physicalPath(source): IndexCache.remove(IndexCache.cachePath(IndexCache.keyOf(source, path)))
+
+    @staticmethod
+    def remove(path: str) -> None:
+        try: os.remove(path)
+        except OSError: pass
+
+# value tags
+_NONE = 0; _INT = 1; _STR = 2; _BYTES = 3; _TRUE = 4; _FALSE = 5
+
+# _Encoder
+class _Encoder:
+    def __init__(self): self.b = bytearray()
+    def write(self, v: bytes) -> None: self.b += v
+    def pack(self, fmt: str, *v) -> None: self.b += struct.pack(fmt, *v)
+    def length(self, n: int) -> None:
+        b = self.b
+        while n >= 0x80: b.append((n & 0x7F) | 0x80); n >>= 7
+        b.append(n)
+    def value(self, v: object) -> None:
+        b = self.b
+        match v:
+            case None: b.append(_NONE)
+            case True: b.append(_TRUE)
+            case False: b.append(_FALSE)
+            case int(): z = v.to_bytes((v.bit_length() + 8) // 8, 'little', signed = True); b.append(_INT); self.length(len(z)); b += z
+            case str(): z = v.encode('utf-8'); b.append(_STR); self.length(len(z)); b += z
+            case bytes() | bytearray(): b.append(_BYTES); self.length(len(v)); b += v
+            case _: raise IndexCache.Uncacheable(f'{type(v).__name__}')
+
+# _Decoder
+class _Decoder:
+    def __init__(self, b: bytes): self.b = b; self.p = 0
+    def read(self, n: int) -> bytes: p = self.p; self.p += n; return self.b[p:self.p]
+    def unpack(self, fmt: str) -> object: v = struct.unpack_from(fmt, self.b, self.p); self.p += struct.calcsize(fmt); return v[0]
+    def length(self) -> int:
+        b = self.b; n = 0; shift = 0
+        while True:
+            c = b[self.p]; self.p += 1
+            n |= (c & 0x7F) << shift
+            if c < 0x80: return n
+            shift += 7
+    def value(self) -> object:
+        t = self.b[self.p]; self.p += 1
+        match t:
+            case 0: return None
+            case 1: return int.from_bytes(self.read(self.length()), 'little', signed = True)
+            case 2: return self.read(self.length()).decode('utf-8')
+            case 3: return self.read(self.length())
+            case 4: return True
+            case 5: return False
+            case _: raise ValueError(f'Unknown tag: {t}')
+
+#endregion
+
+#region ObjectCache
+
+# ObjectCache
+class ObjectCache:
+    # decoded objects from loadFileObject, keyed by (pak, file, type, option) and bounded by their estimated size.
+    # the least recently used entry is evicted first, and a pak's entries are dropped when it closes.
+    # files key by (path, offset, id) so FileTable views rebuilt between calls still hit.
+    # a hit returns the same instance to every caller, so a pak opts in (BinaryPakFile.objectCache) only when
+    # its factories build immutable results, not readers or objects holding frame buffers
+    MISS = object()
+    maxBytes: int = int(os.getenv('GAMEX_OBJECT_CACHE') or 256 * 1024 * 1024)
+    default: ObjectCache = None
+
+    def __init__(self, maxBytes: int = None):
+        self.maxBytes = maxBytes if maxBytes is not None else ObjectCache.maxBytes
+        self.entries: OrderedDict[tuple, (object, int)] = OrderedDict()
+        self.byPak: dict[object, set[tuple]] = {}
+        self.size = 0
+        self.lock = threading.Lock()
+        # stats
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    def __repr__(self): return f'objects:{len(self.entries)}@{self.size}/{self.maxBytes}'
+    def __len__(self) -> int: return len(self.entries)
+
+    @staticmethod
+    def keyOf(pak: object, file: FileSource, type: type, option: object = None) -> tuple: return (pak, file.path, file.offset, file.id, type, option)
+
+    @staticmethod
+    def sizeOf(value: object, file: FileSource) -> int:
+        if (nbytes := getattr(value, 'nbytes', None)) is not None: return nbytes
+        if isinstance(value, (bytes, bytearray, memoryview)): return len(value)
+        return max(file.fileSize or 0, sys.getsizeof(value))
+
+    def get(self, pak: object, file: FileSource, type: type, option: object = None) -> object:
+        key = self.keyOf(pak, file, type, option)
+        with self.lock:
+            if (entry := self.entries.get(key)) is None: self.misses += 1; return ObjectCache.MISS
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, pak: object, file: FileSource, type: type, option: object, value: object) -> object:
+        size = self.sizeOf(value, file)
+        if size > self.maxBytes: return value
+        key = self.keyOf(pak, file, type, option)
+        with self.lock:
+            if (entry := self.entries.pop(key, None)) is not None: self.size -= entry[1]
+            self.entries[key] = (value, size)
+            self.byPak.setdefault(pak, set()).add(key)
+            self.size += size
+            while self.size > self.maxBytes:
+                key, (_, size) = self.entries.popitem(last = False)
+                self._unlink(key); self.size -= size
+                self.evictions += 1
+        return value
+
+    def _unlink(self, key: tuple) -> None:
+        if (keys := self.byPak.get(key[0])) is not None:
+            keys.discard(key)
+            if not keys: del self.byPak[key[0]]
+
+    def invalidate(self, pak: object = None) -> None:
+        with self.lock:
+            if pak is None: self.entries.clear(); self.byPak.clear(); self.size = 0; return
+            for key in self.byPak.pop(pak, ()):
+                if (entry := self.entries.pop(key, None)) is not None: self.size -= entry[1]
+
+    def stats(self) -> dict[str, object]:
+        with self.lock: return { 'count': len(self.entries), 'size': self.size, 'maxBytes': self.maxBytes, 'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions }
+
+ObjectCache.default = ObjectCache()
+
+#endregion
+
+#region FormIdCache
+
+# FormIdCache
+class FormIdCache:
+    # FormIdIndex arrays for a load order, kept beside the index cache and keyed by the plugin paths in order.
+    # An entry is invalidated when the cache VERSION changes or any plugin changes size or mtime
+    MAGIC = b'GXFI'
+    VERSION = 2
+    columns = ['keys', 'winners', 'records', 'positions']
+
+    @staticmethod
+    def cachePath(paths: list[str]) -> str:
+        return os.path.join(IndexCache.root, f'{hashlib.sha1("\n".join(paths).encode("utf-8")).hexdigest()}.fid')
+
+    # load
+    @staticmethod
+    def load(paths: list[str], index: object) -> bool:
+        if not IndexCache.enabled: return False
+        paths = [os.path.abspath(x) for x in paths]
+        cachePath = FormIdCache.cachePath(paths)
+        try:
+            with open(cachePath, 'rb') as f: body = f.read()
+            r = _Decoder(body)
+            if r.read(4) != FormIdCache.MAGIC or r.unpack('<H') != FormIdCache.VERSION: raise ValueError('version')
+            if r.value() != sys.byteorder: raise ValueError('byteorder')
+            for path in paths:
+                st = os.stat(path)
+                if r.value() != path or r.value() != st.st_size or r.value() != st.st_mtime_ns: raise ValueError('stale')
+            plugins = [r.value() for _ in range(r.value())]
+            masters = [[r.value() for _ in range(r.value())] for _ in plugins]
+            columns = [r.value() for _ in FormIdCache.columns]
+        except FileNotFoundError: return False
+        except Exception as e:
+            print(f'FormIdCache: dropping {cachePath}: {e}')
+            IndexCache.remove(cachePath)
+            return False
+        index.plugins = plugins; index.masters = masters
+        for name, column in zip(FormIdCache.columns, columns): getattr(index, name).frombytes(column)
+        return True
+
+    # save
+    @staticmethod
+    def save(paths: list[str], index: object) -> bool:
+        if not IndexCache.enabled: return False
+        paths = [os.path.abspath(x) for x in paths]
+        cachePath = FormIdCache.cachePath(paths)
+        try:
+            w = _Encoder()
+            w.write(FormIdCache.MAGIC); w.pack('<H', FormIdCache.VERSION); w.value(sys.byteorder)
+            for path in paths: st = os.stat(path); w.value(path); w.value(st.st_size); w.value(st.st_mtime_ns)
+            w.value(len(index.plugins))
+            for plugin in index.plugins: w.value(plugin)
+            for masters in index.masters:
+                w.value(len(masters))
+                for master in masters: w.value(master)
+            for name in FormIdCache.columns: w.value(getattr(index, name).tobytes())
+        except OSError: return False
+        os.makedirs(IndexCache.root, exist_ok = True)
+        tempPath = f'{cachePath}.{os.getpid()}.tmp'
+        try:
+            with open(tempPath, 'wb') as f: f.write(w.b)
+            os.replace(tempPath, cachePath)
+        except OSError: IndexCache.remove(tempPath); return False
+        return True
+
+#endregion
+
+#region SpecCache
+
+# SpecCache
+class SpecCache:
+    # Parsed Specs/*.json documents, keyed by a hash of the source text so an edited spec reparses.
+    # Stripping comments and json.loads dominate startup, a pickle load of the result does not.
+    VERSION = 1
+    enabled: bool = not os.getenv('GAMEX_NO_SPEC_CACHE')
+    root: str = os.getenv('GAMEX_SPEC_CACHE') or os.path.join(os.path.expanduser('~'), '.cache', 'gamex', 'specs')
+
+    @staticmethod
+    def cachePath(body: str) -> str:
+        return os.path.join(SpecCache.root, f'{hashlib.sha1(f"{SpecCache.VERSION}:{body}".encode("utf-8")).hexdigest()}.pickle')
+
+    # load
+    @staticmethod
+    def load(body: str, parse: callable) -> dict[str, object]:
+        if not SpecCache.enabled: return parse(body)
+        cachePath = SpecCache.cachePath(body)
+        try:
+            with open(cachePath, 'rb') as f: return pickle.load(f)
+        except FileNotFoundError: pass
+        except Exception as e:
+            print(f'SpecCache: dropping {cachePath}: {e}')
+            IndexCache.remove(cachePath)
+        elem = parse(body)
+        tempPath = f'{cachePath}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(SpecCache.root, exist_ok = True)
+            with open(tempPath, 'wb') as f: pickle.dump(elem, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tempPath, cachePath)
+        except OSError: IndexCache.remove(tempPath)
+        return elem
+
+#endregion
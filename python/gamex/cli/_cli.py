@@ -5,6 +5,7 @@ from typing import Any, List, Type, Optional
 from typing_extensions import ClassVar
 from pydantic import BaseModel, ValidationError
 from .. import __version__
+from ..cache import IndexCache
 from ._utils import can_use_http2
 from ._errors import CLIError, display_error
 from ._main import register_commands
@@ -19,6 +20,7 @@ class Arguments(BaseModel):
     verbosity: int
     version: Optional[str] = None
     proxy: Optional[List[str]]
+    no_index_cache: bool = False
     # internal, set by subparsers to parse their specific args
     args_model: Optional[Type[BaseModel]] = None
     # internal, used so that subparsers can forward unknown arguments
@@ -30,6 +32,7 @@ def _build_parser() -> argparse.ArgumentParser:
     parser.add_argument("-v", "--verbose", action="count", dest="verbosity", default=0, help="set verbosity")
     parser.add_argument("-V", "--version", action="version", version="%(prog)s " + __version__)
     parser.add_argument("-p", "--proxy", nargs="+", help="set proxy to use")
+    parser.add_argument("--no-index-cache", action="store_true", dest="no_index_cache", help="ignore and do not write the pak index cache")
     def help() -> None: parser.print_help()
     parser.set_defaults(func=help)
     register_commands(parser)
@@ -76,6 +79,8 @@ def _main() -> None:
     if args.verbosity != 0:
         sys.stderr.write("Warning: --verbosity isn't supported yet\n")
 
+    if args.no_index_cache: IndexCache.enabled = False
+
     proxies = {}
     if args.proxy is not None:
         for proxy in args.proxy:
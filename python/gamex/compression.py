@@ -1,22 +1,262 @@
-from __future__ import annotations
-from io import BytesIO
-
-def decompressUnknown(r: Reader, length: int, newLength: int) -> bytes: raise NotImplementedError()
-def decompressZlib(r: Reader, length: int, newLength: int, noHeader: bool = False, full: bool = True) -> bytes: 
-    import zlib
-    return \
-        zlib.decompress(r.readBytes(length), wbits = (-15 if noHeader else 0)) if full else \
-        zlib.decompressobj(wbits = (-15 if noHeader else 0)).decompress(r.readBytes(length))
-def decompressZstd(r: Reader, length: int, newLength: int) -> bytes: raise NotImplementedError()
-def decompressLzss(r: Reader, length: int, newLength: int) -> bytes:
-    from ._LIB.compression.lzss import Lzss
-    return Lzss(BytesIO(r.readBytes(length)), newLength).decompress()
-def decompressBlast(r: Reader, length: int, newLength: int) -> bytes:
-    from ._LIB.compression.blast import Blast
-    decoder = Blast()
-    fs = r.readBytes(length)
-    os = bytearray(newLength)
-    decoder.decompress(fs, os)
-    return os
-def decompressLz4(r: Reader, length: int, newLength: int) -> bytes: raise NotImplementedError()
-# def decompressZlib2(r: Reader, length: int, newLength: int) -> bytes: raise NotImplementedError()
\ No newline at end of file
+from __future__ import annotations
+import threading, time
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+#region Offload
+
+# pure-Python codecs hold the GIL, so a thread that opts in sends them to a process pool
+offloadMin = 32 * 1024
+_local = threading.local()
+_processPool = None
+_processLock = threading.Lock()
+
+def processPool(workers: int = None) -> ProcessPoolExecutor:
+    global _processPool
+    with _processLock:
+        if _processPool is None: _processPool = ProcessPoolExecutor(workers)
+        return _processPool
+
+def offloadTo(executor: Executor) -> None: _local.executor = executor
+
+def _offload(func: callable, data: bytes, newLength: int) -> bytes:
+    executor = getattr(_local, 'executor', None)
+    return executor.submit(func, data, newLength).result() if executor and newLength >= offloadMin else \
+        func(data, newLength)
+
+def _lzss(data: bytes, newLength: int) -> bytes:
+    from ._LIB.compression.lzss import Lzss
+    if newLength > 0: return Lzss(data, newLength).decompress()
+    # unknown length, decode into the bound from the block headers and trim
+    lzss = Lzss(data, Lzss.bound(data)); os = lzss.decompress()
+    del os[lzss.written:]
+    return os
+
+def _blast(data: bytes, newLength: int) -> bytes:
+    from ._LIB.compression.blast import Blast
+    if newLength <= 0: return bytearray(b''.join(Blast().stream((data,)))) # unknown length, grow chunk by chunk
+    os = bytearray(newLength)
+    Blast().decompress(data, os)
+    return os
+
+def _lz4(data: bytes, newLength: int) -> bytes:
+    from ._LIB.compression.lz4 import Lz4
+    if newLength <= 0:
+        # unknown length, a frame grows block by block, a raw block has no end marker to size it
+        if not Lz4.isFrame(data): raise NotImplementedError('lz4 blocks need newLength')
+        r = memoryview(data); p = 0
+        def read(n: int) -> bytes: nonlocal p; p += n; return r[p - n:p]
+        return bytearray(b''.join(Lz4().stream(read)))
+    os = bytearray(newLength)
+    if (n := Lz4().decompress(data, os)) != newLength: del os[n:]
+    return os
+
+def _chunks(r: Reader, length: int, chunkSize: int):
+    while length > 0: n = min(length, chunkSize); length -= n; yield r.readBytes(n)
+
+#endregion
+
+#region Contexts
+
+# decompression contexts are not thread-safe, each thread keeps its own and reuses it across calls
+
+def _zstdContext() -> object:
+    if (dctx := getattr(_local, 'zstd', None)) is None:
+        try: import zstandard; dctx = zstandard.ZstdDecompressor()
+        except ImportError: dctx = False
+        _local.zstd = dctx
+    return dctx
+
+def _lz4Module() -> object:
+    try: import lz4.block, lz4.frame; return lz4
+    except ImportError: return None
+
+def _lz4FrameContext() -> object:
+    if (dctx := getattr(_local, 'lz4', None)) is None: dctx = _local.lz4 = _lz4Module().frame.LZ4FrameDecompressor()
+    return dctx
+
+#endregion
+
+#region Codecs
+
+# Codec
+class Codec:
+    # a decoder registered under an id. decodeInto fills dst and returns the bytes written, never more than len(dst):
+    # a short dst takes the leading bytes and an empty one none. decode allocates newLength bytes, or grows as needed
+    # when newLength is unknown (<= 0)
+    id: str = None
+    def __repr__(self): return f'codec:{self.id}'
+    def decodeInto(self, src: bytes, dst: bytearray) -> int: raise NotImplementedError()
+    def decode(self, src: bytes, newLength: int = -1) -> bytes:
+        if newLength <= 0: raise NotImplementedError(f'{self.id} needs newLength')
+        dst = bytearray(newLength)
+        if (n := self.decodeInto(src, dst)) != newLength: del dst[n:]
+        return dst
+
+# ZlibCodec
+class ZlibCodec(Codec):
+    def __init__(self, id: str, wbits: int): self.id = id; self.wbits = wbits
+    def decodeInto(self, src: bytes, dst: bytearray) -> int:
+        import zlib
+        if not dst: return 0 # max_length 0 is unlimited to zlib
+        data = zlib.decompressobj(wbits = self.wbits).decompress(src, len(dst))
+        dst[:len(data)] = data
+        return len(data)
+    def decode(self, src: bytes, newLength: int = -1) -> bytes:
+        import zlib
+        return zlib.decompress(src, wbits = self.wbits, bufsize = newLength if newLength > 0 else zlib.DEF_BUF_SIZE)
+
+# LzssCodec
+class LzssCodec(Codec):
+    id = 'lzss'
+    def decodeInto(self, src: bytes, dst: bytearray) -> int:
+        from ._LIB.compression.lzss import Lzss
+        lzss = Lzss(src, len(dst)); lzss.decompress(dst)
+        return lzss.written
+    def decode(self, src: bytes, newLength: int = -1) -> bytes: return _offload(_lzss, src, newLength)
+
+# BlastCodec
+class BlastCodec(Codec):
+    id = 'blast'
+    def decodeInto(self, src: bytes, dst: bytearray) -> int:
+        from ._LIB.compression.blast import Blast
+        return Blast().decompress(src, dst)
+    def decode(self, src: bytes, newLength: int = -1) -> bytes: return _offload(_blast, src, newLength)
+
+# Lz4Codec
+class Lz4Codec(Codec):
+    # frame or raw block, told apart by the frame magic. lz4 when installed, else the pure-Python decoder
+    id = 'lz4'
+    def _decode(self, lz4: object, src: bytes, newLength: int) -> bytes:
+        if src[0:4] != b'\x04\x22\x4d\x18':
+            # a raw block carries no size, lz4 would read one from its first 4 bytes
+            if newLength <= 0: raise NotImplementedError('lz4 blocks need newLength')
+            return lz4.block.decompress(src, uncompressed_size = newLength)
+        dctx = _lz4FrameContext()
+        try: return dctx.decompress(src, max_length = newLength if newLength > 0 else -1)
+        finally: dctx.reset()
+    def decodeInto(self, src: bytes, dst: bytearray) -> int:
+        if not dst: return 0
+        if not (lz4 := _lz4Module()):
+            from ._LIB.compression.lz4 import Lz4
+            return Lz4().decompress(src, dst)
+        try: data = self._decode(lz4, src, len(dst))
+        except lz4.block.LZ4BlockError:
+            # lz4 cannot stop a block early, the pure-Python decoder fills a short dst or raises on corrupt input
+            from ._LIB.compression.lz4 import Lz4
+            return Lz4().decompress(src, dst)
+        dst[:len(data)] = data
+        return len(data)
+    def decode(self, src: bytes, newLength: int = -1) -> bytes:
+        return self._decode(lz4, src, newLength) if (lz4 := _lz4Module()) else _offload(_lz4, src, newLength)
+
+# ZstdCodec
+class ZstdCodec(Codec):
+    # zstandard when installed, else the standard library's compression.zstd (3.14+)
+    id = 'zstd'
+    @staticmethod
+    def _stdlib() -> object:
+        try: from compression import zstd; return zstd
+        except ImportError: raise NotImplementedError('zstd needs the zstandard package')
+    def decodeInto(self, src: bytes, dst: bytearray) -> int:
+        if not dst: return 0
+        if not (dctx := _zstdContext()):
+            data = self._stdlib().ZstdDecompressor().decompress(src, max_length = len(dst))
+            dst[:len(data)] = data
+            return len(data)
+        view = memoryview(dst); n = 0
+        with dctx.stream_reader(src) as reader:
+            while n < len(dst) and (k := reader.readinto(view[n:])): n += k
+        return n
+    def decode(self, src: bytes, newLength: int = -1) -> bytes:
+        if newLength > 0: return super().decode(src, newLength)
+        return dctx.decompress(src) if (dctx := _zstdContext()) else self._stdlib().decompress(src)
+
+# CodecRegistry
+class CodecRegistry:
+    # codec id -> Codec, with per-codec counters so the dominant codec in an extraction shows up.
+    # register replaces a codec in place, e.g. to swap in a faster backend, without touching format readers
+    def __init__(self):
+        self.codecs: dict[str, Codec] = {}
+        self.counters: dict[str, list] = {}
+        self.lock = threading.Lock()
+    def __repr__(self): return f'codecs:{list(self.codecs)}'
+    def __contains__(self, id: str) -> bool: return id in self.codecs
+
+    def register(self, codec: Codec, id: str = None) -> Codec:
+        with self.lock:
+            self.codecs[id or codec.id] = codec
+            self.counters.setdefault(id or codec.id, [0, 0, 0, 0., 0])
+        return codec
+
+    def get(self, id: str) -> Codec:
+        if (codec := self.codecs.get(id)) is None: raise NotImplementedError(f'Unknown codec: {id}')
+        return codec
+
+    def _count(self, id: str, bytesIn: int, bytesOut: int, elapsed: float, error: bool) -> None:
+        with self.lock:
+            c = self.counters[id]
+            c[0] += 1; c[1] += bytesIn; c[2] += bytesOut; c[3] += elapsed
+            if error: c[4] += 1
+
+    def decodeInto(self, id: str, src: bytes, dst: bytearray) -> int:
+        codec = self.get(id); start = time.perf_counter(); n = 0
+        try: n = codec.decodeInto(src, dst); return n
+        finally: self._count(id, len(src), n, time.perf_counter() - start, n == 0 and len(dst) > 0)
+
+    def decode(self, id: str, src: bytes, newLength: int = -1) -> bytes:
+        codec = self.get(id); start = time.perf_counter(); data = None
+        try: data = codec.decode(src, newLength); return data
+        finally: self._count(id, len(src), len(data) if data is not None else 0, time.perf_counter() - start, data is None)
+
+    def metrics(self) -> dict[str, dict[str, object]]:
+        with self.lock: return { k:{ 'calls': c[0], 'bytesIn': c[1], 'bytesOut': c[2], 'time': round(c[3], 4), 'errors': c[4],
+            'mbps': round(c[2] / c[3] / 1e6, 2) if c[3] else 0. } for k, c in self.counters.items() }
+
+    def reset(self) -> None:
+        with self.lock:
+            for k in self.counters: self.counters[k] = [0, 0, 0, 0., 0]
+
+codecs = CodecRegistry()
+codecs.register(ZlibCodec('zlib', 0))
+codecs.register(ZlibCodec('deflate', -15))
+codecs.register(LzssCodec())
+codecs.register(BlastCodec())
+codecs.register(Lz4Codec())
+codecs.register(ZstdCodec())
+
+#endregion
+
+def decompress(id: str, r: Reader, length: int, newLength: int) -> bytes: return codecs.decode(id, r.readBytes(length), newLength)
+def decompressUnknown(r: Reader, length: int, newLength: int) -> bytes: raise NotImplementedError()
+def decompressZlib(r: Reader, length: int, newLength: int, noHeader: bool = False, full: bool = True) -> bytes: 
+    import zlib
+    return \
+        codecs.decode('deflate' if noHeader else 'zlib', r.readBytes(length), newLength) if full else \
+        zlib.decompressobj(wbits = (-15 if noHeader else 0)).decompress(r.readBytes(length))
+def decompressZstd(r: Reader, length: int, newLength: int, full: bool = True) -> bytes:
+    if full: return codecs.decode('zstd', r.readBytes(length), newLength)
+    data = r.readBytes(length)
+    return dctx.decompressobj().decompress(data) if (dctx := _zstdContext()) else ZstdCodec._stdlib().ZstdDecompressor().decompress(data)
+def decompressZstdStream(r: Reader, length: int, chunkSize: int = 65536):
+    # yields decoded chunks as input is read, for payloads that should not be held whole
+    dobj = dctx.decompressobj() if (dctx := _zstdContext()) else ZstdCodec._stdlib().ZstdDecompressor()
+    for chunk in _chunks(r, length, chunkSize):
+        if data := dobj.decompress(chunk): yield data
+def decompressLzss(r: Reader, length: int, newLength: int) -> bytes: return codecs.decode('lzss', r.readBytes(length), newLength)
+def decompressBlast(r: Reader, length: int, newLength: int) -> bytes: return codecs.decode('blast', r.readBytes(length), newLength)
+def decompressBlastStream(r: Reader, length: int, chunkSize: int = 65536):
+    # yields decoded chunks, for entries too large to hold twice
+    from ._LIB.compression.blast import Blast
+    return Blast().stream(_chunks(r, length, chunkSize), chunkSize)
+def decompressLz4(r: Reader, length: int, newLength: int) -> bytes: return codecs.decode('lz4', r.readBytes(length), newLength)
+def decompressLz4Stream(r: Reader, length: int, chunkSize: int = 65536):
+    # yields decoded chunks of a frame as input is read
+    if lz4 := _lz4Module():
+        dctx = lz4.frame.LZ4FrameDecompressor()
+        for chunk in _chunks(r, length, chunkSize):
+            if data := dctx.decompress(chunk): yield data
+        return
+    from ._LIB.compression.lz4 import Lz4
+    end = r.tell() + length
+    yield from Lz4().stream(lambda n: r.readBytes(min(n, end - r.tell())))
+# def decompressZlib2(r: Reader, length: int, newLength: int) -> bytes: raise NotImplementedError()
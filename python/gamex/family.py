@@ -1,12 +1,13 @@
 from __future__ import annotations
-import os, json, glob, re, random
+import os, json, glob, re, random, threading
 from typing import Any
 from urllib.parse import urlparse
 from importlib import resources
 from openstk.poly import findType
 from gamex import familyKeys
 from gamex.pak import PakState, ManyPakFile, MultiPakFile
-from gamex.file import FileManager, HostFileSystem, StandardFileSystem, VirtualFileSystem
+from gamex.cache import SpecCache
+from gamex.file import FileManager, HostFileSystem, StandardFileSystem, VirtualFileSystem, ZipFileSystem, ZipIsoFileSystem
 from gamex.platform import Platform
 from .util import _throw, _value, _list, _method, _related, _dictTrim
 
@@ -404,7 +405,6 @@ class FamilyGame:
 
     # create PakFile
     def createPakFile(self, fileSystem: IFileSystem, edition: Edition, searchPattern: str, throwOnError: bool) -> PakFile:
-        if isinstance(fileSystem, HostFileSystem): raise Exception('HostFileSystem not supported')
         searchPattern = self.createSearchPatterns(searchPattern)
         pakFiles = []
         dlcKeys = [x[0] for x in self.dlcs.items() if x[1].path]
@@ -417,7 +417,7 @@ class FamilyGame:
                             pakFiles.append(self.createPakFileObj(fileSystem, edition, path))
                 else:
                     pakFiles.append(self.createPakFileObj(fileSystem, edition,
-                        (p[0], [x for x in p[1] if x.find(slash) >= 0]) if self.searchBy == 'DirDown' else p))
+                        (p[0], [x for x in p[1] if x.find(slash) >= 0] if self.searchBy == 'DirDown' else list(p[1]))))
         return FamilyGame.withPlatform(pakFiles[0] if len(pakFiles) == 1 else self.createPakFileObj(fileSystem, edition, pakFiles))
 
     # create createPakFileObj
@@ -446,32 +446,82 @@ class FamilyGame:
         for path in self.paths or ['']:
             searchPath = os.path.join(path, dlc.path) if dlc and dlc.path else path
             fileSearch = fileSystem.findPaths(searchPath, searchPattern)
-            if ignores: fileSearch = [x for x in fileSearch if not os.path.basename(x) in ignores]
-            yield (path, list(fileSearch))
+            if ignores: fileSearch = (x for x in fileSearch if not os.path.basename(x) in ignores)
+            yield (path, fileSearch)
 
     # is a PakFile
     def isPakFile(self, path: str) -> bool:
         return self.pakExts and any([x for x in self.pakExts if path.endswith(x)])
 # end::FamilyGame[]
 
-families = {}
+# Families
+class Families(dict):
+    # families by id, each built from its spec on first lookup. iterating builds the rest,
+    # in familyKeys order, so a single-family job never parses or imports the others
+    lock = threading.RLock()
+    def __init__(self, keys: list[str]):
+        super().__init__()
+        self.order = {k:i for i, k in enumerate(keys)}
+        self.pending = dict.fromkeys(keys)
+        self.loadSamples = True
+    @property
+    def loaded(self) -> bool: return not self.pending
+
+    def find(self, id: str) -> Family:
+        if (family := dict.get(self, id)) is not None or not self.pending: return family
+        with self.lock:
+            if id in self.pending: self.add(id)
+            elif not dict.__contains__(self, id): self.load()
+        return dict.get(self, id)
+
+    def add(self, key: str) -> Family:
+        family = createFamily(f'{key}Family.json', _loadJson, self.loadSamples)
+        del self.pending[key]
+        self.order[family.id] = self.order[key]
+        dict.__setitem__(self, family.id, family)
+        return family
+
+    def load(self) -> Families:
+        if not self.pending: return self
+        with self.lock:
+            while self.pending: self.add(next(iter(self.pending)))
+            items = sorted(dict.items(self), key = lambda x: self.order.get(x[0], len(self.order)))
+            dict.clear(self); dict.update(self, items)
+        return self
+    def __getitem__(self, id: str) -> Family:
+        if (family := self.find(id)) is None: raise KeyError(id)
+        return family
+    def __contains__(self, id: str) -> bool: return self.find(id) is not None
+    def __iter__(self): return dict.__iter__(self.load())
+    def __len__(self) -> int: return dict.__len__(self.load())
+    def __repr__(self) -> str: return dict.__repr__(self.load())
+    def get(self, id: str, default: Family = None) -> Family: return family if (family := self.find(id)) is not None else default
+    def keys(self): return dict.keys(self.load())
+    def values(self): return dict.values(self.load())
+    def items(self): return dict.items(self.load())
+
+families = Families(familyKeys)
+
+_commentPattern = re.compile(r'//.*?$|/\*.*?\*/|\'(?:\\.|[^\\\'])*\'|"(?:\\.|[^\\"])*"', re.DOTALL | re.MULTILINE)
+
+def _commentRemover(text: str) -> str:
+    def replacer(match): s = match.group(0); return ' ' if s.startswith('/') else s
+    return re.sub(_commentPattern, replacer, text)
+
+def _parseJson(body: str) -> dict[str, object]:
+    return json.loads(_commentRemover(body).encode().decode('utf-8-sig'))
+
+def _loadJson(path: str) -> dict[str, object]:
+    body = resources.files(__package__).joinpath('Specs', path).read_text(encoding='utf-8')
+    return SpecCache.load(body, _parseJson)
 
 @staticmethod
 def init(loadSamples: bool = True):
-    def commentRemover(text: str) -> str:
-        def replacer(match): s = match.group(0); return ' ' if s.startswith('/') else s
-        pattern = re.compile(r'//.*?$|/\*.*?\*/|\'(?:\\.|[^\\\'])*\'|"(?:\\.|[^\\"])*"', re.DOTALL | re.MULTILINE)
-        return re.sub(pattern, replacer, text)
-    def loadJson(path: str) -> dict[str, object]:
-        body = resources.files().joinpath('Specs', path).read_text(encoding='utf-8')
-        return json.loads(commentRemover(body).encode().decode('utf-8-sig'))
-    for path in [f'{x}Family.json' for x in familyKeys]:
-        family = createFamily(path, loadJson, loadSamples)
-        families[family.id] = family
-    return families
+    families.loadSamples = loadSamples
+    return families.load()
 
 @staticmethod
 def getFamily(id: str, throwOnError: bool = True) -> Family:
-    family = _value(families, id)
+    family = families.find(id)
     if not family and throwOnError: raise Exception(f'Unknown family: {id}')
     return family
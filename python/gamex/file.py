@@ -1,12 +1,11 @@
 from __future__ import annotations
-import os, io, re, pathlib, platform, psutil, winreg
-from zipfile import ZipFile
+import os, io, re, mmap, platform, fnmatch, itertools, threading
+from collections import OrderedDict
+from zipfile import ZipFile, ZipInfo
 from openstk.poly import Reader, findType
 from . import store
 from .util import _list
 
-GAMESPATH = 'Games'
-
 # tag::FileManager[]
 class FileManager:
     class PathItem:
@@ -26,11 +25,6 @@ class FileManager:
     ignores: dict[str, object] = {}
     virtuals: dict[str, object] = {}
 
-    # get locale games
-    gameRoots = [os.path.join(x.mountpoint, GAMESPATH) for x in psutil.disk_partitions()]
-    if platform.system() == 'Android': gameRoots.append(os.path.join('/sdcard', GAMESPATH))
-    localGames = {x:os.path.join(r,x) for r in gameRoots if os.path.isdir(r) for x in os.listdir(r)}
-
     def __init__(self, elem: dict[str, object]):
         # applications
         if 'applications' in elem:
@@ -93,8 +87,8 @@ class FileManager:
                     self.addPath(id, elem, z)
         if 'dir' in elem:
             for k in _list(elem, 'dir'):
-                if not id in self.paths and k in FileManager.localGames:
-                    self.addPath(id, elem, FileManager.localGames[k])
+                if not id in self.paths and (z := store.getPathByDir(k)):
+                    self.addPath(id, elem, z)
     
     def addFilter(self, id, elem: dict[str, object]) -> None:
         if not id in self.filters: self.filters[id] = {}
@@ -134,6 +128,7 @@ class FileManager:
     # tag::FileManager.findRegistryPath[]
     @staticmethod
     def findRegistryPath(paths: list[str]) -> str:
+        import winreg
         for p in paths:
             keyPath = p.replace('/', '\\')
             try: key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, f'SOFTWARE\\{keyPath}', 0, winreg.KEY_READ)
@@ -199,60 +194,334 @@ class IFileSystem:
             return
         for path in self.glob(path, searchPattern): yield path
 
+# BlockCache
+class BlockCache:
+    # fixed-size blocks of remote files, keyed by (url, block) and bounded by size, least recently used evicted first
+    blockSize: int = 64 * 1024
+    maxBytes: int = int(os.getenv('GAMEX_HOST_CACHE') or 64 * 1024 * 1024)
+    default: BlockCache = None
+    def __init__(self, blockSize: int = None, maxBytes: int = None):
+        if blockSize is not None: self.blockSize = blockSize
+        if maxBytes is not None: self.maxBytes = maxBytes
+        self.blocks: OrderedDict[tuple, bytes] = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+        # stats
+        self.hits = 0
+        self.misses = 0
+    def __repr__(self): return f'blocks:{len(self.blocks)}@{self.size}/{self.maxBytes}'
+    def get(self, key: tuple) -> bytes:
+        with self.lock:
+            if (data := self.blocks.get(key)) is None: self.misses += 1; return None
+            self.blocks.move_to_end(key); self.hits += 1
+            return data
+    def put(self, key: tuple, data: bytes) -> None:
+        with self.lock:
+            if (old := self.blocks.pop(key, None)) is not None: self.size -= len(old)
+            self.blocks[key] = data; self.size += len(data)
+            while self.size > self.maxBytes and self.blocks: self.size -= len(self.blocks.popitem(last = False)[1])
+
+BlockCache.default = BlockCache()
+
+# HostStream
+class HostStream(io.RawIOBase):
+    # a seekable stream over a remote file, read through the block cache. a miss fetches a run of blocks in one
+    # range request, the run doubles while reads stay sequential (table of contents parsing) and resets on a seek away
+    def __init__(self, host: HostFileSystem, path: str, length: int):
+        self.host = host; self.path = path; self.length = length
+        self.url = host.url(path)
+        self.pos = 0
+        self.lastBlock = -2
+        self.window = 1
+    def readable(self) -> bool: return True
+    def seekable(self) -> bool: return True
+    def tell(self) -> int: return self.pos
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        self.pos = max(0, offset if whence == os.SEEK_SET else self.pos + offset if whence == os.SEEK_CUR else self.length + offset)
+        return self.pos
+    def readinto(self, b: bytearray) -> int:
+        data = self.read(len(b)); n = len(data)
+        b[:n] = data
+        return n
+    def readall(self) -> bytes: return self.read(-1)
+    def read(self, size: int = -1) -> bytes:
+        end = self.length if size is None or size < 0 else min(self.length, self.pos + size)
+        if self.pos >= end: return b''
+        blockSize = self.host.cache.blockSize
+        first = self.pos // blockSize
+        blocks = [self.block(i) for i in range(first, (end - 1) // blockSize + 1)]
+        data = blocks[0] if len(blocks) == 1 else b''.join(blocks)
+        start = self.pos - first * blockSize
+        data = data[start:start + end - self.pos]
+        self.pos = end
+        return data
+    def block(self, i: int) -> bytes:
+        cache = self.host.cache
+        sequential = i == self.lastBlock + 1; self.lastBlock = i
+        if (data := cache.get((self.url, i))) is not None: return data
+        self.window = min(self.window * 2, self.host.readAhead, max(1, cache.maxBytes // cache.blockSize // 4)) if sequential else 1
+        last = min(i + self.window, (self.length + cache.blockSize - 1) // cache.blockSize)
+        return self.host.fetch(self.url, i, last, self.length)
+
 # HostFileSystem
 class HostFileSystem(IFileSystem):
-    def __init__(self, uri: str): self.uri = uri
-    def glob(self, path: str, searchPattern: str) -> list[str]: raise NotImplementedError()
-    def fileExists(self, path: str) -> bool: raise NotImplementedError()
-    def fileInfo(self, path: str) -> (str, int): raise NotImplementedError()
-    def openReader(self, path: str, mode: str = 'rb') -> Reader: raise NotImplementedError()
+    # a file system over http(s). files are read with byte-range GETs through one pooled client (HTTP/2 when h2 is installed)
+    # into a block cache shared by every reader. http has no directory listing, so a wildcard glob reads a .set file
+    # listing the folder, one relative path per line
+    readAhead: int = 16
+    def __init__(self, uri: str, client: object = None, cache: BlockCache = None):
+        import httpx
+        from urllib.parse import urlparse
+        self.uri = uri = urlparse(uri) if isinstance(uri, str) else uri
+        self.base = f'{uri.scheme}://{uri.netloc}/'
+        if client is None:
+            try: import h2; http2 = True
+            except ImportError: http2 = False
+            client = httpx.Client(http2 = http2, follow_redirects = True, timeout = 30., limits = httpx.Limits(max_connections = 16, max_keepalive_connections = 16))
+        self.client = client
+        self.cache = cache or BlockCache.default
+        self.sizes: dict[str, int] = {}
+        self.sets: dict[str, list[str]] = {}
+    def __enter__(self): return self
+    def __exit__(self, type, value, traceback): self.close()
+    def close(self) -> None: self.client.close()
+    @staticmethod
+    def normalize(path: str) -> str: return path.replace('\\', '/').strip('/')
+    def url(self, path: str) -> str:
+        from urllib.parse import quote
+        return self.base + quote(self.normalize(path))
+
+    def fetch(self, url: str, first: int, last: int, length: int) -> bytes:
+        # reads blocks [first, last) into the cache and returns the first, which a large run may already have evicted
+        blockSize = self.cache.blockSize
+        start = first * blockSize; end = min(last * blockSize, length)
+        r = self.client.get(url, headers = { 'Range': f'bytes={start}-{end - 1}' })
+        if r.status_code == 200: start = 0 # no range support, the whole file came back
+        elif r.status_code != 206: r.raise_for_status(); raise Exception(f'{url}: unexpected status {r.status_code}')
+        data = r.content
+        for o in range(0, len(data), blockSize): self.cache.put((url, (start + o) // blockSize), data[o:o + blockSize])
+        return data[first * blockSize - start:(first + 1) * blockSize - start]
+
+    def size(self, path: str) -> int:
+        if (path := self.normalize(path)) in self.sizes: return self.sizes[path]
+        r = self.client.head(self.url(path))
+        self.sizes[path] = size = int(r.headers.get('content-length', 0)) if r.status_code == 200 else None
+        return size
+
+    def listSet(self, path: str) -> list[str]:
+        if (path := self.normalize(path)) in self.sets: return self.sets[path]
+        r = self.client.get(self.url(f'{path}/.set' if path else '.set'))
+        if r.status_code != 200: raise NotImplementedError(f'.set not found in {path or "/"}, needed for wildcard access')
+        self.sets[path] = names = [self.normalize(x) for x in r.text.splitlines() if x.strip()]
+        return names
+
+    def glob(self, path: str, searchPattern: str):
+        path = self.normalize(path); prefix = f'{path}/' if path else ''
+        if searchPattern and not any(c in searchPattern for c in '*?['):
+            return iter([f'{prefix}{searchPattern}'] if self.fileExists(f'{prefix}{searchPattern}') else [])
+        matcher = globRegex(searchPattern)
+        return (f'{prefix}{x}' for x in self.listSet(path) if matcher.fullmatch(x))
+    def fileExists(self, path: str) -> bool: return self.size(path) is not None
+    def fileInfo(self, path: str) -> (str, int): return (path, size) if (size := self.size(path)) is not None else (None, 0)
+    def openReader(self, path: str, mode: str = 'rb') -> Reader:
+        if (size := self.size(path)) is None: raise FileNotFoundError(path)
+        return Reader(HostStream(self, path, size))
+
+# ViewIO
+class ViewIO(io.BytesIO):
+    # a BytesIO over a memoryview, reads slice the view instead of copying it.
+    # base maps the view to an absolute window of a larger stream, strict raises EOFError on reads outside of it
+    def __init__(self, view: memoryview, base: int = 0, strict: bool = False):
+        super().__init__()
+        self.view = view
+        self.base = base
+        self.strict = strict
+        self.pos = base
+    def __len__(self) -> int: return len(self.view)
+    def getbuffer(self) -> memoryview: return self.view
+    def getvalue(self) -> bytes: return self.view.tobytes()
+    def tell(self) -> int: return self.pos
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        self.pos = max(0, offset if whence == os.SEEK_SET else self.pos + offset if whence == os.SEEK_CUR else self.base + len(self.view) + offset)
+        return self.pos
+    def readView(self, size: int = -1) -> memoryview:
+        start = self.pos - self.base; length = len(self.view)
+        end = length if size is None or size < 0 else start + size
+        if self.strict and (start < 0 or end > length): raise EOFError(f'{self.pos}+{size} outside window {self.base}+{length}')
+        start = min(max(start, 0), length); end = min(max(end, start), length)
+        self.pos = self.base + end
+        return self.view[start:end]
+    def read(self, size: int = -1) -> bytes: return self.readView(size).tobytes()
+    read1 = read
+    def readinto(self, b: bytearray) -> int:
+        data = self.readView(len(b)); n = len(data)
+        b[:n] = data
+        return n
+    def write(self, b: bytes) -> int: raise io.UnsupportedOperation('write')
+    def close(self) -> None: self.view = memoryview(b''); super().close()
+
+# MmapReader
+class MmapReader(Reader):
+    # a Reader over a read-only memory map, readView returns zero-copy slices
+    def __init__(self, path: str):
+        self.file = open(path, 'rb')
+        self.mm = mmap.mmap(self.file.fileno(), 0, access = mmap.ACCESS_READ)
+        self.view = memoryview(self.mm)
+        super().__init__(self.mm)
+    def __exit__(self, type, value, traceback): self.close()
+    def readView(self, size: int) -> memoryview:
+        position = self.mm.tell()
+        self.mm.seek(position + size)
+        return self.view[position:position + size]
+    def close(self) -> None:
+        self.view.release()
+        try: self.mm.close()
+        except BufferError: pass # slices still exported, released with the last view
+        self.file.close()
+
+# WindowReader
+class WindowReader(Reader):
+    # a Reader over a buffered window of archive, used by coalesced reads
+    def __init__(self, view: memoryview, base: int, archive: str):
+        self.io = ViewIO(view, base, strict = True)
+        super().__init__(self.io)
+        self.archive = archive
+    def readView(self, size: int) -> memoryview: return self.io.readView(size)
 
 # StandardFileSystem
 class StandardFileSystem(IFileSystem):
-    def __init__(self, root: str): self.root = root; self.skip = len(root) + 1
-    def glob(self, path: str, searchPattern: str) -> list[str]:
-        g = pathlib.Path(os.path.join(self.root, path)).glob(searchPattern if searchPattern else '**/*')
-        return [str(x)[self.skip:] for x in g if x.is_file()]
+    # glob walks with os.scandir and yields as it goes. each directory is listed once per file system,
+    # so the expansions of a (a:b:c) pattern share listings. refresh drops them
+    useMmap: bool = bool(os.getenv('GAMEX_MMAP'))
+    def __init__(self, root: str, useMmap: bool = None):
+        self.root = root; self.skip = len(root) + 1
+        if useMmap is not None: self.useMmap = useMmap
+        self.listings: dict[str, (list[str], list[(str, bool)])] = {}
+    def refresh(self) -> None: self.listings.clear()
+
+    def listDir(self, path: str) -> (list[str], list[(str, bool)]):
+        # (files, (dir, isLink)) of a directory, from one scandir pass
+        if (listing := self.listings.get(path)) is not None: return listing
+        files = []; dirs = []
+        try:
+            with os.scandir(path) as it:
+                for e in it:
+                    try:
+                        if e.is_file(): files.append(e.name)
+                        elif e.is_dir(): dirs.append((e.name, e.is_symlink()))
+                    except OSError: pass
+        except OSError: pass
+        self.listings[path] = listing = (files, dirs)
+        return listing
+
+    def walk(self, path: str, rel: str, parts: list[str]):
+        part = parts[0]; rest = parts[1:]
+        if part == '**':
+            if rest: yield from self.walk(path, rel, rest)
+            else: yield from (os.path.join(rel, x) for x in self.listDir(path)[0])
+            for name, isLink in self.listDir(path)[1]:
+                if not isLink: yield from self.walk(os.path.join(path, name), os.path.join(rel, name), parts)
+        elif not any(c in part for c in '*?['):
+            target = os.path.join(path, part)
+            if not rest:
+                if os.path.isfile(target): yield os.path.join(rel, part)
+            elif os.path.isdir(target): yield from self.walk(target, os.path.join(rel, part), rest)
+        else:
+            part = os.path.normcase(part)
+            files, dirs = self.listDir(path)
+            if not rest: yield from (os.path.join(rel, x) for x in files if fnmatch.fnmatchcase(os.path.normcase(x), part))
+            else:
+                for name, _ in dirs:
+                    if fnmatch.fnmatchcase(os.path.normcase(name), part): yield from self.walk(os.path.join(path, name), os.path.join(rel, name), rest)
+
+    def glob(self, path: str, searchPattern: str):
+        parts = [x for x in (searchPattern or '**/*').replace('\\', '/').split('/') if x]
+        return self.walk(os.path.join(self.root, path), path, parts or ['**', '*'])
     def fileExists(self, path: str) -> bool: return os.path.exists(os.path.join(self.root, path))
     def fileInfo(self, path: str) -> (str, int): return (path, os.stat(path).st_size) if os.path.exists(path := os.path.join(self.root, path)) else (None, 0)
-    def openReader(self, path: str, mode: str = 'rb') -> Reader: return Reader(open(os.path.join(self.root, path), mode))
+    def openReader(self, path: str, mode: str = 'rb') -> Reader:
+        path = os.path.join(self.root, path)
+        return MmapReader(path) if self.useMmap and mode == 'rb' and os.path.getsize(path) > 0 else Reader(open(path, mode))
 
 # VirtualFileSystem
 class VirtualFileSystem(IFileSystem):
     def __init__(self, base: IFileSystem, virtuals: dict[str, object]):
         self.base = base
         self.virtuals = virtuals
-    def glob(self, path: str, searchPattern: str) -> list[str]:
+    def glob(self, path: str, searchPattern: str):
         matcher = FileManager.createMatcher(searchPattern)
-        return [x for x in self.virtuals.keys() if matcher(x)] + self.base.glob(path, searchPattern)
+        return itertools.chain([x for x in self.virtuals.keys() if matcher(x)], self.base.glob(path, searchPattern))
     def fileExists(self, path: str) -> bool: return path in self.virtuals or self.base.fileExists(path)
     def fileInfo(self, path: str) -> (str, int): return (path, x.size() if (x := self.virtuals[path] and x) else 0) if path in self.virtuals else self.base.fileInfo(path)
     def openReader(self, path: str, mode: str = 'rb') -> Reader: return Reader(self.virtuals[path] or io.BytesIO()) if path in self.virtuals else self.base.openReader(path)
 
+# globRegex
+def globRegex(searchPattern: str) -> re.Pattern:
+    # a glob over '/' separated names: * and ? stay within a segment, a ** segment spans any number of them
+    parts = [x for x in (searchPattern or '**/*').replace('\\', '/').split('/') if x] or ['**', '*']
+    b = []
+    for i, part in enumerate(parts):
+        last = i == len(parts) - 1
+        if part == '**': b.append('.*' if last else '(?:[^/]+/)*'); continue
+        j = 0
+        while j < len(part):
+            c = part[j]; j += 1
+            if c == '*': b.append('[^/]*')
+            elif c == '?': b.append('[^/]')
+            elif c == '[' and (k := part.find(']', j + 1)) != -1:
+                body = part[j:k]; j = k + 1
+                b.append(f'[{"^" + body[1:] if body.startswith("!") else body}]')
+            else: b.append(re.escape(c))
+        if not last: b.append('/')
+    return re.compile(''.join(b), re.DOTALL)
+
 # ZipFileSystem
 class ZipFileSystem(IFileSystem):
+    # a zip archive as a file system. the central directory is indexed once, members stream through
+    # ZipFile.open, and each thread reads through its own ZipFile handle
     def __init__(self, root: str, path: str):
-        self.pak = ZipFile(root)
+        self.zipPath = root
+        self.local = threading.local()
+        self.handles: list[ZipFile] = []
+        self.lock = threading.Lock()
+        self.pak = self.handle()
         self.root = '' if not path else f'{path}/'
-    def glob(self, path: str, searchPattern: str) -> list[str]:
-        root = os.path.join(self.root, path)
-        skip = len(root)
-        return []
-    def fileExists(self, path: str) -> bool: return self.pak.read(os.path.join(self.root, path)) != None
-    def fileInfo(self, path: str) -> (str, int): e = self.pak.read(os.path.join(self.root, path)); return (e.name, e.length) if e else (None, 0)
-    def openReader(self, path: str, mode: str = 'rb') -> Reader: return Reader(self.pak.read(os.path.join(self.root, path)))
+        self.index = self.createIndex(self.pak.infolist())
+    def __enter__(self): return self
+    def __exit__(self, type, value, traceback): self.close()
+    def createIndex(self, infos: list[ZipInfo]) -> dict[str, ZipInfo]:
+        skip = len(self.root)
+        return {x.filename[skip:]:x for x in infos if not x.is_dir() and x.filename.startswith(self.root) and len(x.filename) > skip}
+    def handle(self) -> ZipFile:
+        if (pak := getattr(self.local, 'pak', None)) is None:
+            pak = self.local.pak = ZipFile(self.zipPath)
+            with self.lock: self.handles.append(pak)
+        return pak
+    def close(self) -> None:
+        with self.lock:
+            for pak in self.handles: pak.close()
+            self.handles.clear()
+        self.local = threading.local()
+    @staticmethod
+    def normalize(path: str) -> str: return path.replace('\\', '/').strip('/')
+    def glob(self, path: str, searchPattern: str):
+        prefix = f'{path}/' if (path := self.normalize(path)) else ''
+        matcher = globRegex(searchPattern); skip = len(prefix)
+        return (x for x in self.index if x.startswith(prefix) and matcher.fullmatch(x, skip))
+    def fileExists(self, path: str) -> bool: return self.normalize(path) in self.index
+    def fileInfo(self, path: str) -> (str, int): e = self.index.get(self.normalize(path)); return (e.filename, e.file_size) if e else (None, 0)
+    def openReader(self, path: str, mode: str = 'rb') -> Reader:
+        if (e := self.index.get(self.normalize(path))) is None: raise FileNotFoundError(path)
+        return Reader(self.handle().open(e))
 
 # ZipIsoFileSystem
-class ZipIsoFileSystem(IFileSystem):
+class ZipIsoFileSystem(ZipFileSystem):
+    # members are addressed by their full name and matched by their file name
     def __init__(self, root: str, path: str):
-        self.pak = ZipFile(root)
-        self.root = '' if not path else f'{path}/'
-    def glob(self, path: str, searchPattern: str) -> list[str]:
-        root = os.path.join(self.root, path)
-        skip = len(root)
-        return []
-    def fileExists(self, path: str) -> bool: return self.pak.read(path) != None
-    def fileInfo(self, path: str) -> (str, int): e = self.pak.read(path); return (e.name, e.length) if e else (None, 0)
-    def openReader(self, path: str, mode: str = 'rb') -> Reader: return Reader(self.pak.read(path))
+        super().__init__(root, None)
+        self.path = path
+    def glob(self, path: str, searchPattern: str):
+        matcher = globRegex(searchPattern)
+        return (x for x in self.index if matcher.fullmatch(x.rsplit('/', 1)[-1]))
 
 # end::FileSystem[]
\ No newline at end of file
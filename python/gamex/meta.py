@@ -1,5 +1,7 @@
 from __future__ import annotations
-import sys, os, re, pathlib
+import sys, os, re, pathlib, weakref, functools
+from array import array
+from bisect import bisect_left
 from io import BytesIO
 from gamex.util import _throw
 
@@ -24,6 +26,214 @@ class FileSource:
         self.cachedOption = None
     def __repr__(self): return f'{self.path}:{self.fileSize}'
 
+# FileTable
+class FileTable:
+    # struct-of-arrays alternative to list[FileSource] for very large archives.
+    # numeric fields live in array columns, paths in a single utf-8 blob, low-cardinality
+    # fields (compressed, tag) are interned and anything else is kept sparse in extras.
+    NONE = -0x8000000000000000
+    NONEU = 0xFFFFFFFFFFFFFFFF
+    columns = ['id', 'offset', 'fileSize', 'packedSize', 'flags']
+    interned = ['compressed', 'tag']
+
+    # _Lookup
+    class _Lookup:
+        def __init__(self, table: FileTable, index: dict[object, int | list[int]]):
+            self.table = table
+            self.index = index
+        def __len__(self) -> int: return len(self.index)
+        def __iter__(self): return iter(self.index)
+        def __contains__(self, key: object) -> bool: return key in self.index
+        def __getitem__(self, key: object) -> list[FileSource]:
+            v = self.index[key]
+            return [self.table[v]] if isinstance(v, int) else [self.table[x] for x in v]
+        def get(self, key: object, default: object = None) -> list[FileSource]: return self[key] if key in self.index else default
+        def keys(self): return self.index.keys()
+        def items(self): return ((k, self[k]) for k in self.index)
+
+    def __init__(self):
+        for name in self.columns: setattr(self, name, array('q'))
+        self.hash = array('Q')
+        for name in self.interned: setattr(self, name, array('I')); setattr(self, f'{name}Values', [None]); setattr(self, f'{name}Map', {None: 0})
+        self.pathEnd = array('Q')
+        self.blob = bytearray()
+        self.extras: dict[int, dict[str, object]] = {}
+        self._views = weakref.WeakValueDictionary()
+    def __repr__(self): return f'FileTable:{len(self)}'
+    def __len__(self) -> int: return len(self.pathEnd)
+    def __iter__(self):
+        for i in range(len(self.pathEnd)): yield self[i]
+    def __getitem__(self, i: int | slice) -> FileSource:
+        if isinstance(i, slice): return [self[x] for x in range(*i.indices(len(self)))]
+        if i < 0: i += len(self.pathEnd)
+        if (f := self._views.get(i)) is not None: return f
+        NONE = self.NONE
+        f = FileSource(
+            id = None if (v := self.id[i]) == NONE else v,
+            path = self.getPath(i),
+            offset = None if (v := self.offset[i]) == NONE else v,
+            fileSize = None if (v := self.fileSize[i]) == NONE else v,
+            packedSize = None if (v := self.packedSize[i]) == NONE else v,
+            compressed = self.compressedValues[self.compressed[i]],
+            flags = None if (v := self.flags[i]) == NONE else v,
+            hash = None if (v := self.hash[i]) == self.NONEU else v,
+            tag = self.tagValues[self.tag[i]])
+        if i in self.extras:
+            for k, v in self.extras[i].items(): setattr(f, k, v)
+        self._views[i] = f
+        return f
+
+    def getPath(self, i: int) -> str:
+        return self.blob[self.pathEnd[i - 1] if i > 0 else 0:self.pathEnd[i]].decode('utf-8')
+
+    def paths(self):
+        blob = self.blob; start = 0
+        for end in self.pathEnd: yield blob[start:end].decode('utf-8'); start = end
+
+    def _intern(self, name: str, value: object) -> int:
+        map = getattr(self, f'{name}Map')
+        try: i = map.get(value)
+        except TypeError: return None
+        if i is None:
+            values = getattr(self, f'{name}Values')
+            i = map[value] = len(values); values.append(value)
+        return i
+
+    def add(self, path: str, id: int = None, offset: int = None, fileSize: int = None, packedSize: int = None, compressed: object = None, flags: int = None, hash: int = None, tag: object = None, **extras) -> int:
+        i = len(self.pathEnd)
+        NONE = self.NONE
+        self.id.append(NONE if id is None else id)
+        self.offset.append(NONE if offset is None else offset)
+        self.fileSize.append(NONE if fileSize is None else fileSize)
+        self.packedSize.append(NONE if packedSize is None else packedSize)
+        self.flags.append(NONE if flags is None else flags)
+        self.hash.append(self.NONEU if hash is None else hash)
+        extras = {k:v for k,v in extras.items() if v is not None}
+        for name, value in (('compressed', compressed), ('tag', tag)):
+            if (x := self._intern(name, value)) is None: x = 0; extras[name] = value
+            getattr(self, name).append(x)
+        self.blob += (path or '').encode('utf-8')
+        self.pathEnd.append(len(self.blob))
+        if extras: self.extras[i] = extras
+        return i
+
+    def append(self, file: FileSource) -> None:
+        self.add(file.path, file.id, file.offset, file.fileSize, file.packedSize, file.compressed, file.flags, file.hash, file.tag, pak = file.pak, parts = file.parts, data = file.data)
+
+    def byPath(self) -> FileTable._Lookup:
+        index = {}
+        for i, path in enumerate(self.paths()):
+            if (v := index.get(path)) is None: index[path] = i
+            elif isinstance(v, int): index[path] = [v, i]
+            else: v.append(i)
+        return self._Lookup(self, index)
+
+    def byId(self) -> FileTable._Lookup:
+        index = {}
+        for i, id in enumerate(self.id):
+            if id == self.NONE: continue
+            if (v := index.get(id)) is None: index[id] = i
+            elif isinstance(v, int): index[id] = [v, i]
+            else: v.append(i)
+        return self._Lookup(self, index)
+
+# PathIndex
+class PathIndex:
+    # path lookup over a list[FileSource] or FileTable, built in one pass. paths are normalized to '/' and
+    # lowercased when ignoreCase, duplicates are kept in collision lists, and every directory lists its own
+    # files and subdirectories so directory queries only touch the files they return.
+    # only the keys are lowercased, a directory keeps the casing it was first seen with in names for display
+    def __init__(self, files: list[FileSource] | FileTable, ignoreCase: bool = False, skip: int = 0):
+        self.files = files
+        self.ignoreCase = ignoreCase
+        self.skip = skip
+        self.index: dict[str, int | list[int]] = {}
+        self.dirs: dict[str, (list[int], set[str])] = {'': ([], set())}
+        self.names: dict[str, str] = {}
+        index = self.index; dirs = self.dirs; names = self.names
+        for i, path in enumerate(files.paths() if isinstance(files, FileTable) else (x.path for x in files)):
+            if not path or not (path := path[skip:]): continue
+            raw = path.replace('\\', '/'); path = raw.lower() if ignoreCase else raw
+            if (v := index.get(path)) is None: index[path] = i
+            elif isinstance(v, int): index[path] = [v, i]
+            else: v.append(i)
+            # directory
+            parent = path.rpartition('/')[0]
+            if (node := dirs.get(parent)) is None:
+                node = dirs[parent] = ([], set())
+                child = parent; name = raw.rpartition('/')[0]
+                while child:
+                    if ignoreCase: names[child] = name
+                    up = child.rpartition('/')[0]
+                    if (x := dirs.get(up)) is not None: x[1].add(child); break
+                    dirs[up] = ([], {child}); child = up; name = name.rpartition('/')[0]
+            node[0].append(i)
+    def __repr__(self): return f'PathIndex:{len(self.index)}'
+    def __len__(self) -> int: return len(self.index)
+    def __iter__(self): return iter(self.index)
+    def __contains__(self, path: str) -> bool: return self.normalize(path) in self.index
+    def __getitem__(self, path: str) -> list[FileSource]:
+        v = self.index[self.normalize(path)]
+        return [self.files[v]] if isinstance(v, int) else [self.files[x] for x in v]
+    def get(self, path: str, default: object = None) -> list[FileSource]: return self[path] if path in self else default
+    def keys(self): return self.index.keys()
+    def items(self): return ((k, self[k]) for k in self.index)
+
+    def normalize(self, path: str) -> str:
+        path = path.replace('\\', '/')
+        return path.lower() if self.ignoreCase else path
+
+    def dirName(self, key: str) -> str:
+        # the display name of the directory at key
+        return self.names.get(key, key).rpartition('/')[2]
+
+    def dirsOf(self, path: str) -> list[str]:
+        return sorted(self.dirName(x) for x in node[1]) if (node := self.dirs.get(self.normalize(path).strip('/'))) else []
+
+    def under(self, path: str, recursive: bool = True):
+        # files in directory path, and its subdirectories when recursive
+        if (node := self.dirs.get(self.normalize(path).strip('/'))) is None: return
+        files = self.files; stack = [node]
+        while stack:
+            node = stack.pop()
+            for i in node[0]: yield files[i]
+            if recursive: stack.extend(self.dirs[x] for x in node[1])
+
+    def startswith(self, prefix: str):
+        # files whose path starts with prefix, scanning only the subtree of its directory
+        prefix = self.normalize(prefix)
+        for file in self.under(prefix.rpartition('/')[0]):
+            if self.normalize(file.path[self.skip:]).startswith(prefix): yield file
+
+# HashIndex
+class HashIndex:
+    # lookup by the path hashes an archive stores, for when its name table was not read. entries are (key, sub) pairs
+    # sorted into parallel arrays, and a path is hashed with the archive's own hashPath(path) -> (key, sub) then bisected
+    def __init__(self, files: list[FileSource] | FileTable, keys: list[int], subs: list[int], hashPath: callable):
+        self.files = files
+        self.hashPath = hashPath
+        order = sorted(range(len(keys)), key = lambda i: (keys[i], subs[i]))
+        self.keys = array('Q', (keys[i] for i in order)); self.subs = array('Q', (subs[i] for i in order)); self.index = array('I', order)
+    def __repr__(self): return f'HashIndex:{len(self.keys)}'
+    def __len__(self) -> int: return len(self.keys)
+    def __contains__(self, path: str) -> bool: return self.indexOf(*self.hashPath(path)) >= 0
+    def __getitem__(self, path: str) -> list[FileSource]:
+        key, sub = self.hashPath(path)
+        if (i := self.indexOf(key, sub)) < 0: raise KeyError(path)
+        keys, subs, index, files = self.keys, self.subs, self.index, self.files; hits = []
+        while i < len(keys) and keys[i] == key and subs[i] == sub:
+            file = files[index[i]]; i += 1
+            if file.path is None: file.path = path.replace('\\', '/') # names skipped, the caller's path is the name
+            hits.append(file)
+        return hits
+    def get(self, path: str, default: object = None) -> list[FileSource]: return self[path] if path in self else default
+
+    def indexOf(self, key: int, sub: int) -> int:
+        keys = self.keys
+        if (lo := bisect_left(keys, key)) == len(keys) or keys[lo] != key: return -1
+        hi = bisect_left(keys, key + 1, lo)
+        return i if (i := bisect_left(self.subs, sub, lo, hi)) < hi and self.subs[i] == sub else -1
+
 # MetaContent
 class MetaContent:
     def __init__(self, type: str, name: str, value: object = None, 
@@ -53,17 +263,38 @@ class MetaItem:
             self.name = name
             self.description = description
 
-    def __init__(self, source: object, name: str, icon: object = None, tag: object = None, pakFile: PakFile = None, items: list[MetaItem] = None):
+    def __init__(self, source: object, name: str, icon: object = None, tag: object = None, pakFile: PakFile = None, items: list[MetaItem] = None, loader: callable = None):
         self.source = source
         self.name = name
         self.icon = icon
         self.tag = tag
         self.pakFile = pakFile
-        self.items = items or []
+        self.loader = loader
+        self._items = items if items is not None or loader else []
+        self._byName = None
+
+    # items are materialized by loader on first access, i.e. when the node is expanded
+    @property
+    def items(self) -> list[MetaItem]:
+        if self._items is None: self._items = self.loader() or []; self.loader = None
+        return self._items
+    @items.setter
+    def items(self, value: list[MetaItem]) -> None: self._items = value; self.loader = None; self._byName = None
+    @property
+    def loaded(self) -> bool: return self._items is not None
+    @property
+    def hasItems(self) -> bool: return bool(self._items) if self._items is not None else self.loader is not None
+
+    def child(self, name: str) -> MetaItem:
+        # rebuilt when items changes, opening a nested pak appends to it
+        items = self.items
+        if not self._byName or self._byName[0] is not items or self._byName[1] != len(items):
+            self._byName = (items, len(items), {x.name:x for x in reversed(items)})
+        return self._byName[2].get(name)
 
     def findByPath(self, path: str, manager: MetaManager) -> MetaItem:
         paths = re.split('\\\\|/|:', path, 1)
-        node = next(iter([x for x in self.items if x.name == paths[0]]), None)
+        node = self.child(paths[0])
         if node and isinstance(node.source, FileSource) and node.source.pak: node.source.pak.open(node.items, manager)
         return node if not node or len(paths) == 1 else node.findByPath(paths[1], manager)
 
@@ -124,40 +355,36 @@ class MetaManager:
     @staticmethod
     def getMetaItems(manager: MetaManager, pakFile: BinaryPakFile) -> list[MetaItem]:
         if not manager: raise Exception('manager')
+        if not pakFile.files: return []
+        index = pakFile.filesByPath if isinstance(pakFile.filesByPath, PathIndex) and not pakFile.pathSkip else \
+            PathIndex(pakFile.files, skip = pakFile.pathSkip)
+        return MetaManager._folderItems(manager, pakFile, index, '')
 
-        root = []
-        if not pakFile.files: return root
-        currentPath = None; currentFolder = None
-
-        # parse paths
-        for file in sorted(pakFile.files, key = lambda x: x.path):
-            # next path, skip empty
-            path = file.path[pakFile.pathSkip:]
-            if not path: continue
-
-            # folder
-            fileFolder = os.path.dirname(path)
-            if currentPath != fileFolder:
-                currentPath = fileFolder
-                currentFolder = root
-                if fileFolder:
-                    for folder in fileFolder.split('/'):
-                        found = next(iter([x for x in currentFolder if x.name == folder and not x.pakFile]), None)
-                        if found: currentFolder = found.items
-                        else:
-                            found = MetaItem(None, folder, manager.folderIcon)
-                            currentFolder.append(found)
-                            currentFolder = found.items
+    @staticmethod
+    def _folderItems(manager: MetaManager, pakFile: BinaryPakFile, index: PathIndex, folder: str) -> list[MetaItem]:
+        # one folder of the tree, subfolders and nested paks load their items when expanded
+        files, folders = index.dirs[folder]
+        items = []
+        for path in folders:
+            name = index.dirName(path)
+            items.append((f'{name}/', MetaItem(None, name, manager.folderIcon, loader = functools.partial(MetaManager._folderItems, manager, pakFile, index, path))))
+        for i in files:
+            file = index.files[i]
             # pakfile
             if file.pak:
-                items = MetaManager.getMetaItems(manager, file.pak)
-                currentFolder.append(MetaItem(file, os.path.basename(file.path), manager.packageIcon, pakFile = pakFile, items = items))
+                items.append((os.path.basename(file.path), MetaItem(file, os.path.basename(file.path), manager.packageIcon, pakFile = pakFile, loader = functools.partial(MetaManager._pakItems, manager, file.pak))))
                 continue
-                
             # file
-            fileName = os.path.basename(path)
+            fileName = file.path[pakFile.pathSkip:].replace('\\', '/').rpartition('/')[2]
+            if not fileName: continue
             fileNameForIcon = pakFile.fileMask(fileName) or fileName if pakFile.fileMask else fileName
             _, extentionForIcon = os.path.splitext(fileNameForIcon)
             if extentionForIcon: extentionForIcon = extentionForIcon[1:]
-            currentFolder.append(MetaItem(file, fileName, manager.getIcon(extentionForIcon), pakFile = pakFile))
-        return root
\ No newline at end of file
+            items.append((fileName, MetaItem(file, fileName, manager.getIcon(extentionForIcon), pakFile = pakFile)))
+        items.sort(key = lambda x: x[0])
+        return [x[1] for x in items]
+
+    @staticmethod
+    def _pakItems(manager: MetaManager, pak: PakFile) -> list[MetaItem]:
+        pak.open()
+        return pak.getMetaItems(manager)
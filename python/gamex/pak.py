@@ -1,9 +1,13 @@
 from __future__ import annotations
-import sys, os, re, time, itertools
+import sys, os, re, time, threading, asyncio, functools, inspect
 from enum import Enum, Flag
 from io import BytesIO
-from openstk.poly import Reader, GenericPool, SinglePool, StaticPool
-from gamex.meta import FileSource, MetaManager, MetaItem, MetaInfo
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, as_completed
+from openstk.poly import Reader, SinglePool, StaticPool
+from gamex.meta import FileSource, FileTable, PathIndex, MetaManager, MetaItem, MetaInfo
+from gamex.cache import IndexCache, ObjectCache
+from gamex.compression import offloadTo, processPool
+from gamex.file import ViewIO, WindowReader
 from gamex.util import _throw
 
 # FileOption
@@ -45,6 +49,7 @@ class PakFile:
         self.name = z if not state.path or (z := os.path.basename(state.path)) else os.path.basename(os.path.dirname(state.path))
         self.tag = state.tag
         self.objectFactoryFunc = None
+        self.executor: Executor = None
         self.gfx = None
         self.sfx = None
     def __enter__(self): return self
@@ -76,6 +81,18 @@ class PakFile:
     def loadFileObject(self, path: FileSource | str | int, option: FileOption = FileOption.Default, throwOnError: bool = True) -> object: pass
     def openPakFile(self, res: object, throwOnError: bool = True) -> PakFile:
         raise Exception('TODO')
+    #region Async
+    def _run(self, func: callable, *args) -> asyncio.Future:
+        # blocking calls run on executor, or the loop's default executor
+        return asyncio.get_running_loop().run_in_executor(self.executor, functools.partial(func, *args))
+    async def aopen(self, items: list[MetaItem] = None, manager: MetaManager = None) -> PakFile: return await self._run(self.open, items, manager)
+    async def aclose(self) -> PakFile: return await self._run(self.close)
+    async def aloadFileData(self, path: FileSource | str | int, option: FileOption = FileOption.Default, throwOnError: bool = True) -> bytes:
+        return await self._run(self.loadFileData, path, option, throwOnError)
+    async def aloadFileObject(self, type: type, path: FileSource | str | int, option: FileOption = FileOption.Default, throwOnError: bool = True) -> object:
+        value = await self._run(self.loadFileObject, type, path, option, throwOnError)
+        return await value if inspect.isawaitable(value) else value
+    #endregion
     #region Transform
     def loadFileObject2(self, transformTo: object, source: object): pass
     def transformFileObject(self, transformTo: object, source: object): pass
@@ -90,6 +107,141 @@ class PakFile:
     #endregion
 # end::PakFile[]
 
+# ReaderPool
+class ReaderPool:
+    # thread-safe pool of readers over one archive, at most retain readers are open at once
+    def __init__(self, factory: callable, reset: callable = None, retain: int = 10):
+        self.factory = factory
+        self.reset = reset
+        self.retain = max(1, retain)
+        self.idle: list[Reader] = []
+        self.count = 0
+        self.closed = False
+        self.cond = threading.Condition()
+        # stats
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.waitTime = 0.
+    def __repr__(self): return f'pool:{self.count}/{self.retain}'
+
+    @staticmethod
+    def _close(r: Reader) -> None:
+        try: r.__exit__(None, None, None)
+        except Exception: pass
+
+    def get(self) -> Reader:
+        with self.cond:
+            if self.closed: raise Exception('ReaderPool closed')
+            if not self.idle and self.count >= self.retain:
+                self.waits += 1
+                start = time.perf_counter()
+                while not self.idle and self.count >= self.retain: self.cond.wait()
+                self.waitTime += time.perf_counter() - start
+            if self.idle: self.hits += 1; return self.idle.pop()
+            self.misses += 1
+            self.count += 1
+        try: return self.factory()
+        except:
+            with self.cond: self.count -= 1; self.cond.notify()
+            raise
+
+    def release(self, r: Reader) -> None:
+        try:
+            if self.reset: self.reset(r)
+        except Exception: self._discard(r); return
+        with self.cond:
+            if not self.closed: self.idle.append(r); self.cond.notify(); return
+            self.count -= 1
+        self._close(r)
+
+    def _discard(self, r: Reader) -> None:
+        with self.cond: self.count -= 1; self.cond.notify()
+        self._close(r)
+
+    def action(self, func: callable) -> None:
+        r = self.get()
+        try: func(r)
+        finally: self.release(r)
+
+    def func(self, func: callable) -> object:
+        r = self.get()
+        try: return func(r)
+        finally: self.release(r)
+
+    def stats(self) -> dict[str, object]:
+        with self.cond: return { 'open': self.count, 'idle': len(self.idle), 'retain': self.retain, 'hits': self.hits, 'misses': self.misses, 'waits': self.waits, 'waitTime': round(self.waitTime, 4) }
+
+    def close(self) -> None:
+        with self.cond:
+            self.closed = True
+            idle = self.idle; self.idle = []
+            self.count -= len(idle)
+            self.cond.notify_all()
+        for r in idle: self._close(r)
+
+# DecodePipeline
+class DecodePipeline:
+    # raw reads run on a single I/O thread and PakBinary.readData on a pool of decode threads.
+    # zlib releases the GIL, the pure-Python codecs are sent on to a process pool (see compression.offloadTo).
+    # every result is a future of the decode pool itself, so close() cancels or fails it, never leaves it pending
+    _default = None
+    _defaultLock = threading.Lock()
+    def __init__(self, workers: int = None, processes: int = None, offload: bool = True):
+        self.workers = workers or os.cpu_count() or 4
+        self.processes = processes
+        self.offload = offload
+        self.io = None
+        self.pool = None
+        self.lock = threading.Lock()
+    def __enter__(self): return self.start()
+    def __exit__(self, type, value, traceback): self.close()
+    def __repr__(self): return f'pipeline:{self.workers}'
+
+    @staticmethod
+    def default() -> DecodePipeline:
+        with DecodePipeline._defaultLock:
+            if not DecodePipeline._default: DecodePipeline._default = DecodePipeline()
+        return DecodePipeline._default.start()
+
+    def start(self) -> DecodePipeline: self._executors(); return self
+
+    def _executors(self) -> (ThreadPoolExecutor, ThreadPoolExecutor):
+        # (io, pool) as one snapshot, a concurrent close() makes later submits raise instead of returning a dead future
+        with self.lock:
+            if not self.pool:
+                self.io = ThreadPoolExecutor(1, 'gamex-io')
+                self.pool = ThreadPoolExecutor(self.workers, 'gamex-decode', offloadTo, (processPool(self.processes) if self.offload else None,))
+            return self.io, self.pool
+
+    def submit(self, func: callable, *args) -> Future: return self._executors()[1].submit(func, *args)
+
+    @staticmethod
+    def _decode(source: BinaryPakFile, raw: Future, start: int, archive: str, f: FileSource, option: FileOption) -> object:
+        # waits on the span read, a failed or cancelled read fails this entry the same way
+        return source._readWindow(raw.result(), start, archive, f, option)
+
+    def run(self, source: BinaryPakFile, direct: list, spans: list, option: FileOption, throwOnError: bool, ordered: bool = True):
+        io, pool = self._executors()
+        futures = []
+        for k, p, f in direct: futures.append((k, f, pool.submit(p.loadFileData, f, option, throwOnError)))
+        for archive, start, end, files in spans:
+            raw = io.submit(source._readSpan, archive, start, end)
+            for k, f in files: futures.append((k, f, pool.submit(self._decode, source, raw, start, archive, f, option)))
+        if ordered:
+            futures.sort(key = lambda x: x[0])
+            for _, f, out in futures: yield (f, out.result())
+        else:
+            files = { out:f for _, f, out in futures }
+            for out in as_completed(files): yield (files[out], out.result())
+
+    def close(self) -> None:
+        with self.lock:
+            io = self.io; pool = self.pool
+            self.io = self.pool = None
+        if io: io.shutdown(cancel_futures = True)
+        if pool: pool.shutdown(cancel_futures = True)
+
 # BinaryPakFile
 class BinaryPakFile(PakFile):
     def __init__(self, state: PakState, pakBinary: PakBinary):
@@ -99,6 +251,13 @@ class BinaryPakFile(PakFile):
         self.retainInPool = 10
         self.useReader = True
         self.useFileId = False
+        self.useIndexCache = True
+        self.useNames = True # False lets a PakBinary skip its name table and serve known paths from filesByHash
+        self.pathIgnoreCase = False
+        self.coalesceGap = 64 * 1024
+        self.coalesceMax = 16 * 1024 * 1024
+        self.pipeline: DecodePipeline = None
+        self.objectCache: ObjectCache = None # opt-in, cached objects are shared between callers so only set it for immutable results
         # state
         self.fileMask = None
         self.params = {}
@@ -110,33 +269,53 @@ class BinaryPakFile(PakFile):
         self.files = None
         self.filesById = None
         self.filesByPath = None
+        self.filesByHash = None
         self.pathSkip = 0
+        # pool
+        self.readers: dict[str, ReaderPool] = {}
+        self.readersLock = threading.Lock()
+        self.windowFallbacks = 0 # loadFileDataMany entries whose format read outside dataExtent
 
     def valid(self) -> bool: return self.files != None
 
-    readers: dict[str, GenericPool] = {}
-    
-    def getReader(self, path: str = None, pooled: bool = True) -> Reader:
+    #region Pool
+    def getReader(self, path: str = None, pooled: bool = True) -> ReaderPool:
         path = path or self.pakPath
-        return self.readers.get(path) or self.readers.setdefault(path, GenericPool[Reader](lambda: self.fileSystem.openReader(path), lambda r: r.seek(0)) if self.fileSystem.fileExists(path) else None) if pooled else \
-            SinglePool[Reader](self.fileSystem.openReader(path) if self.fileSystem.fileExists(path) else None) 
-    
+        if not pooled: return SinglePool[Reader](self.fileSystem.openReader(path) if self.fileSystem.fileExists(path) else None)
+        with self.readersLock:
+            if (pool := self.readers.get(path)) is None and self.fileSystem.fileExists(path):
+                pool = self.readers[path] = ReaderPool(lambda: self.fileSystem.openReader(path), lambda r: r.seek(0), self.retainInPool)
+            return pool
+
+    # unpooled by default, a reader is opened and closed per call. per-entry reads opt in to the pool
     def reader(self, func: callable, path: str = None, pooled: bool = False): self.getReader(path, pooled).action(func)
 
     def readerT(self, func: callable, path: str = None, pooled: bool = False): return self.getReader(path, pooled).func(func)
 
+    def readerStats(self) -> dict[str, dict[str, object]]:
+        with self.readersLock: return { k:v.stats() for k,v in self.readers.items() }
+
+    def closeReaders(self) -> None:
+        with self.readersLock: pools = list(self.readers.values()); self.readers.clear()
+        for pool in pools: pool.close()
+    #endregion
+
     def opening(self) -> None:
-        self.read()
+        if not IndexCache.load(self):
+            self.read()
+            IndexCache.save(self)
         self.process()
 
-    def closing(self) -> None: pass
+    def closing(self) -> None:
+        self.closeReaders()
+        if self.objectCache is not None: self.objectCache.invalidate(self)
 
     def contains(self, path: FileSource | str | int) -> bool:
         match path:
             case None: raise Exception('Null')
             case s if isinstance(path, str):
                 pak, s2 = self._findPath(s)
-                return pak.contains(s2) if pak else self.filesByPath and s.replace('\\', '/') in self.filesByPath
+                return pak.contains(s2) if pak else (self.filesByPath and s in self.filesByPath) or (self.filesByHash is not None and s in self.filesByHash)
             case i if isinstance(path, int):
                 return self.filesById and i in self.filesById
             case _: raise Exception(f'Unknown: {path}')
@@ -148,7 +327,8 @@ class BinaryPakFile(PakFile):
             case s if isinstance(path, str):
                 pak, s2 = self._findPath(s)
                 if pak: return pak.getFileSource(s2)
-                files = self.filesByPath[s] if self.filesByPath and (s := s.replace('\\', '/')) in self.filesByPath else []
+                files = self.filesByPath[s] if self.filesByPath and s in self.filesByPath else \
+                    self.filesByHash[s] if self.filesByHash is not None and s in self.filesByHash else []
                 if len(files) == 1: return (self, files[0])
                 print(f'ERROR.LoadFileData: {s} @ {len(files)}')
                 if throwOnError: raise Exception(f'File not found: {s}' if len(files) == 0 else f'More then one file found: {s}')
@@ -169,6 +349,50 @@ class BinaryPakFile(PakFile):
         f = path
         return self.readData(f, option)
 
+    def loadFileDataMany(self, paths: list[FileSource | str | int], option: FileOption = FileOption.Default, throwOnError: bool = True, ordered: bool = True):
+        # yields (file, data), merging near-adjacent entries into one read. without a pipeline entries come back
+        # sorted by (archive, offset), with one they come back in request order, or as completed if not ordered
+        direct, spans = self._coalesce(paths, throwOnError)
+        if self.pipeline: yield from self.pipeline.run(self, direct, spans, option, throwOnError, ordered); return
+        for _, p, f in direct: yield (f, p.loadFileData(f, option, throwOnError))
+        for archive, start, end, files in spans:
+            buf = self._readSpan(archive, start, end)
+            for _, f in files: yield (f, self._readWindow(buf, start, archive, f, option))
+
+    def _coalesce(self, paths: list[FileSource | str | int], throwOnError: bool) -> (list, list):
+        # splits paths into direct [(index, pak, file)] and spans [(archive, start, end, [(index, file)])]
+        direct = []; extents = []
+        for k, path in enumerate(paths):
+            (p, f) = (self, path) if isinstance(path, FileSource) else self.getFileSource(path, throwOnError)
+            if not p: continue
+            extent = self.pakBinary.dataExtent(self, f) if p is self and self.useReader and self.pakBinary else None
+            if extent: extents.append((extent, k, f))
+            else: direct.append((k, p, f))
+        extents.sort(key = lambda x: (x[0][0], x[0][1]))
+        spans = []; i = 0
+        while i < len(extents):
+            (archive, start, size), _, _ = extents[i]
+            end = start + size; j = i + 1
+            while j < len(extents):
+                (archive2, start2, size2), _, _ = extents[j]
+                if archive2 != archive or start2 > end + self.coalesceGap or max(end, start2 + size2) - start > self.coalesceMax: break
+                end = max(end, start2 + size2); j += 1
+            spans.append((archive, start, end, [(k, f) for _, k, f in extents[i:j]]))
+            i = j
+        return direct, spans
+
+    def _readSpan(self, archive: str, start: int, end: int) -> memoryview:
+        def _read(r: Reader) -> bytes: r.seek(start); return r.readBytes(end - start)
+        return memoryview(self.readerT(_read, archive, True))
+
+    def _readWindow(self, buf: memoryview, start: int, archive: str, file: FileSource, option: FileOption) -> object:
+        try: return self.pakBinary.readData(self, WindowReader(buf, start, archive), file, option)
+        except EOFError:
+            # the format read outside its dataExtent, count it and warn once per pak so the extent can be fixed
+            with self.readersLock: self.windowFallbacks += 1; first = self.windowFallbacks == 1
+            if first: print(f'WARN.LoadFileDataMany: {file.path} read outside its extent in {archive}, falling back to readData')
+            return self.readData(file, option)
+
     def loadFileObject(self, type: type, path: FileSource | str | int, option: FileOption = FileOption.Default, throwOnError: bool = True) -> object:
         if not path: return None
         elif not isinstance(path, FileSource):
@@ -176,7 +400,10 @@ class BinaryPakFile(PakFile):
             return p.loadFileObject(type, f2, option, throwOnError) if p else None
         f = path
         if self.game.isPakFile(f.path): return None
-        data = self.loadFileData(f, option, throwOnError)
+        if self.objectCache is not None and (value := self.objectCache.get(self, f, type, option)) is not ObjectCache.MISS: return value
+        return self._createObject(type, f, self.loadFileData(f, option, throwOnError), option)
+
+    def _createObject(self, type: type, f: FileSource, data: bytes, option: FileOption = FileOption.Default) -> object:
         if not data: return None
         objectFactory = self._ensureCachedObjectFactory(f)
         if objectFactory != FileSource.emptyObjectFactory:
@@ -185,7 +412,7 @@ class BinaryPakFile(PakFile):
                 task = objectFactory(r, f, self)
                 if task:
                     value = task
-                    return value
+                    return self.objectCache.put(self, f, type, option, value) if self.objectCache is not None and not inspect.isawaitable(value) else value
             except: print(sys.exc_info()[1]); raise
         return data if type == BytesIO or type == object else \
             _throw(f'Stream not returned for {f.path} with {type}')
@@ -199,26 +426,58 @@ class BinaryPakFile(PakFile):
         return file.cachedObjectFactory
 
     def process(self) -> None:
-        if self.useFileId and self.files: self.filesById = { x.id:x for x in self.files if x }
-        if self.files: self.filesByPath = { k:list(g) for k,g in itertools.groupby(self.files, lambda x: x.path) }
+        if isinstance(self.files, FileTable):
+            if self.useFileId: self.filesById = self.files.byId()
+        elif self.useFileId and self.files: self.filesById = { x.id:x for x in self.files if x }
+        if self.files: self.filesByPath = PathIndex(self.files, self.pathIgnoreCase)
         if self.pakBinary: self.pakBinary.process(self)
 
     def _findPath(self, path: str) -> (object, str):
         paths = path.split(':', 2)
-        p = paths[0].replace('\\', '/')
+        p = paths[0]
         first = next(iter(self.filesByPath[p]), None) if self.filesByPath and p in self.filesByPath else None
         pak = first.pak if first else None
         if pak: pak.open()
         return pak, (paths[1] if pak and len(paths) > 1 else None)
 
+    def filesUnder(self, path: str, recursive: bool = True) -> list[FileSource]:
+        return list(self.filesByPath.under(path, recursive)) if self.filesByPath else []
+
     #region PakBinary
     def read(self, tag: object = None) -> None: return \
         self.readerT(lambda r: self.pakBinary.read(self, r, tag)) if self.useReader else \
         self.pakBinary.read(self, None, tag)
 
     def readData(self, file: FileSource, option: FileOption = None) -> bytes: return \
-        self.readerT(lambda r: self.pakBinary.readData(self, r, file, option)) if self.useReader else \
+        self.readerT(lambda r: self.pakBinary.readData(self, r, file, option), pooled = True) if self.useReader else \
         self.pakBinary.readData(self, None, file, option)
+
+    def readDataAsync(self, file: FileSource, option: FileOption = None) -> Future:
+        # the pipeline serves loadFileDataMany and this, a single loadFileData still decodes on the calling thread
+        return (self.pipeline or DecodePipeline.default()).submit(self.readData, file, option)
+    #endregion
+
+    #region Async
+    async def aloadFileData(self, path: FileSource | str | int, option: FileOption = FileOption.Default, throwOnError: bool = True) -> bytes:
+        if not path: return None
+        elif not isinstance(path, FileSource):
+            (p, f2) = await self._run(self.getFileSource, path, throwOnError) # may open a nested pak
+            return await p.aloadFileData(f2, option, throwOnError) if p else None
+        return await asyncio.wrap_future(self.readDataAsync(path, option))
+
+    async def aloadFileObject(self, type: type, path: FileSource | str | int, option: FileOption = FileOption.Default, throwOnError: bool = True) -> object:
+        if not path: return None
+        elif not isinstance(path, FileSource):
+            (p, f2) = await self._run(self.getFileSource, path, throwOnError)
+            return await p.aloadFileObject(type, f2, option, throwOnError) if p else None
+        f = path
+        if self.game.isPakFile(f.path): return None
+        if self.objectCache is not None and (value := self.objectCache.get(self, f, type, option)) is not ObjectCache.MISS: return value
+        data = await self.aloadFileData(f, option, throwOnError)
+        value = await self._run(self._createObject, type, f, data, option)
+        if not inspect.isawaitable(value): return value
+        value = await value
+        return self.objectCache.put(self, f, type, option, value) if self.objectCache is not None and value is not None else value
     #endregion
 
     #region Metadata
@@ -248,8 +507,8 @@ class ManyPakFile(BinaryPakFile):
             for s in self.paths]
 
     def readData(self, file: FileSource, option: FileOption = None) -> BytesIO:
-        return file.pak.readData(file, option) if file.pak else \
-            BytesIO(self.fileSystem.openReader(file.path).readBytes(file.fileSize))
+        if file.pak: return file.pak.readData(file, option)
+        with self.fileSystem.openReader(file.path) as r: return BytesIO(r.readBytes(file.fileSize))
     #endregion
 
 # MultiPakFile
@@ -310,7 +569,7 @@ class MultiPakFile(PakFile):
                 return value.loadFileData(i, option)
             case _: raise Exception(f'Unknown: {path}')
 
-    def loadFileObject(self, type: type, path: FileSource | str | int) -> object:
+    def loadFileObject(self, type: type, path: FileSource | str | int, option: FileOption = FileOption.Default) -> object:
         match path:
             case None: raise Exception('Null')
             case s if isinstance(path, str):
@@ -324,20 +583,62 @@ class MultiPakFile(PakFile):
                 return value.loadFileObject(type, i, option)
             case _: raise Exception(f'Unknown: {path}')
 
+    #region Async
+    async def aopen(self, items: list[MetaItem] = None, manager: MetaManager = None) -> PakFile:
+        await asyncio.gather(*[x.aopen() for x in self.pakFiles])
+        return await super().aopen(items, manager)
+
+    async def aclose(self) -> PakFile:
+        await asyncio.gather(*[x.aclose() for x in self.pakFiles])
+        return await super().aclose()
+
+    def _findPakFile(self, path: str | int) -> (PakFile, str | int):
+        match path:
+            case None: raise Exception('Null')
+            case s if isinstance(path, str):
+                pakFiles, s2 = self._findPakFiles(s)
+                value = next(iter([x for x in pakFiles if x.valid() and x.contains(s2)]), None)
+                return value or _throw(f'Could not find file {path}'), s2
+            case i if isinstance(path, int):
+                value = next(iter([x for x in self.pakFiles if x.valid() and x.contains(i)]), None)
+                return value or _throw(f'Could not find file {path}'), i
+            case _: raise Exception(f'Unknown: {path}')
+
+    async def aloadFileData(self, path: FileSource | str | int, option: FileOption = FileOption.Default, throwOnError: bool = True) -> bytes:
+        value, path = await self._run(self._findPakFile, path)
+        return await value.aloadFileData(path, option, throwOnError)
+
+    async def aloadFileObject(self, type: type, path: FileSource | str | int, option: FileOption = FileOption.Default, throwOnError: bool = True) -> object:
+        value, path = await self._run(self._findPakFile, path)
+        return await value.aloadFileObject(type, path, option, throwOnError)
+    #endregion
+
     #region Metadata
     def getMetaItems(self, manager: MetaManager) -> list[MetaInfo]:
         root = []
         for pakFile in [x for x in self.pakFiles if x.valid()]:
-            root.append(MetaItem(pakFile, pakFile.name, manager.packageIcon, pakFile = pakFile, items = pakFile.getMetaItems(manager)))
+            root.append(MetaItem(pakFile, pakFile.name, manager.packageIcon, pakFile = pakFile, loader = functools.partial(pakFile.getMetaItems, manager)))
         return root
     #endregion
 
 # tag::PakBinary[]
 # PakBinary
 class PakBinary:
+    indexCache: bool = False # files produced by read() can be persisted by IndexCache
+    def indexDependencies(self, source: BinaryPakFile) -> list[object]:
+        # values read() depends on besides the archive, e.g. an external name list's size and checksum. IndexCache keys on them
+        return []
     def read(self, source: BinaryPakFile, r: Reader, tag: object = None) -> None: pass
     def readData(self, source: BinaryPakFile, r: Reader, file: FileSource, option: FileOption = None): pass
     def process(self, source: BinaryPakFile): pass
+    def dataExtent(self, source: BinaryPakFile, file: FileSource) -> (str, int, int):
+        # the exact (archive, offset, size) readData touches for file, or None when it cannot be batched.
+        # formats opt in by overriding it once their extent is known to cover every byte readData reads
+        return None
+    @staticmethod
+    def readStream(r: Reader, size: int) -> BytesIO:
+        # zero-copy for stored entries when the reader is memory-mapped
+        return ViewIO(readView(size)) if (readView := getattr(r, 'readView', None)) else BytesIO(r.readBytes(size))
     def handleException(self, source: object, option: FileOption, message: str):
         print(message)
         if (option & FileOption.Supress) != 0: raise Exception(message)
@@ -359,7 +660,7 @@ class PakBinaryT(PakBinary):
 
         def opening(self) -> None: self.r = Reader(self.source.readData(file)); self.pool = StaticPool[Reader](self.r); super().opening()
         def closing(self) -> None: self.r.__exit__(); super().closing()
-        def getReader(path: str, pooled: bool) -> IGenericPool[Reader]: return self.pool
+        def getReader(self, path: str = None, pooled: bool = True) -> IGenericPool[Reader]: return self.pool
 
         # def read(self, r: Reader, tag: object = None):
         #     if self.useReader: super().read(r, tag); return
@@ -1,5 +1,6 @@
 from __future__ import annotations
-import os
+import os, asyncio, threading
+from concurrent.futures import Future
 from enum import Enum
 from gamex.pak import PakFile
 from openstk.gfx.gfx import IObjectManager, IMaterialManager, IShaderManager, ITextureManager, PlatformStats
@@ -7,6 +8,57 @@ from openstk.gfx.gfx_render import IMaterial
 from openstk.gfx.gfx_texture import ITexture
 from openstk.sfx.sfx import IAudioManager
 
+# PreloadLoop
+class PreloadLoop:
+    # the managers are called synchronously (render threads, no running loop), so preloads are scheduled
+    # on one background event loop and collected with Future.result(). managers acquire it while alive,
+    # the last one to release it stops the loop and joins its thread
+    _loop: asyncio.AbstractEventLoop = None
+    _thread: threading.Thread = None
+    _users: int = 0
+    _lock = threading.Lock()
+
+    @staticmethod
+    def loop() -> asyncio.AbstractEventLoop:
+        with PreloadLoop._lock:
+            if not PreloadLoop._loop:
+                loop = PreloadLoop._loop = asyncio.new_event_loop()
+                PreloadLoop._thread = threading.Thread(target = loop.run_forever, name = 'gamex-preload', daemon = True)
+                PreloadLoop._thread.start()
+            return PreloadLoop._loop
+
+    @staticmethod
+    def submit(coro: object) -> Future: return asyncio.run_coroutine_threadsafe(coro, PreloadLoop.loop())
+
+    @staticmethod
+    def acquire() -> None:
+        with PreloadLoop._lock: PreloadLoop._users += 1
+
+    @staticmethod
+    def release() -> None:
+        with PreloadLoop._lock: PreloadLoop._users -= 1
+        PreloadLoop.shutdown(False)
+
+    @staticmethod
+    def shutdown(force: bool = True) -> None:
+        # stops the loop and joins its thread, preloads still pending are cancelled so their result() raises
+        with PreloadLoop._lock:
+            if not force and PreloadLoop._users > 0: return
+            loop, thread = PreloadLoop._loop, PreloadLoop._thread
+            PreloadLoop._loop = PreloadLoop._thread = None
+        if not loop: return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        if tasks := asyncio.all_tasks(loop):
+            for task in tasks: task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions = True))
+        loop.close()
+
+    @staticmethod
+    def cancel(tasks: dict[object, Future]) -> None:
+        for task in tasks.values(): task.cancel()
+        tasks.clear()
+
 # AudioBuilderBase
 class AudioBuilderBase:
     def createAudio(self, path: object) -> Audio: pass
@@ -22,8 +74,12 @@ class AudioManager(IAudioManager):
     def __init__(self, pakFile: PakFile, builder: AudioBuilderBase):
         self._pakFile = pakFile
         self._builder = builder
+        self._preloadTasks = {} # per manager, dispose cancels only its own
+        PreloadLoop.acquire()
 
-    def createAudio(self, key: object) -> (Audio, object):
+    def dispose(self) -> None: PreloadLoop.cancel(self._preloadTasks); PreloadLoop.release()
+
+    def createAudio(self, path: object) -> (Audio, object):
         if path in self._cachedAudios: return self._cachedAudios[path]
         # load & cache the audio.
         tag = self._loadAudio(path)
@@ -34,18 +90,17 @@ class AudioManager(IAudioManager):
     def preloadAudio(self, path: object) -> None:
         if path in self._cachedAudios: return
         # start loading the audio file asynchronously if we haven't already started.
-        if not path in self._preloadTasks: self._preloadTasks[path] = self._pakFile.loadFileObject(object, path)
+        if not path in self._preloadTasks: self._preloadTasks[path] = PreloadLoop.submit(self._pakFile.aloadFileObject(object, path))
 
     def deleteAudio(self, path: object) -> None:
         if not path in self._cachedAudios: return
-        self._builder.deleteAudio(self._cachedAudios[0])
-        self._cachedAudios.remove(path)
+        self._builder.deleteAudio(self._cachedAudios.pop(path)[0])
 
-    async def _loadAudio(self, path: object) -> ITexture:
+    def _loadAudio(self, path: object) -> ITexture:
         assert(not path in self._cachedAudios)
-        self.preloadAudio(s)
-        source = await self._preloadTasks[path]
-        self._preloadTasks.remove(path)
+        self.preloadAudio(path)
+        source = self._preloadTasks[path].result()
+        self._preloadTasks.pop(path, None)
         return source
 
 # TextureBuilderBase
@@ -67,6 +122,10 @@ class TextureManager(ITextureManager):
     def __init__(self, pakFile: PakFile, builder: TextureBuilderBase):
         self._pakFile = pakFile
         self._builder = builder
+        self._preloadTasks = {} # per manager, dispose cancels only its own
+        PreloadLoop.acquire()
+
+    def dispose(self) -> None: PreloadLoop.cancel(self._preloadTasks); PreloadLoop.release()
 
     def createSolidTexture(self, width: int, height: int, rgba: list[float] = None) -> Texture: return self._builder.createSolidTexture(width, height, rgba)
 
@@ -92,18 +151,17 @@ class TextureManager(ITextureManager):
     def preloadTexture(self, path: object) -> None:
         if path in self._cachedTextures: return
         # start loading the texture file asynchronously if we haven't already started.
-        if not path in self._preloadTasks: self._preloadTasks[path] = self._pakFile.loadFileObject(object, path)
+        if not path in self._preloadTasks: self._preloadTasks[path] = PreloadLoop.submit(self._pakFile.aloadFileObject(object, path))
 
     def deleteTexture(self, path: object) -> None:
         if not path in self._cachedTextures: return
-        self._builder.deleteTexture(self._cachedTextures[0])
-        self._cachedTextures.remove(path)
+        self._builder.deleteTexture(self._cachedTextures.pop(path)[0])
 
-    async def _loadTexture(self, path: object) -> ITexture:
+    def _loadTexture(self, path: object) -> ITexture:
         assert(not path in self._cachedTextures)
-        self.preloadTexture(s)
-        source = await self._preloadTasks[path]
-        self._preloadTasks.remove(path)
+        self.preloadTexture(path)
+        source = self._preloadTasks[path].result()
+        self._preloadTasks.pop(path, None)
         return source
 
 # ShaderBuilderBase
@@ -141,6 +199,10 @@ class ObjectManager(IObjectManager):
         self._pakFile = pakFile
         self._materialManager = materialManager
         self._builder = builder
+        self._preloadTasks = {} # per manager, dispose cancels only its own
+        PreloadLoop.acquire()
+
+    def dispose(self) -> None: PreloadLoop.cancel(self._preloadTasks); PreloadLoop.release()
 
     def createNewObject(self, path: object) -> (object, object):
         tag = None
@@ -152,16 +214,16 @@ class ObjectManager(IObjectManager):
         return (self._builder.createNewObject(prefab[0]), prefab[1])
  
     def preloadObject(self, path: object) -> None:
-        if path in self._cachedPrefabs: return
+        if path in self._cachedObjects: return
         # start loading the object asynchronously if we haven't already started.
-        if not path in self._preloadTasks: self._preloadTasks[path] = self._pakFile.loadFileObject(object, path)
+        if not path in self._preloadTasks: self._preloadTasks[path] = PreloadLoop.submit(self._pakFile.aloadFileObject(object, path))
 
-    async def _loadObject(self, path: object) -> object:
-        assert(not path in self._cachedPrefabs)
+    def _loadObject(self, path: object) -> object:
+        assert(not path in self._cachedObjects)
         self.preloadObject(path)
-        source = await self._preloadTasks[path]
-        self._preloadTasks.remove(path)
-        return self._builder.buildObject(source, self._materialManager)
+        source = self._preloadTasks[path].result()
+        self._preloadTasks.pop(path, None)
+        return self._builder.createObject(source, self._materialManager)
 
 # MaterialBuilderBase
 class MaterialBuilderBase:
@@ -185,6 +247,10 @@ class MaterialManager(IMaterialManager):
         self._pakFile = pakFile
         self._textureManager = textureManager
         self._builder = builder
+        self._preloadTasks = {} # per manager, dispose cancels only its own
+        PreloadLoop.acquire()
+
+    def dispose(self) -> None: PreloadLoop.cancel(self._preloadTasks); PreloadLoop.release()
 
     def createMaterial(self, path: object) -> (Material, object):
         if path in self._cachedMaterials: return self._cachedMaterials[path]
@@ -198,13 +264,13 @@ class MaterialManager(IMaterialManager):
     def preloadMaterial(self, path: object) -> None:
         if path in self._cachedMaterials: return
         # start loading the material file asynchronously if we haven't already started.
-        if not path in self._preloadTasks: self._preloadTasks[path] = self._pakFile.loadFileObject(IMaterial, path)
+        if not path in self._preloadTasks: self._preloadTasks[path] = PreloadLoop.submit(self._pakFile.aloadFileObject(IMaterial, path))
 
-    async def _loadMaterial(self, path: object) -> IMaterial:
+    def _loadMaterial(self, path: object) -> IMaterial:
         assert(not path in self._cachedMaterials)
         self.preloadMaterial(path)
-        source = await self.preloadTasks[path]
-        self.preloadTasks.remove(path)
+        source = self._preloadTasks[path].result()
+        self._preloadTasks.pop(path, None)
         return source
 
 # typedefs
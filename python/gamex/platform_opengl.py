@@ -219,6 +219,9 @@ class OpenGLGfx(IOpenGLGfx):
         self.shaderManager = ShaderManager(source, OpenGLShaderBuilder())
         self.meshBufferCache = GLMeshBufferCache()
 
+    def dispose(self) -> None:
+        for manager in (self.objectManager, self.materialManager, self.textureManager): manager.dispose()
+
     def createTexture(self, path: object, level: range = None) -> int: return self.textureManager.createTexture(path, level)[0]
     def preloadTexture(self, path: object) -> None: self.textureManager.preloadTexture(path)
     def createObject(self, path: object) -> (object, dict[str, object]): return self.objectManager.createObject(path)[0]
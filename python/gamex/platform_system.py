@@ -18,4 +18,6 @@ class SystemSfx(ISystemSfx):
         self.source = source
         self.audioManager = AudioManager(source, SystemAudioBuilder())
 
+    def dispose(self) -> None: self.audioManager.dispose()
+
     def createAudio(self, path: object) -> int: return self.audioManager.createAudio(path)[0]
@@ -1,26 +1,126 @@
+import os, platform, json, time, threading, importlib
+from concurrent.futures import ThreadPoolExecutor
+
+GAMESPATH = 'Games'
+
+# store modules by key prefix, each exposes getPath, getManifests and getPaths
+stores = {
+    'Steam': 'gamex.store_steam',
+    'Gog': 'gamex.store_gog',
+    'Blizzard': 'gamex.store_blizzard',
+    'Epic': 'gamex.store_epic',
+    'Ubisoft': 'gamex.store_ubisoft',
+    'Abandon': 'gamex.store_abandon' }
+
+#region StoreCache
+
+# StoreCache
+class StoreCache:
+    # Found install paths per store, persisted so a warm start skips reading launcher manifests.
+    # An entry is reused while it is younger than ttl and its root and manifest signature are unchanged.
+    VERSION = 1
+    enabled: bool = not os.getenv('GAMEX_NO_STORE_CACHE')
+    ttl: float = float(os.getenv('GAMEX_STORE_CACHE_TTL') or 24 * 60 * 60)
+    path: str = os.getenv('GAMEX_STORE_CACHE') or os.path.join(os.path.expanduser('~'), '.cache', 'gamex', 'stores.json')
+
+    @staticmethod
+    def signature(paths: list[str]) -> list[object]:
+        def stat(path):
+            try: st = os.stat(path); return [path, st.st_size, st.st_mtime_ns]
+            except OSError: return [path, None, None]
+        return [stat(x) for x in paths]
+
+    @staticmethod
+    def load() -> dict[str, object]:
+        if not StoreCache.enabled: return {}
+        try:
+            with open(StoreCache.path, 'r', encoding = 'utf-8') as f: body = json.load(f)
+            return body['stores'] if body.get('version') == StoreCache.VERSION else {}
+        except (OSError, ValueError, KeyError): return {}
+
+    @staticmethod
+    def save(entries: dict[str, object]) -> None:
+        if not StoreCache.enabled: return
+        tempPath = f'{StoreCache.path}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(os.path.dirname(StoreCache.path), exist_ok = True)
+            with open(tempPath, 'w', encoding = 'utf-8') as f: json.dump({ 'version': StoreCache.VERSION, 'stores': entries }, f)
+            os.replace(tempPath, StoreCache.path)
+        except OSError:
+            try: os.remove(tempPath)
+            except OSError: pass
+
+    @staticmethod
+    def fresh(entry: dict[str, object], root: str, signature: list[object]) -> bool:
+        return entry is not None and entry['root'] == root and entry['signature'] == signature and \
+            0 <= time.time() - entry['time'] < StoreCache.ttl
+
+#endregion
+
+#region Discovery
+
+_storePaths: dict[str, dict[str, str]] = None
+_lock = threading.Lock()
+
+# local game roots, a Games folder on each drive
+def getGameRoots() -> list[str]:
+    import psutil
+    gameRoots = [os.path.join(x.mountpoint, GAMESPATH) for x in psutil.disk_partitions()]
+    if platform.system() == 'Android': gameRoots.append(os.path.join('/sdcard', GAMESPATH))
+    return gameRoots
+
+def _findLocal(root: str) -> dict[str, str]:
+    return {x:os.path.join(root, x) for x in os.listdir(root)} if os.path.isdir(root) else {}
+
+def _findStore(id: str, entry: dict[str, object]) -> (dict[str, str], dict[str, object]):
+    # returns the paths, and a new cache entry when they were read rather than reused
+    try:
+        store = importlib.import_module(stores[id])
+        if not (root := store.getPath()): return {}, None
+        signature = StoreCache.signature(store.getManifests(root))
+        if StoreCache.fresh(entry, root, signature): return entry['paths'], None
+        paths = store.getPaths(root)
+        return paths, { 'root': root, 'signature': signature, 'time': time.time(), 'paths': paths }
+    except Exception as e:
+        print(f'Store {id}: {e}')
+        return {}, None
+
+# finds the install paths of every store and local game root at once, each on its own thread
+def discover(refresh: bool = False) -> dict[str, dict[str, str]]:
+    global _storePaths
+    if _storePaths is not None and not refresh: return _storePaths
+    with _lock:
+        if _storePaths is not None and not refresh: return _storePaths
+        entries = StoreCache.load() if not refresh else {}
+        gameRoots = getGameRoots()
+        with ThreadPoolExecutor(len(stores) + len(gameRoots)) as executor:
+            found = { k:executor.submit(_findStore, k, entries.get(k)) for k in stores }
+            localFound = [executor.submit(_findLocal, x) for x in gameRoots]
+            storePaths = {}; changed = False
+            for k, future in found.items():
+                storePaths[k], entry = future.result()
+                if entry is not None: entries[k] = entry; changed = True
+            localGames = {}
+            for future in localFound:
+                try: localGames.update(future.result())
+                except OSError: pass
+        storePaths['Local'] = localGames
+        if changed: StoreCache.save(entries)
+        _storePaths = storePaths
+        return storePaths
+
+#endregion
+
 @staticmethod
 def getPathByKey(key):
     k,v = key.split(':', 2)
     match k:
-        case 'Steam':
-            from gamex.store_steam import steamPaths
-            return steamPaths[v] if v in steamPaths else None
-        case 'Gog':
-            from gamex.store_gog import gogPaths
-            return gogPaths[v] if v in gogPaths else None
-        case 'Blizzard':
-            from gamex.store_blizzard import blizzardPaths
-            return blizzardPaths[v] if v in blizzardPaths else None
-        case 'Epic':
-            from gamex.store_epic import epicPaths
-            return epicPaths[v] if v in epicPaths else None
-        case 'Ubisoft':
-            from gamex.store_ubisoft import ubisoftPaths
-            return ubisoftPaths[v] if v in ubisoftPaths else None
-        case 'Abandon':
-            from gamex.store_abandon import abandonPaths
-            return abandonPaths[v] if v in abandonPaths else None
         case 'Unknown': return None
+        case _ if k in stores: return discover()[k].get(v)
         case _: raise Exception(f'Unknown key: {key}')
 
+@staticmethod
+def getPathByDir(dir):
+    return discover()['Local'].get(dir)
+
 # print(getPathByKey('Steam:1755910'))
@@ -1,14 +1,17 @@
 import os, platform, json
 
 def getPath():
-    return 'G:\\AbandonLibrary'
-    
-# get abandonPaths
-abandonPaths = {}
-root = getPath()
-if not root or not os.path.exists(root):
-# query games
-for s in [s for s in os.listdir(root)]:
-    abandonPaths[os.path.basepath(s)] = appPath
+    root = 'G:\\AbandonLibrary'
+    return root if os.path.isdir(root) else None
+
+# manifests whose change invalidates the found paths
+def getManifests(root: str) -> list[str]: return [root]
 
-# print(abandonPaths)
+# get abandonPaths
+def getPaths(root: str) -> dict[str, str]:
+    abandonPaths = {}
+    # query games
+    for s in os.listdir(root):
+        appPath = os.path.join(root, s)
+        if os.path.isdir(appPath): abandonPaths[s] = appPath
+    return abandonPaths
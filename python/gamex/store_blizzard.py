@@ -1,5 +1,4 @@
 import os, platform
-from .Blizzard_pb2 import Database
 
 def getPath() -> None:
     system = platform.system()
@@ -20,11 +19,15 @@ def getPath() -> None:
     else: raise Exception(f'Unknown platform: {system}')
     return next(iter(x for x in paths if os.path.isdir(x)), None)
 
+# manifests whose change invalidates the found paths
+def getManifests(root: str) -> list[str]: return [os.path.join(root, 'product.db')]
+
 # get blizzardPaths
-blizzardPaths = {}
-root = getPath()
-if root and os.path.exists(dbPath := os.path.join(root, 'product.db')):
+def getPaths(root: str) -> dict[str, str]:
+    blizzardPaths = {}
+    if not os.path.exists(dbPath := os.path.join(root, 'product.db')): return blizzardPaths
     # query games
+    from .Blizzard_pb2 import Database
     productDb = Database()
     with open(dbPath, 'rb') as f:
         bytes = f.read()
@@ -35,5 +38,4 @@ if root and os.path.exists(dbPath := os.path.join(root, 'product.db')):
             # add appPath if exists
             appPath = app.Settings.InstallPath
             if os.path.isdir(appPath): blizzardPaths[app.Uid] = appPath
-
-# print(blizzardPaths)
\ No newline at end of file
+    return blizzardPaths
\ No newline at end of file
@@ -20,15 +20,17 @@ def getPath():
     else: raise Exception(f'Unknown platform: {system}')
     return next(iter(x for x in paths if os.path.isdir(x)), None)
     
+# manifests whose change invalidates the found paths
+def getManifests(root: str) -> list[str]: return [os.path.join(root, 'Manifests')]
+
 # get epicPaths
-epicPaths = {}
-root = getPath()
-if root and os.path.exists(dbPath := os.path.join(root, 'Manifests')):
+def getPaths(root: str) -> dict[str, str]:
+    epicPaths = {}
+    if not os.path.exists(dbPath := os.path.join(root, 'Manifests')): return epicPaths
     # query games
     for s in [s for s in os.listdir(dbPath) if s.endswith('.item')]:
         with open(os.path.join(dbPath, s), 'r') as f:
             # add appPath if exists
             appPath = json.loads(f.read())['InstallLocation']
             if os.path.isdir(appPath): epicPaths[s[:-5]] = appPath
-
-# print(epicPaths)
+    return epicPaths
@@ -21,10 +21,13 @@ def getPath():
     else: raise Exception(f'Unknown platform: {system}')
     return next(iter(s for s in paths if os.path.isdir(s)), None)
     
+# manifests whose change invalidates the found paths
+def getManifests(root: str) -> list[str]: return [os.path.join(root, 'galaxy-2.0.db')]
+
 # get gogPaths
-gogPaths = {}
-root = getPath()
-if root and os.path.exists(dbPath := os.path.join(root, 'galaxy-2.0.db')):
+def getPaths(root: str) -> dict[str, str]:
+    gogPaths = {}
+    if not os.path.exists(dbPath := os.path.join(root, 'galaxy-2.0.db')): return gogPaths
     # query games
     with closing(sqlite3.connect(dbPath)) as connection:
         with closing(connection.cursor()) as cursor:
@@ -32,5 +35,4 @@ if root and os.path.exists(dbPath := os.path.join(root, 'galaxy-2.0.db')):
                 # add appPath if exists
                 appPath = s[1]
                 if os.path.isdir(appPath): gogPaths[s[0]] = appPath
-
-# print(gogPaths)
+    return gogPaths
@@ -1,4 +1,4 @@
-import os, platform, winreg
+import os, platform
 
 # AcfStruct
 class AcfStruct:
@@ -55,6 +55,7 @@ def getPath():
     system = platform.system()
     if system == 'Windows':
         # windows paths
+        import winreg
         try: key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, 'SOFTWARE\\Valve\\Steam', 0, winreg.KEY_READ)
         except FileNotFoundError:
             try: key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, 'SOFTWARE\\Valve\\Steam', 0, winreg.KEY_READ | winreg.KEY_WOW64_32KEY)
@@ -73,12 +74,19 @@ def getPath():
     else: raise Exception(f'Unknown platform: {system}')
     return next(iter(x for x in paths if os.path.isdir(x)), None)
     
+# manifests whose change invalidates the found paths, an app manifest added or removed touches its library folder
+def getManifests(root: str) -> list[str]:
+    libraryPath = os.path.join(root, 'steamapps', 'libraryfolders.vdf')
+    libraryFolders = AcfStruct.read(libraryPath)
+    if libraryFolders is None: return [libraryPath]
+    return [libraryPath] + [os.path.join(x.value['path'], 'steamapps') for x in libraryFolders.get['libraryfolders'].get.values()]
+
 # get steamPaths
-steamPaths = {}
-root = getPath()
-if root:
+def getPaths(root: str) -> dict[str, str]:
+    steamPaths = {}
     # query games
     libraryFolders = AcfStruct.read(os.path.join(root, 'steamapps', 'libraryfolders.vdf'))
+    if libraryFolders is None: return steamPaths
     for folder in libraryFolders.get['libraryfolders'].get.values():
         path = folder.value['path']
         if not os.path.isdir(path): continue
@@ -88,5 +96,4 @@ if root:
             # add appPath if exists
             appPath = os.path.join(path, 'steamapps', 'common', appManifest.get['AppState'].value['installdir'])
             if os.path.isdir(appPath): steamPaths[appId] = appPath
-
-# print(steamPaths)
+    return steamPaths
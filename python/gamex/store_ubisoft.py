@@ -20,10 +20,13 @@ def getPath():
     else: raise Exception(f'Unknown platform: {system}')
     return next(iter(x for x in paths if os.path.isdir(x)), None)
     
+# manifests whose change invalidates the found paths
+def getManifests(root: str) -> list[str]: return [os.path.join(root, 'settings.yaml')]
+
 # get ubisoftPaths
-ubisoftPaths = {}
-root = getPath()
-if root and os.path.exists(dbPath := os.path.join(root, 'settings.yaml')): 
+def getPaths(root: str) -> dict[str, str]:
+    ubisoftPaths = {}
+    if not os.path.exists(dbPath := os.path.join(root, 'settings.yaml')): return ubisoftPaths
     with open(dbPath, 'r') as f: body = f.read()
     gamePath = body[body.index('game_installation_path:') + 23:body.index('installer_cache_path')].strip()
 
@@ -36,5 +39,4 @@ if root and os.path.exists(dbPath := os.path.join(root, 'settings.yaml')):
     #         # add appPath if exists
     #         appPath = json.loads(f.read())['InstallLocation']
     #         if os.path.isdir(appPath): ubisoftPaths[s[:-5]] = appPath
-
-# print(ubisoftPaths)
+    return ubisoftPaths
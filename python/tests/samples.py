@@ -0,0 +1,22 @@
+import random
+
+# candidate match distances at o, most recent first, from the last few positions of each 3 byte key
+def candidates(data: bytes, o: int, window: int, heads: dict) -> list[int]:
+    found = [o - j for j in reversed(heads.get(data[o:o + 3], ())) if o - j <= window]
+    heads.setdefault(data[o:o + 3], []).append(o); del heads[data[o:o + 3]][:-16]
+    return found + [d for d in (1, 2, 3) if d <= o and d not in found]
+
+# samples: text-like data with short and long repeats, runs, and noise
+def samples():
+    rnd = random.Random(7)
+    words = [bytes(rnd.randrange(97, 123) for _ in range(rnd.randrange(2, 9))) for _ in range(64)]
+    text = b' '.join(rnd.choice(words) for _ in range(6000))
+    yield b''
+    yield b'a'
+    yield b'abc' * 2000
+    yield bytes(rnd.randrange(256) for _ in range(3000))
+    yield text
+    yield text[:3000] + bytes(rnd.randrange(256) for _ in range(5000)) + text[:3000] # repeat from far back
+    # long matches at long distances, the widest length plus distance tokens
+    noise = bytes(rnd.randrange(256) for _ in range(1200))
+    yield noise[:600] + noise[600:] + noise[:600] + noise[:700] + bytes(rnd.randrange(256) for _ in range(2000)) + noise[:1200]
@@ -0,0 +1,51 @@
+import struct, zlib, pytest
+from types import SimpleNamespace
+from gamex.cache import IndexCache
+from gamex.file import StandardFileSystem
+from gamex.pak import BinaryPakFile, PakState
+from gamex.Bethesda.formats.pakbinary import PakBinary_Bsa, bsaHash
+
+# a Fallout 3 bsa with names, files as (folder, name, data, compressed)
+def bsa(files: list[(str, str, bytes, bool)]) -> bytes:
+    folders = {}
+    for folder, name, v, compressed in files:
+        v = struct.pack('<I', len(v)) + zlib.compress(v) if compressed else v
+        folders.setdefault(folder, []).append((name, v, (len(v) | 0xC0000000) if compressed else len(v))) # both flag bits, see PakBinary_Bsa.read
+    folderNames = b''.join(bytes([len(x) + 1]) + x.encode() + b'\0' for x in folders)
+    fileNames = b''.join(name.encode() + b'\0' for x in folders.values() for name, _, _ in x)
+    offset = 36 + 16 * len(folders) + len(folderNames) + 16 * len(files) + len(fileNames)
+    b = struct.pack('<I8I', 0x00415342, 0x68, 36, 3, len(folders), len(files), len(folderNames), len(fileNames), 0)
+    b += b''.join(struct.pack('<Q2I', bsaHash(x, True), len(v), 0) for x, v in folders.items())
+    data = b''
+    for folder, entries in folders.items():
+        b += bytes([len(folder) + 1]) + folder.encode() + b'\0'
+        for name, v, size in entries: b += struct.pack('<Q2I', bsaHash(name), size, offset + len(data)); data += v
+    return b + fileNames + data
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    monkeypatch.setattr(IndexCache, 'root', str(tmp_path / 'index'))
+    monkeypatch.setattr(IndexCache, 'enabled', True)
+    (tmp_path / 'game').mkdir()
+    (tmp_path / 'game' / 'test.bsa').write_bytes(bsa([('meshes\\clutter', 'Bowl01.NIF', b'bowl', False), ('meshes\\clutter', 'Cup.nif', b'cup ' * 64, True), ('textures', 'Sky.dds', b'sky!', False)]))
+    return tmp_path / 'game'
+
+def open_(root: str) -> BinaryPakFile:
+    game = SimpleNamespace(id = 'Test', family = None, resource = None)
+    return BinaryPakFile(PakState(StandardFileSystem(str(root)), game, path = 'test.bsa'), PakBinary_Bsa()).open()
+
+def test_hash_lookup_warm(root, monkeypatch):
+    for warm in (False, True):
+        if warm: monkeypatch.setattr(PakBinary_Bsa, 'read', lambda *args: pytest.fail('read on a warm open'))
+        with open_(root) as pak:
+            assert pak.filesByHash is not None
+            _, file = pak.getFileSource('MESHES/Clutter/bowl01.nif')
+            assert file.path == 'meshes/clutter/Bowl01.NIF'
+            assert pak.contains('Textures/SKY.DDS')
+
+def test_data_many_matches_data(root):
+    with open_(root) as pak:
+        assert all(pak.pakBinary.dataExtent(pak, x) for x in pak.files)
+        many = {x.path:v.read() for x, v in pak.loadFileDataMany(list(pak.files))}
+        assert many == {x.path:pak.loadFileData(x).read() for x in pak.files}
+        assert many['meshes/clutter/Cup.nif'] == b'cup ' * 64 and pak.windowFallbacks == 0
@@ -0,0 +1,53 @@
+from gamex._LIB.compression.blast import Blast, litcode, lencode, distcode, basex, extra
+from gamex.compression import codecs
+from tests.samples import candidates, samples
+
+#region Blast
+
+# implode encoder over the fixed tables: greedy matches, literals raw (lit = 0) or coded (lit = 1)
+def blastEncode(data: bytes, lit: int, dictx: int) -> bytes:
+    out = bytearray([lit, dictx]); bits = 0; count = 0
+    def put(v: int, n: int):
+        nonlocal bits, count
+        bits |= v << count; count += n
+        while count >= 8: out.append(bits & 0xFF); bits >>= 8; count -= 8
+    def putLength(n: int):
+        s = next(x for x in range(16) if basex[x] <= n < basex[x] + (1 << extra[x]))
+        v, l = lencode.codes[s]; put(v, l); put(n - basex[s], extra[s])
+    window = 64 << dictx; i = 0; heads = {}
+    while i < len(data):
+        best = 0; dist = 0
+        for d in candidates(data, i, window, heads):
+            n = 0
+            while n < 518 and i + n < len(data) and data[i - d + n] == data[i + n]: n += 1
+            if n > best and (n > 2 or d <= 256): best = n; dist = d
+        if best >= 2:
+            for k in range(i + 1, i + best): candidates(data, k, 0, heads)
+            put(1, 1); putLength(best)
+            low = 2 if best == 2 else dictx; d = dist - 1
+            v, l = distcode.codes[d >> low]; put(v, l); put(d & ((1 << low) - 1), low)
+            i += best
+        else:
+            put(0, 1)
+            if lit: v, l = litcode.codes[data[i]]; put(v, l)
+            else: put(data[i], 8)
+            i += 1
+    put(1, 1); putLength(519)
+    if count: out.append(bits & 0xFF)
+    return bytes(out)
+
+def test_blast():
+    for data in samples():
+        for lit in (0, 1):
+            for dictx in (4, 5, 6):
+                packed = blastEncode(data, lit, dictx)
+                out = bytearray(len(data))
+                assert Blast().decompress(packed, out) == len(data) and bytes(out) == data
+                assert b''.join(Blast().stream(packed[i:i + 5] for i in range(0, len(packed), 5))) == data
+                assert bytes(codecs.decode('blast', packed)) == data
+
+def test_blast_reference():
+    # the example stream from Mark Adler's blast.c
+    assert bytes(codecs.decode('blast', bytes([0x00, 0x04, 0x82, 0x24, 0x25, 0x8f, 0x80, 0x7f]), 13)) == b'AIAIAIAIAIAIA'
+
+#endregion
@@ -0,0 +1,30 @@
+import zlib, pytest
+from gamex.compression import codecs
+from tests.samples import samples
+from tests.test_lzss import lzssEncode
+from tests.test_blast import blastEncode
+from tests.test_lz4 import lz4Block, lz4Frame
+
+#region Codecs
+
+def encoders():
+    yield 'zlib', zlib.compress
+    yield 'deflate', lambda x: (c := zlib.compressobj(wbits = -15)).compress(x) + c.flush()
+    yield 'lzss', lzssEncode
+    yield 'blast', lambda x: blastEncode(x, 1, 6)
+    yield 'lz4', lz4Block
+    yield 'lz4', lz4Frame
+    try: import zstandard; yield 'zstd', zstandard.ZstdCompressor().compress
+    except ImportError: pass
+
+# decodeInto fills at most len(dst): an exact dst takes everything, a short one the leading bytes, an empty one nothing
+@pytest.mark.parametrize('id, encode', list(encoders()))
+def test_decode_into(id, encode):
+    data = next(x for x in samples() if len(x) > 5000)
+    src = encode(data)
+    for size in (len(data), 1000, 0):
+        dst = bytearray(size)
+        assert codecs.decodeInto(id, src, dst) == size
+        assert len(dst) == size and bytes(dst) == data[:size]
+
+#endregion
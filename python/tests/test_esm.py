@@ -0,0 +1,154 @@
+import os, struct, zlib, pytest
+from types import SimpleNamespace
+from gamex.cache import IndexCache
+from gamex.file import StandardFileSystem
+from gamex.pak import BinaryPakFile, PakState
+from gamex.Bethesda.formats import records
+from gamex.Bethesda.formats.records import FormType, FieldType, RecordIndex, FormIdIndex, RecordView
+from gamex.Bethesda.formats.pakbinary import PakBinary_Esm
+
+#region Synthetic TES4 plugins
+
+def field(type: bytes, data: bytes) -> bytes: return type + struct.pack('<H', len(data)) + data
+
+def record(type: bytes, formId: int, fields: bytes, compressed: bool = False) -> bytes:
+    flags = 0
+    if compressed: fields = struct.pack('<I', len(fields)) + zlib.compress(fields); flags = 0x40000
+    return type + struct.pack('<4I', len(fields), flags, formId, 0) + fields
+
+def group(label: bytes, body: bytes, groupType: int = 0) -> bytes: return b'GRUP' + struct.pack('<I', 20 + len(body)) + label + struct.pack('<2I', groupType, 0) + body
+
+def plugin(masters: list[str], *groups: bytes) -> bytes:
+    return record(b'TES4', 0, b''.join(field(b'MAST', x.encode() + b'\0') + field(b'DATA', bytes(8)) for x in masters)) + b''.join(groups)
+
+def edid(name: str) -> bytes: return field(b'EDID', name.encode() + b'\0')
+
+def base() -> bytes:
+    return plugin([],
+        group(b'GMST', record(b'GMST', 0x10, edid('fOne') + field(b'DATA', struct.pack('<f', 1.)))),
+        group(b'STAT', record(b'STAT', 0x20, edid('Rock')) + record(b'STAT', 0x21, edid('Tree') + field(b'MODL', b'tree.nif\0'), True) + record(b'STAT', 0x22, edid('Bush'))),
+        group(b'CELL', record(b'CELL', 0x30, edid('Cave')) + group(struct.pack('<I', 0x30), record(b'STAT', 0x31, edid('Inner')), 6)))
+
+def open_(root: str, name: str) -> BinaryPakFile:
+    game = SimpleNamespace(id = 'Oblivion', family = None, resource = None)
+    return BinaryPakFile(PakState(StandardFileSystem(str(root)), game, path = name), PakBinary_Esm()).open()
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    monkeypatch.setattr(records, '_warned', set())
+    monkeypatch.setattr(IndexCache, 'root', str(tmp_path / 'index'))
+    monkeypatch.setattr(IndexCache, 'enabled', True)
+    (tmp_path / 'Base.esm').write_bytes(base())
+    # overrides Rock and adds a record of its own
+    (tmp_path / 'Mod.esp').write_bytes(plugin(['Base.esm'], group(b'STAT', record(b'STAT', 0x20, edid('Boulder')) + record(b'STAT', 0x01000040, edid('Fence')))))
+    # its master is not in the load order
+    (tmp_path / 'Orphan.esp').write_bytes(plugin(['Missing.esm'], group(b'STAT', record(b'STAT', 0x50, edid('Lost')) + record(b'STAT', 0x01000051, edid('Found')))))
+    return tmp_path
+
+#endregion
+
+#region RecordIndex
+
+def test_scan(root):
+    with open_(root, 'Base.esm') as pak:
+        index = pak.index
+        assert len(index) == 7 and index.masters == []
+        assert [FormType(x).name for x in index.types] == ['TES4', 'GMST', 'STAT', 'STAT', 'STAT', 'CELL', 'STAT']
+        assert list(index.ofType(FormType.STAT)) == [2, 3, 4, 6] and len(index.ofType(FormType.WEAP)) == 0
+        assert index.find(0x21) == 3 and index.find(0x99) is None
+        # groups are (label, groupType, position, dataSize, parent), the cell children group sits inside the CELL group
+        assert [(FormType(x[0]).name if x[1] == 0 else x[0], x[1], x[4]) for x in index.groups] == [('GMST', 0, -1), ('STAT', 0, -1), ('CELL', 0, -1), (0x30, 6, 2)]
+        assert list(index.parents) == [-1, 0, 1, 1, 1, 2, 3]
+        assert index.header(3).compressed and not index.header(2).compressed
+
+def test_decode_on_demand(root, capsys):
+    with open_(root, 'Base.esm') as pak:
+        index = pak.index
+        assert not index.records # scan decodes nothing
+        assert index.getRecords(FormType.STAT) == [] # STAT is not ported, it is skipped
+        assert index.getRecord(0x22) is None
+        assert capsys.readouterr().out.count('Unported ESM record type: STAT') == 1 # warned once, not per record
+
+def test_inflate_workers(root, monkeypatch):
+    # the pooled path yields the same payloads in the same order as the serial one
+    monkeypatch.setattr(RecordIndex, 'batchBytes', 1)
+    with open_(root, 'Base.esm') as pak:
+        serial = pak.readerT(lambda r: pak.index.inflate(r, workers = 1))
+        pooled = pak.readerT(lambda r: pak.index.inflate(r, workers = 4))
+        assert serial and list(serial.items()) == list(pooled.items())
+
+def test_record_cache_bound(root):
+    with open_(root, 'Base.esm') as pak:
+        index = pak.index; index.maxRecords = 2
+        views = [index.getView(x) for x in (0x20, 0x21, 0x22)]
+        assert len(index.records) == 2 and (index.hits, index.misses) == (0, 3)
+        assert index.getView(0x22) is views[2] and index.getView(0x20) is not views[0] # the oldest was evicted
+        assert (index.hits, index.misses) == (1, 4)
+
+#endregion
+
+#region FormIdIndex
+
+order = ['Base.esm', 'Mod.esp', 'Orphan.esp']
+
+def test_load_order(root):
+    paks = [open_(root, x) for x in order]
+    index = FormIdIndex.build([x.index for x in paks])
+    assert index.plugins == order and index.masters == [[], ['Base.esm'], ['Missing.esm']]
+    assert list(index.keys) == [0x10, 0x20, 0x21, 0x22, 0x30, 0x31, 0x01000040, 0x02000051]
+    # later plugins win, positions are the winner's
+    assert index.find(0x20) == ('Mod.esp', paks[1].index.positions[paks[1].index.find(0x20)])
+    assert index.find(0x21)[0] == 'Base.esm' and 0x50 not in index and index.find(0x50) is None
+    # plugin local formIds through the plugin's masters
+    assert index.resolve('Mod.esp', 0x20) == 0x20 and index.resolve('mod.ESP', 0x01000040) == 0x01000040
+    assert index.resolve('Orphan.esp', 0x01000051) == 0x02000051 and index.resolve('Orphan.esp', 0x50) == -1
+    assert index.resolve('Unknown.esp', 0x20) == -1 and index.resolve('Unknown.esp', 0x20, ['Base.esm']) == 0x20
+    for pak in paks: pak.close()
+
+def test_cache(root):
+    paths = [str(root / x) for x in order]
+    built = FormIdIndex.build([open_(root, x).index for x in order], paths)
+    cached = FormIdIndex.load(paths) # no plugins opened
+    assert cached is not None and list(cached.keys) == list(built.keys) and list(cached.positions) == list(built.positions)
+    assert cached.resolve('Mod.esp', 0x01000040) == 0x01000040 and cached.find(0x20)[0] == 'Mod.esp'
+    st = os.stat(paths[1]); os.utime(paths[1], ns = (st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert FormIdIndex.load(paths) is None # a changed plugin drops the entry
+
+#endregion
+
+#region RecordView
+
+# FLTV
+class FLTV:
+    struct = ('<f', 4)
+    def __init__(self, tuple): self.value = tuple[0]
+
+def test_view_fields():
+    data = plugin(['A.esm', 'B.esm'])[20:]
+    view = RecordView(data, FormType.TES4)
+    assert len(view) == 4 and FieldType.MAST in view and FieldType.EDID not in view
+    assert [bytes(x) for x in view.fields(FieldType.MAST)] == [b'A.esm\0', b'B.esm\0'] and view.getString(FieldType.MAST) == 'A.esm'
+    assert view.field(FieldType.MAST).obj is view.data.obj # a slice of the record data, not a copy
+    assert view.field(FieldType.EDID) is None and view.getString(FieldType.EDID) is None and view.fields(FieldType.EDID) == []
+    assert RecordView(field(b'DATA', struct.pack('<f', 2.5)), FormType.TES5).getS(FieldType.DATA, FLTV).value == 2.5
+
+def test_view_large_field():
+    # XXXX carries the size of a field too large for its 16 bit size
+    big = bytes(range(256)) * 300
+    view = RecordView(field(b'XXXX', struct.pack('<I', len(big))) + b'DATA' + struct.pack('<H', 0) + big + edid('After'), FormType.TES4)
+    assert len(view) == 2 and bytes(view.field(FieldType.DATA)) == big and view.getString(FieldType.EDID) == 'After'
+
+def test_view_tes3():
+    data = b'NAME' + struct.pack('<I', 5) + b'Rock\0' + b'MODL' + struct.pack('<I', 9) + b'rock.nif\0'
+    view = RecordView(data, FormType.TES3)
+    assert view.getString(FieldType.NAME) == 'Rock' and view.getString(FieldType.MODL) == 'rock.nif'
+
+def test_record_views(root):
+    with open_(root, 'Base.esm') as pak:
+        views = pak.index.getViews(FormType.STAT)
+        assert [x.EDID.value for x in views] == ['Rock', 'Tree', 'Bush', 'Inner'] # unported types come back as base records
+        tree = pak.index.getView(0x21)
+        assert tree is views[1] and tree.header.compressed and tree.view.getString(FieldType.MODL) == 'tree.nif'
+        assert pak.index.getView(0x10).view.getS(FieldType.DATA, FLTV).value == 1.
+
+#endregion
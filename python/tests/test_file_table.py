@@ -0,0 +1,41 @@
+import pytest
+from gamex.meta import FileSource, FileTable
+from gamex.cache import IndexCache, _Encoder, _Decoder
+
+fields = ('id', 'path', 'offset', 'fileSize', 'packedSize', 'compressed', 'flags', 'hash', 'tag', 'data')
+def row(x: FileSource) -> tuple: return tuple(getattr(x, name) for name in fields)
+
+def rows() -> list[FileSource]:
+    return [FileSource(id = 1, path = 'a/b.txt', offset = 0, fileSize = 10, packedSize = 4, compressed = 'Z', flags = 0, hash = 0xFFFFFFFFFFFFFFFE, tag = 'x'),
+        FileSource(path = 'a/é.bin'), # every optional field None, a non-ascii path
+        FileSource(id = 3, path = 'a/b.txt', offset = -1, fileSize = 0, compressed = 'Z', tag = [1, 2], data = b'pre'), # unhashable tag and data go to extras
+        FileSource(id = 4, path = '', tag = 'x')]
+
+def table() -> FileTable:
+    files = FileTable()
+    for x in rows(): files.append(x)
+    return files
+
+def test_round_trip():
+    files = table()
+    assert len(files) == 4 and [row(x) for x in files] == [row(x) for x in rows()]
+    assert row(files[-1]) == row(rows()[3]) and [x.id for x in files[1:3]] == [None, 3]
+    assert files.compressedValues == [None, 'Z'] and files.tagValues == [None, 'x'] # interned once
+    assert files.extras == {2: {'tag': [1, 2], 'data': b'pre'}}
+    assert files[0] is files[0] # views are reused while referenced
+
+def test_lookups():
+    files = table()
+    byPath = files.byPath()
+    assert [x.id for x in byPath['a/b.txt']] == [1, 3] and byPath['a/é.bin'][0].id is None
+    byId = files.byId()
+    assert sorted(byId.keys()) == [1, 3, 4] and byId[4][0].path == '' and byId.get(2) is None
+
+def test_index_cache_table():
+    with pytest.raises(IndexCache.Uncacheable): IndexCache.saveTable(_Encoder(), table()) # a list tag has no encoding
+    source = rows(); source[2].tag = 'y'
+    files = FileTable()
+    for x in source: files.append(x)
+    w = _Encoder(); IndexCache.saveTable(w, files)
+    files = IndexCache.loadTable(_Decoder(bytes(w.b)))
+    assert [row(x) for x in files] == [row(x) for x in source] and files.extras == {2: {'data': b'pre'}}
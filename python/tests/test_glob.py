@@ -0,0 +1,31 @@
+import os, itertools
+from gamex.file import StandardFileSystem, globRegex
+
+def tree(root) -> None:
+    for path in ('a/1.txt', 'a/2.dat', 'a/x/3.txt', 'b/4.txt', 'b/y/z/5.TXT', 'c/6.txt', 'top.txt'):
+        os.makedirs(root / os.path.dirname(path), exist_ok = True); (root / path).write_bytes(b'')
+
+def found(fs: StandardFileSystem, path: str, pattern: str) -> list[str]: return sorted(x.replace(os.sep, '/') for x in fs.glob(path, pattern))
+
+def test_patterns(tmp_path):
+    tree(tmp_path); fs = StandardFileSystem(str(tmp_path))
+    assert found(fs, '', '*.txt') == ['top.txt']
+    assert found(fs, '', '**/*.txt') == ['a/1.txt', 'a/x/3.txt', 'b/4.txt', 'c/6.txt', 'top.txt']
+    assert found(fs, '', '*/*/*.txt') == ['a/x/3.txt']
+    assert found(fs, 'b', '**/*') == ['b/4.txt', 'b/y/z/5.TXT']
+    assert found(fs, '', 'a/1.txt') == ['a/1.txt'] and found(fs, '', 'a/9.txt') == []
+    assert globRegex('**/*.txt').fullmatch('a/x/3.txt') and not globRegex('*.txt').fullmatch('a/1.txt')
+
+def test_early_termination(tmp_path, monkeypatch):
+    tree(tmp_path); fs = StandardFileSystem(str(tmp_path))
+    listed = []; scandir = os.scandir
+    monkeypatch.setattr(os, 'scandir', lambda path: listed.append(path) or scandir(path))
+    assert next(fs.glob('', '*.txt')) == 'top.txt' and len(listed) == 1 # walking is lazy
+    fs2 = StandardFileSystem(str(tmp_path)); listed.clear()
+    assert len(list(itertools.islice(fs2.glob('', '**/*.txt'), 2))) == 2
+    assert len(listed) == 2 # the root and its first subdirectory, not all eight directories
+    list(fs.glob('', '**/*')); count = len(listed)
+    list(fs.glob('', '**/*.dat'))
+    assert len(listed) == count # listings are shared between globs
+    fs.refresh(); list(fs.glob('', '*.txt'))
+    assert len(listed) == count + 1
@@ -0,0 +1,61 @@
+import threading, pytest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from gamex.file import BlockCache, HostFileSystem
+httpx = pytest.importorskip('httpx')
+
+DATA = bytes(range(256)) * 4 # 1024 bytes, 64 blocks of 16
+
+# Handler_Test
+class Handler_Test(BaseHTTPRequestHandler):
+    ranges = True
+    requests: list[(int, int)] = []
+    def log_message(self, format: str, *args) -> None: pass
+    def do_HEAD(self) -> None:
+        if self.path != '/test.bin': self.send_response(404); self.end_headers(); return
+        self.send_response(200); self.send_header('Content-Length', str(len(DATA))); self.end_headers()
+    def do_GET(self) -> None:
+        if (header := self.headers.get('Range')) and self.ranges:
+            start, end = (int(x) for x in header[6:].split('-')); body = DATA[start:end + 1]
+            self.send_response(206); self.send_header('Content-Range', f'bytes {start}-{end}/{len(DATA)}')
+        else: start, end = 0, len(DATA) - 1; body = DATA; self.send_response(200)
+        self.requests.append((start, end + 1))
+        self.send_header('Content-Length', str(len(body))); self.end_headers(); self.wfile.write(body)
+
+@pytest.fixture
+def server():
+    Handler_Test.ranges = True; Handler_Test.requests = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler_Test)
+    threading.Thread(target = server.serve_forever, daemon = True).start()
+    yield f'http://127.0.0.1:{server.server_address[1]}/'
+    server.shutdown(); server.server_close()
+
+def test_sequential_runs(server):
+    with HostFileSystem(server, cache = BlockCache(16, 4096)) as fs:
+        with fs.openReader('test.bin') as r: data = b''.join(r.readBytes(10) for _ in range(103))
+        assert data == DATA
+        # the run doubles while reads stay sequential, so 64 blocks take a handful of contiguous requests
+        requests = Handler_Test.requests
+        assert [e - s for s, e in requests] == [16, 32, 64, 128, 256, 256, 256, 16]
+        assert all(requests[i][1] == requests[i + 1][0] for i in range(len(requests) - 1))
+        with fs.openReader('test.bin') as r: assert r.readBytes(1024) == DATA # cached
+        assert len(Handler_Test.requests) == 8 and fs.cache.hits > 64
+
+def test_seek_resets_run(server):
+    with HostFileSystem(server, cache = BlockCache(16, 4096)) as fs:
+        with fs.openReader('test.bin') as r:
+            r.readBytes(16); r.readBytes(16)
+            r.seek(800); assert r.readBytes(4) == DATA[800:804]
+        assert Handler_Test.requests == [(0, 16), (16, 48), (800, 816)]
+        assert not fs.fileExists('missing.bin')
+
+def test_eviction(server):
+    with HostFileSystem(server, cache = BlockCache(16, 64)) as fs:
+        with fs.openReader('test.bin') as r: assert r.readBytes(1024) == DATA
+        assert fs.cache.size <= 64 and len(fs.cache.blocks) == 4
+        assert [e - s for s, e in Handler_Test.requests] == [16] * 64 # the run is capped at a quarter of the cache
+
+def test_no_range_support(server):
+    Handler_Test.ranges = False
+    with HostFileSystem(server, cache = BlockCache(16, 4096)) as fs:
+        with fs.openReader('test.bin') as r: r.seek(512); assert r.readBytes(32) == DATA[512:544]; r.seek(0); assert r.readBytes(16) == DATA[:16]
+        assert Handler_Test.requests == [(0, 1024)] # the whole file came back once and filled the cache
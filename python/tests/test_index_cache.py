@@ -0,0 +1,49 @@
+import os, pytest
+from types import SimpleNamespace
+from gamex.cache import IndexCache
+from gamex.file import StandardFileSystem
+from gamex.meta import FileSource
+from gamex.pak import PakBinary
+
+# PakBinary_Test
+class PakBinary_Test(PakBinary):
+    indexCache = True
+    names = 'v1' # stands in for an external name list read() depends on
+    def indexDependencies(self, source: object) -> list[object]: return [self.names]
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(IndexCache, 'root', str(tmp_path / 'index'))
+    monkeypatch.setattr(IndexCache, 'enabled', True)
+    (tmp_path / 'game').mkdir(); (tmp_path / 'game' / 'test.pak').write_bytes(b'PAK\0' * 64)
+    return tmp_path / 'game'
+
+def source(root: str) -> object:
+    return SimpleNamespace(fileSystem = StandardFileSystem(str(root)), pakPath = 'test.pak', game = SimpleNamespace(id = 'Test'),
+        pakBinary = PakBinary_Test(), useIndexCache = True, useNames = True, files = None, magic = None, version = None, tag = None)
+
+def files() -> list[FileSource]:
+    return [FileSource(id = 1, path = 'data/a.txt', offset = 4, fileSize = 10, packedSize = 8, compressed = 1, hash = 0x1234),
+        FileSource(id = 2, path = 'data/b.bin', offset = 12, fileSize = 100, flags = 2, tag = 'x')]
+
+def test_round_trip(cache):
+    s = source(cache); s.files = files(); s.magic = 0x4B4150; s.version = 7
+    assert IndexCache.save(s)
+    s2 = source(cache)
+    assert IndexCache.load(s2)
+    assert (s2.magic, s2.version) == (s.magic, s.version)
+    assert [(x.id, x.path, x.offset, x.fileSize, x.packedSize, x.compressed, x.flags, x.hash, x.tag) for x in s2.files] == \
+        [(x.id, x.path, x.offset, x.fileSize, x.packedSize, x.compressed, x.flags, x.hash, x.tag) for x in s.files]
+
+def test_touch_invalidates(cache):
+    s = source(cache); s.files = files()
+    assert IndexCache.save(s)
+    st = os.stat(cache / 'test.pak'); os.utime(cache / 'test.pak', ns = (st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert not IndexCache.load(source(cache))
+    assert not os.listdir(IndexCache.root) # the stale entry is dropped
+
+def test_dependency_invalidates(cache):
+    s = source(cache); s.files = files()
+    assert IndexCache.save(s)
+    s2 = source(cache); s2.pakBinary.names = 'v2'
+    assert not IndexCache.load(s2)
@@ -0,0 +1,94 @@
+import struct, pytest
+import gamex.compression
+from gamex._LIB.compression.lz4 import Lz4
+from gamex.compression import codecs
+from tests.samples import samples
+
+#region Lz4
+
+# greedy block encoder, the last 5 bytes are always literals as the format requires
+def lz4Block(data: bytes) -> bytes:
+    out = bytearray(); anchor = 0; i = 0; table = {}; end = len(data) - 12
+    def length(n: int) -> bytes:
+        b = bytearray()
+        while n >= 255: b.append(255); n -= 255
+        b.append(n); return bytes(b)
+    while i < end:
+        key = data[i:i + 4]; j = table.get(key); table[key] = i
+        if j is None or i - j > 65535: i += 1; continue
+        n = 4
+        while i + n < len(data) - 5 and data[j + n] == data[i + n]: n += 1
+        lits = i - anchor; m = n - 4
+        out.append((min(lits, 15) << 4) | min(m, 15))
+        if lits >= 15: out += length(lits - 15)
+        out += data[anchor:i] + struct.pack('<H', i - j)
+        if m >= 15: out += length(m - 15)
+        i += n; anchor = i
+    lits = len(data) - anchor
+    out.append(min(lits, 15) << 4)
+    if lits >= 15: out += length(lits - 15)
+    return bytes(out + data[anchor:])
+
+# xxHash32 of a frame descriptor (under 16 bytes), its second byte is the header checksum
+def xxh32(data: bytes, seed: int = 0) -> int:
+    P1, P2, P3, P4, P5 = 2654435761, 2246822519, 3266489917, 668265263, 374761393
+    rotl = lambda x, r: ((x << r) | (x >> (32 - r))) & 0xFFFFFFFF
+    h = (seed + P5 + len(data)) & 0xFFFFFFFF; i = 0
+    while i + 4 <= len(data): h = rotl((h + int.from_bytes(data[i:i + 4], 'little') * P3) & 0xFFFFFFFF, 17) * P4 & 0xFFFFFFFF; i += 4
+    for b in data[i:]: h = rotl((h + b * P5) & 0xFFFFFFFF, 11) * P1 & 0xFFFFFFFF
+    h ^= h >> 15; h = h * P2 & 0xFFFFFFFF; h ^= h >> 13; h = h * P3 & 0xFFFFFFFF; h ^= h >> 16
+    return h
+
+# frame of independent or linked blocks, stored blocks mixed in
+def lz4Frame(data: bytes, blockSize: int = 65536, stored: bool = False) -> bytes:
+    out = bytearray(struct.pack('<I', 0x184D2204)) + bytes([0x60, 0x40, (xxh32(bytes([0x60, 0x40])) >> 8) & 0xFF])
+    for i in range(0, len(data), blockSize):
+        chunk = data[i:i + blockSize]
+        if stored and (i // blockSize) % 2: out += struct.pack('<I', len(chunk) | 0x80000000) + chunk
+        else: block = lz4Block(chunk); out += struct.pack('<I', len(block)) + block
+    return bytes(out + b'\0\0\0\0')
+
+def test_lz4_block():
+    for data in samples():
+        out = bytearray(len(data))
+        assert Lz4().decompress(lz4Block(data), out) == len(data) and bytes(out) == data
+
+def test_lz4_overlap():
+    # offset 1 and 3 matches repeat their period
+    block = bytes([0x1F, ord('a'), 1, 0, 20]) + bytes([0x3F]) + b'xyz' + bytes([3, 0, 0]) + bytes([0x50]) + b'tail!'
+    out = bytearray(40 + 22 + 5)
+    assert Lz4().decompress(block, out) == len(out)
+    assert bytes(out) == b'a' * 40 + (b'xyz' * 8)[:22] + b'tail!'
+
+def test_lz4_frame():
+    for data in samples():
+        for stored in (False, True):
+            out = bytearray(len(data))
+            assert Lz4().decompress(lz4Frame(data, 4096, stored), out) == len(data) and bytes(out) == data
+            frame = lz4Frame(data, 4096, stored)
+            chunks = iter(frame[i:i + 7] for i in range(0, len(frame), 7)); buf = bytearray()
+            def read(n: int) -> bytes:
+                b = bytearray()
+                while len(buf) < n and (c := next(chunks, None)) is not None: buf.extend(c)
+                b += buf[:n]; del buf[:n]; return bytes(b)
+            if data: assert b''.join(Lz4().stream(read)) == data
+            assert bytes(codecs.decode('lz4', frame)) == data
+
+# the lz4 package when installed, else the pure-Python decoder, the codec must behave the same either way
+@pytest.fixture(params = ['lz4', 'python'])
+def backend(request, monkeypatch):
+    if request.param == 'lz4': pytest.importorskip('lz4.block')
+    else: monkeypatch.setattr(gamex.compression, '_lz4Module', lambda: None)
+    return request.param
+
+def test_lz4_codec(backend):
+    data = next(x for x in samples() if len(x) > 1000)
+    block = lz4Block(data); frame = lz4Frame(data, 4096)
+    assert bytes(codecs.decode('lz4', block, len(data))) == data
+    assert bytes(codecs.decode('lz4', frame, len(data))) == data
+    assert bytes(codecs.decode('lz4', frame)) == data
+    # a raw block has no size of its own
+    with pytest.raises(NotImplementedError): codecs.decode('lz4', block)
+    with pytest.raises(NotImplementedError): codecs.decode('lz4', block, 0)
+
+#endregion
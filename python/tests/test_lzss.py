@@ -0,0 +1,48 @@
+import struct
+from gamex._LIB.compression.lzss import Lzss
+from gamex.compression import codecs
+from tests.samples import candidates, samples
+
+#region Lzss
+
+# greedy encoder: blocks of up to 0x7000 input bytes, each against a fresh ring, alternating with raw blocks
+def lzssEncode(data: bytes, raw: bool = True) -> bytes:
+    out = bytearray(); i = 0; block = 0
+    while i < len(data):
+        chunk = data[i:i + 0x7000]; i += len(chunk); block += 1
+        if raw and block % 3 == 0: out += struct.pack('>h', -len(chunk)) + chunk; continue
+        body = bytearray(); o = 0; heads = {}
+        while o < len(chunk):
+            flagsAt = len(body); body.append(0); flags = 0
+            for bit in range(8):
+                if o >= len(chunk): break
+                best = 0; dist = 0
+                for d in candidates(chunk, o, 4096 - 18, heads):
+                    n = 0
+                    while n < 18 and o + n < len(chunk) and chunk[o - d + n] == chunk[o + n]: n += 1
+                    if n > best: best = n; dist = d
+                if best >= 3:
+                    src = (4078 + o - dist) & 0xFFF
+                    body += bytes([src & 0xFF, ((src >> 4) & 0xF0) | (best - 3)])
+                    for k in range(o + 1, o + best): candidates(chunk, k, 0, heads)
+                    o += best
+                else: flags |= 1 << bit; body.append(chunk[o]); o += 1
+            body[flagsAt] = flags
+        out += struct.pack('>h', len(body)) + body
+    return bytes(out + b'\0\0')
+
+def test_lzss_roundtrip():
+    for data in samples():
+        for raw in (False, True):
+            packed = lzssEncode(data, raw)
+            assert bytes(Lzss(packed, len(data)).decompress()) == data
+            assert bytes(codecs.decode('lzss', packed, len(data))) == data
+            assert bytes(codecs.decode('lzss', packed)) == data
+
+def test_lzss_into():
+    data = b'hello hello hello world ' * 50
+    out = bytearray(len(data) + 10)
+    lzss = Lzss(lzssEncode(data), len(out)); lzss.decompress(out)
+    assert lzss.written == len(data) and bytes(out[:len(data)]) == data
+
+#endregion
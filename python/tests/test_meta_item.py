@@ -0,0 +1,30 @@
+from types import SimpleNamespace
+from gamex.meta import FileSource, MetaItem, MetaManager, PathIndex
+
+def test_lazy_items():
+    calls = []
+    def loader(): calls.append(1); return [MetaItem(None, 'b'), MetaItem(None, 'a')]
+    item = MetaItem(None, 'root', loader = loader)
+    assert item.hasItems and not item.loaded and not calls
+    assert [x.name for x in item.items] == ['b', 'a'] and item.loaded
+    assert item.child('a').name == 'a' and item.items is item.items and len(calls) == 1
+    item.items.append(MetaItem(None, 'c')) # e.g. a nested pak opened into it
+    assert item.child('c').name == 'c'
+    item.items = []
+    assert not item.hasItems and item.child('a') is None and len(calls) == 1
+    assert not MetaItem(None, 'leaf').hasItems and MetaItem(None, 'leaf').items == []
+
+def test_tree_loads_per_folder(monkeypatch):
+    manager = SimpleNamespace(folderIcon = None, packageIcon = None, getIcon = lambda ext: None)
+    opened = []
+    nested = SimpleNamespace(open = lambda: opened.append(1), getMetaItems = lambda manager: [MetaItem(None, 'inner.txt')])
+    files = [FileSource(path = 'a/b/c.txt'), FileSource(path = 'a/d.txt'), FileSource(path = 'e.pak', pak = nested)]
+    pakFile = SimpleNamespace(files = files, filesByPath = PathIndex(files), pathSkip = 0, fileMask = None)
+    loads = []; folderItems = MetaManager._folderItems
+    monkeypatch.setattr(MetaManager, '_folderItems', staticmethod(lambda *args: loads.append(args[3]) or folderItems(*args)))
+    items = MetaManager.getMetaItems(manager, pakFile)
+    assert [x.name for x in items] == ['a', 'e.pak'] and loads == ['']
+    a = items[0]
+    assert a.hasItems and not a.loaded
+    assert [x.name for x in a.items] == ['b', 'd.txt'] and loads == ['', 'a'] and not a.child('b').loaded
+    assert not opened and [x.name for x in items[1].items] == ['inner.txt'] and opened == [1]
@@ -0,0 +1,46 @@
+from types import SimpleNamespace
+from gamex.cache import ObjectCache
+from gamex.file import StandardFileSystem
+from gamex.meta import FileSource
+from gamex.pak import BinaryPakFile, PakState, FileOption
+from gamex.Valve.formats.pakbinary import PakBinary_Vpk
+
+def pak(root: str, built: list) -> BinaryPakFile:
+    game = SimpleNamespace(id = 'Test', family = None, resource = None, isPakFile = lambda path: False)
+    pak = BinaryPakFile(PakState(StandardFileSystem(str(root)), game, path = 'test_dir.vpk'), PakBinary_Vpk())
+    def factory(r: object, f: FileSource, s: BinaryPakFile) -> object: built.append(f.path); return (f.path, r.readBytes(f.fileSize))
+    pak.objectFactoryFunc = lambda file, game: (None, factory)
+    pak.objectCache = ObjectCache()
+    return pak
+
+def test_keyed_by_option(tmp_path):
+    (tmp_path / 'test_dir.vpk').write_bytes(b'abcdefgh')
+    built = []; s = pak(tmp_path, built)
+    a = FileSource(path = 'a', offset = 0, fileSize = 4, tag = 0); b = FileSource(path = 'b', offset = 4, fileSize = 4, tag = 0)
+    value = s.loadFileObject(object, a)
+    assert value == ('a', b'abcd') and s.loadFileObject(object, a) is value # a hit is the same instance
+    assert s.loadFileObject(object, a, FileOption.Supress) == value and s.loadFileObject(object, b) == ('b', b'efgh')
+    assert built == ['a', 'a', 'b'] # another option is another entry
+    assert s.loadFileObject(object, FileSource(path = 'a', offset = 0, fileSize = 4, tag = 0)) is value # a rebuilt view still hits
+    stats = s.objectCache.stats()
+    assert (stats['hits'], stats['misses'], stats['count']) == (2, 3, 3)
+
+def test_invalidate_on_close(tmp_path):
+    (tmp_path / 'test_dir.vpk').write_bytes(b'abcdefgh')
+    built = []; s = pak(tmp_path, built); other = pak(tmp_path, built)
+    other.objectCache = s.objectCache # two paks sharing one cache
+    a = FileSource(path = 'a', offset = 0, fileSize = 4, tag = 0)
+    s.loadFileObject(object, a); other.loadFileObject(object, a)
+    s.close()
+    assert len(s.objectCache) == 1 and s.objectCache.get(other, a, object, FileOption.Default) is not ObjectCache.MISS
+    s.loadFileObject(object, a)
+    assert built == ['a', 'a', 'a']
+
+def test_bound():
+    cache = ObjectCache(10)
+    files = [FileSource(path = f'{x}') for x in range(3)]
+    for f in files: cache.put('pak', f, object, None, b'x' * 4)
+    assert len(cache) == 2 and cache.size == 8 and cache.get('pak', files[0], object) is ObjectCache.MISS
+    cache.get('pak', files[1], object); cache.put('pak', files[0], object, None, b'x' * 4) # 1 was used last, 2 is evicted
+    assert cache.get('pak', files[2], object) is ObjectCache.MISS and cache.get('pak', files[1], object) is not ObjectCache.MISS
+    assert cache.put('pak', files[0], object, None, b'x' * 11) == b'x' * 11 and cache.stats()['evictions'] == 2 # too large to keep
@@ -0,0 +1,37 @@
+from types import SimpleNamespace
+from gamex.meta import FileSource, PathIndex, MetaManager
+
+def files() -> list[FileSource]:
+    return [FileSource(path = x) for x in ('Textures/Armor/Iron.dds', 'textures/armor/Steel.dds', 'Textures\\Sky\\Clouds.dds', 'Meshes/Armor/Iron.nif', 'README.txt')]
+
+def paths(found) -> list[str]: return sorted(x.path for x in found)
+
+def test_ignore_case():
+    index = PathIndex(files(), True)
+    assert paths(index.under('TEXTURES/ARMOR')) == ['Textures/Armor/Iron.dds', 'textures/armor/Steel.dds']
+    assert len(list(index.under('textures'))) == 3 and not list(index.under('textures', False))
+    assert paths(index.startswith('textures/armor/ST')) == ['textures/armor/Steel.dds']
+    assert paths(index.startswith('MESHES/armor/i')) == ['Meshes/Armor/Iron.nif']
+    assert index['textures/sky/clouds.DDS'][0].path == 'Textures\\Sky\\Clouds.dds'
+    # keys are lowercased, directories keep the casing they were first seen with
+    assert index.dirsOf('') == ['Meshes', 'Textures'] and index.dirsOf('TEXTURES') == ['Armor', 'Sky']
+
+def test_match_case():
+    index = PathIndex(files())
+    assert paths(index.under('Textures/Armor')) == ['Textures/Armor/Iron.dds']
+    assert paths(index.startswith('textures/armor/')) == ['textures/armor/Steel.dds']
+    assert not list(index.under('TEXTURES')) and 'readme.txt' not in index
+    assert index.dirsOf('') == ['Meshes', 'Textures', 'textures']
+
+def test_skip():
+    index = PathIndex([FileSource(path = f'root/{x.path}') for x in files()], True, skip = 5)
+    assert paths(index.startswith('textures/ARMOR/s')) == ['root/textures/armor/Steel.dds']
+
+def test_meta_item_names():
+    manager = SimpleNamespace(folderIcon = None, packageIcon = None, getIcon = lambda ext: None)
+    pakFile = SimpleNamespace(files = files(), pathSkip = 0, fileMask = None)
+    pakFile.filesByPath = PathIndex(pakFile.files, True)
+    items = MetaManager.getMetaItems(manager, pakFile)
+    assert [x.name for x in items] == ['Meshes', 'README.txt', 'Textures']
+    assert [x.name for x in items[2].items] == ['Armor', 'Sky']
+    assert [x.name for x in items[2].child('Armor').items] == ['Iron.dds', 'Steel.dds']
@@ -0,0 +1,50 @@
+import pytest
+from types import SimpleNamespace
+from gamex.file import StandardFileSystem
+from gamex.meta import FileSource
+from gamex.pak import BinaryPakFile, PakState, DecodePipeline
+from gamex.Valve.formats.pakbinary import PakBinary_Vpk
+
+# PakBinary_Test
+class PakBinary_Test(PakBinary_Vpk):
+    _instance = None
+    def readData(self, source: BinaryPakFile, r: object, file: FileSource, option: object = None) -> object:
+        if file.path.startswith('bad'): raise ValueError(file.path)
+        return super().readData(source, r, file, option)
+
+@pytest.fixture
+def pak(tmp_path):
+    (tmp_path / 'test_dir.vpk').write_bytes(bytes(range(256)) * 4)
+    game = SimpleNamespace(id = 'Test', family = None, resource = None)
+    pak = BinaryPakFile(PakState(StandardFileSystem(str(tmp_path)), game, path = 'test_dir.vpk'), PakBinary_Test())
+    pak.coalesceGap = 16
+    with DecodePipeline(2, offload = False) as pipeline:
+        pak.pipeline = pipeline
+        yield pak
+
+# out of offset order, over two spans and a direct read of an entry with no dataExtent
+def files() -> list[FileSource]:
+    return [FileSource(path = f'{x}', offset = x, fileSize = 8, tag = 0) for x in (900, 8, 0, 512, 16)] + [FileSource(path = 'direct')]
+
+def test_order(pak, monkeypatch):
+    monkeypatch.setattr(pak.pakBinary, 'dataExtent', lambda source, file: None if file.path == 'direct' else PakBinary_Vpk.dataExtent(pak.pakBinary, source, file))
+    pak.readData = lambda file, option = None: b'direct' if file.path == 'direct' else BinaryPakFile.readData(pak, file, option)
+    direct, spans = pak._coalesce(files(), True)
+    assert len(direct) == 1 and [(start, end) for _, start, end, _ in spans] == [(0, 24), (512, 520), (900, 908)]
+    found = [(f.path, v if isinstance(v, bytes) else v.read()) for f, v in pak.loadFileDataMany(files())]
+    assert [x for x, _ in found] == ['900', '8', '0', '512', '16', 'direct'] # request order
+    assert all(v == bytes(range(int(x) % 256, int(x) % 256 + 8)) for x, v in found[:5]) and found[5][1] == b'direct'
+    unordered = {f.path for f, _ in pak.loadFileDataMany(files(), ordered = False)}
+    assert unordered == {f.path for f in files()}
+
+def test_error(pak):
+    source = [FileSource(path = '0', offset = 0, fileSize = 8, tag = 0), FileSource(path = 'bad', offset = 8, fileSize = 8, tag = 0), FileSource(path = '16', offset = 16, fileSize = 8, tag = 0)]
+    found = pak.loadFileDataMany(source)
+    assert next(found)[0].path == '0'
+    with pytest.raises(ValueError, match = 'bad'): next(found) # raised where the entry is yielded
+    assert [f.path for f, _ in pak.loadFileDataMany([source[0], source[2]])] == ['0', '16'] # the pipeline is still usable
+
+def test_closed(pak):
+    pipeline = pak.pipeline
+    pipeline.close()
+    assert pipeline.submit(lambda: 'restarted').result() == 'restarted'
@@ -0,0 +1,41 @@
+import asyncio, threading, pytest
+from concurrent.futures import CancelledError
+from types import SimpleNamespace
+from gamex.file import StandardFileSystem
+from gamex.meta import FileSource
+from gamex.pak import BinaryPakFile, PakState
+from gamex.platform import PreloadLoop, TextureManager
+from gamex.Valve.formats.pakbinary import PakBinary_Vpk
+
+def test_release_stops_loop():
+    PreloadLoop.acquire(); PreloadLoop.acquire()
+    pending = PreloadLoop.submit(asyncio.sleep(60))
+    thread = PreloadLoop._thread
+    PreloadLoop.release()
+    assert thread.is_alive() and not pending.done() # still in use
+    PreloadLoop.release()
+    assert not thread.is_alive() and PreloadLoop._loop is None
+    with pytest.raises(CancelledError): pending.result(timeout = 1)
+    assert PreloadLoop.submit(asyncio.sleep(0, 'next')).result(timeout = 1) == 'next' # started again on demand
+    PreloadLoop.shutdown()
+
+def test_manager_dispose():
+    async def aloadFileObject(type: type, path: str) -> object: await asyncio.sleep(60)
+    manager = TextureManager(SimpleNamespace(aloadFileObject = aloadFileObject), None)
+    manager.preloadTexture('a.dds')
+    pending = manager._preloadTasks['a.dds']; thread = PreloadLoop._thread
+    manager.dispose()
+    assert pending.cancelled() and not manager._preloadTasks and not thread.is_alive()
+
+def test_get_file_source_off_loop(tmp_path):
+    (tmp_path / 'test_dir.vpk').write_bytes(b'abcdefgh')
+    game = SimpleNamespace(id = 'Test', family = None, resource = None, isPakFile = lambda path: False)
+    pak = BinaryPakFile(PakState(StandardFileSystem(str(tmp_path)), game, path = 'test_dir.vpk'), PakBinary_Vpk())
+    file = FileSource(path = 'a.txt', offset = 2, fileSize = 4, tag = 0)
+    threads = []
+    def getFileSource(path: str, throwOnError: bool = True): threads.append(threading.current_thread()); return (pak, file)
+    pak.getFileSource = getFileSource
+    async def load(): return threading.current_thread(), (await pak.aloadFileData('a.txt')).read(), await pak.aloadFileObject(object, 'a.txt')
+    loop, data, value = asyncio.run(load())
+    assert data == b'cdef' and value.read() == b'cdef'
+    assert len(threads) == 2 and loop not in threads
@@ -0,0 +1,49 @@
+import threading, time, pytest
+from gamex.pak import ReaderPool
+
+# Reader_Test
+class Reader_Test:
+    def __init__(self, opened: list): self.closed = False; opened.append(self)
+    def __exit__(self, type, value, traceback): self.closed = True
+    def seek(self, offset: int) -> None: pass
+
+def test_bound():
+    opened = []; busy = []; peak = [0]; lock = threading.Lock()
+    pool = ReaderPool(lambda: Reader_Test(opened), retain = 2)
+    def work(r: Reader_Test) -> None:
+        with lock: busy.append(r); peak[0] = max(peak[0], len(busy))
+        time.sleep(0.01)
+        with lock: busy.remove(r)
+    threads = [threading.Thread(target = pool.action, args = (work,)) for _ in range(8)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert len(opened) == 2 and peak[0] == 2
+    assert pool.stats()['waits'] > 0 and pool.count == 2
+    pool.close()
+    assert all(x.closed for x in opened) and pool.count == 0
+
+def test_release_after_error():
+    opened = []
+    pool = ReaderPool(lambda: Reader_Test(opened), retain = 1)
+    with pytest.raises(ValueError): pool.func(lambda r: (_ for _ in ()).throw(ValueError()))
+    assert pool.func(lambda r: r) is opened[0] # the reader went back to the pool
+
+def test_discard_on_failed_reset():
+    opened = []
+    def reset(r: Reader_Test) -> None: raise OSError()
+    pool = ReaderPool(lambda: Reader_Test(opened), reset, retain = 1)
+    pool.action(lambda r: None)
+    assert opened[0].closed and pool.count == 0 # discarded, its slot is free again
+    pool.action(lambda r: None)
+    assert len(opened) == 2
+
+def test_failed_open_frees_slot():
+    calls = [0]
+    def factory() -> Reader_Test:
+        calls[0] += 1
+        if calls[0] == 1: raise OSError()
+        return Reader_Test([])
+    pool = ReaderPool(factory, retain = 1)
+    with pytest.raises(OSError): pool.action(lambda r: None)
+    assert pool.count == 0
+    pool.action(lambda r: None)
@@ -0,0 +1,30 @@
+from types import SimpleNamespace
+from gamex.file import StandardFileSystem
+from gamex.meta import FileSource
+from gamex.pak import BinaryPakFile, PakState, PakBinary
+from gamex.Valve.formats.pakbinary import PakBinary_Vpk
+
+def pak(root: str, pakBinary: PakBinary) -> BinaryPakFile:
+    game = SimpleNamespace(id = 'Test', family = None, resource = None)
+    return BinaryPakFile(PakState(StandardFileSystem(str(root)), game, path = 'test_dir.vpk'), pakBinary)
+
+# entries in the _dir archive after a 16 byte tree, in an external archive, with preload bytes and empty
+def test_data_many_matches_data(tmp_path):
+    (tmp_path / 'test_dir.vpk').write_bytes(b'T' * 16 + b'abcdefgh' + b'ijklmnop')
+    (tmp_path / 'test_000.vpk').write_bytes(b'0123456789')
+    s = pak(tmp_path, PakBinary_Vpk())
+    files = [FileSource(path = 'a.txt', offset = 0, fileSize = 8, tag = 16),
+        FileSource(path = 'b.txt', offset = 4, fileSize = 6, tag = 16, data = b'pre'),
+        FileSource(path = 'c.txt', offset = 2, fileSize = 5, tag = 'test_000.vpk'),
+        FileSource(path = 'd.txt', offset = 0, fileSize = 0, tag = 16)]
+    many = {x.path:v.read() for x, v in s.loadFileDataMany(files)}
+    assert many == {x.path:s.loadFileData(x).read() for x in files}
+    assert many['b.txt'] == b'preefghij' and many['c.txt'] == b'23456' and s.windowFallbacks == 0
+
+# formats that do not override dataExtent are read one entry at a time
+def test_default_not_batched(tmp_path):
+    (tmp_path / 'test_dir.vpk').write_bytes(b'x' * 8)
+    s = pak(tmp_path, PakBinary())
+    assert s.pakBinary.dataExtent(s, FileSource(path = 'a', offset = 0, fileSize = 8)) is None
+    direct, spans = s._coalesce([FileSource(path = 'a', offset = 0, fileSize = 8)], True)
+    assert len(direct) == 1 and not spans
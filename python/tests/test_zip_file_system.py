@@ -0,0 +1,21 @@
+import threading, zipfile
+from concurrent.futures import ThreadPoolExecutor
+from gamex.file import ZipFileSystem
+
+def test_threads(tmp_path):
+    members = {f'data/{i:02}.bin': bytes([i]) * (1000 + i * 37) for i in range(32)}
+    with zipfile.ZipFile(tmp_path / 'test.zip', 'w', zipfile.ZIP_DEFLATED) as z:
+        for name, data in members.items(): z.writestr(name, data)
+    with ZipFileSystem(str(tmp_path / 'test.zip'), 'data') as fs:
+        def read(name: str) -> (str, bytes, int):
+            with fs.openReader(name) as r: return name, r.readBytes(len(members[f'data/{name}'])), threading.get_ident()
+        barrier = threading.Barrier(4)
+        def warm(_) -> None: barrier.wait(); fs.handle() # each worker opens its handle at the same time
+        with ThreadPoolExecutor(4) as pool:
+            list(pool.map(warm, range(4)))
+            results = list(pool.map(read, [x[5:] for x in members] * 4))
+        assert all(data == members[f'data/{name}'] for name, data, _ in results)
+        handles = list(fs.handles)
+        assert len(handles) == 5 # the constructing thread's and one per worker
+        assert sorted(fs.glob('', '*.bin')) == sorted(x[5:] for x in members)
+    assert not fs.handles and all(x.fp is None for x in handles) # close() closes every thread's handle